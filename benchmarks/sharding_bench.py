@@ -0,0 +1,60 @@
+"""
+Benchmark: link throughput of the sharded runtime vs worker count.
+
+Runs the same pregenerated constellation ticks through a single
+in-process ShardWorker and through ShardedRuntime with 1..N worker
+processes (partitioned by satellite), and reports links per second.
+
+    python -m benchmarks.sharding_bench --satellites 1000 --beams 64 --workers 8
+"""
+
+import argparse
+import os
+import time
+
+from edge_ingestion.constellation import ConstellationGenerator
+from pipeline.sharding import ShardedRuntime, ShardWorker
+
+
+def run(satellites: int, beams: int, ticks: int, max_workers: int, seed: int) -> None:
+    generator = ConstellationGenerator(
+        n_satellites=satellites, beams_per_sat=beams, mode="unthrottled", seed=seed, start_time=0.0
+    )
+    stream = [batches for batches in generator.ticks(ticks)]
+    links = generator.n_links
+
+    start = time.perf_counter()
+    worker = ShardWorker(generator.link_ids)
+    for batches in stream:
+        worker.process(batches)
+    baseline = time.perf_counter() - start
+    print(f"links: {links}, ticks: {ticks}, cores: {os.cpu_count()}")
+    print(f"in-process:  {links * ticks / baseline:12,.0f} links/s")
+
+    workers = 1
+    while workers <= max_workers:
+        with ShardedRuntime(generator.link_ids, workers=workers, key=lambda ids: ids // beams) as runtime:
+            runtime.tick(stream[0])
+            start = time.perf_counter()
+            for batches in stream[1:]:
+                runtime.tick(batches)
+            elapsed = time.perf_counter() - start
+        rate = links * (ticks - 1) / elapsed
+        print(f"{workers:3d} workers: {rate:12,.0f} links/s ({rate * baseline / (links * ticks):.2f}x)")
+        workers *= 2
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--satellites", type=int, default=1000)
+    parser.add_argument("--beams", type=int, default=64)
+    parser.add_argument("--ticks", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    run(args.satellites, args.beams, args.ticks, args.workers, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,13 @@
-from typing import List, Dict, Any
+import heapq
+from typing import List, Dict, Any, Hashable, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from core_types import AlignedStateBatch
+
+
+EARTH_RADIUS_KM = 6378.137
+LIGHT_SPEED_KM_S = 299792.458
 
 
 class QoSRanker:
@@ -6,7 +15,20 @@ class QoSRanker:
     Ranks alternate links based on latency, throughput, and stability.
     """
 
-    def rank(self, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def __init__(self, default_bandwidth: float = 10.0, offset_rate: float = 0.02, top_k: int = 10):
+        # Used when ranking an AlignedStateBatch that lacks these columns
+        self.default_bandwidth = default_bandwidth
+        self.offset_rate = offset_rate
+        self.top_k = top_k
+
+    def rank(
+        self,
+        candidates: Union[List[Dict[str, Any]], AlignedStateBatch],
+        k: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        if isinstance(candidates, AlignedStateBatch):
+            return self._rank_batch(candidates, k or self.top_k)
+
         ranked = []
 
         for link in candidates:
@@ -29,4 +51,172 @@ class QoSRanker:
                 "lifetime": lifetime,
             })
 
-        return sorted(ranked, key=lambda x: x["score"], reverse=True)
+        ranked = sorted(ranked, key=lambda x: x["score"], reverse=True)
+        return ranked[:k] if k else ranked
+
+    def _rank_batch(self, batch: AlignedStateBatch, k: int) -> List[Dict[str, Any]]:
+        """
+        Treat every link of the batch as a candidate and return the top k.
+        Missing latency / bandwidth / lifetime columns are derived from
+        geometry and beam state.
+        """
+        n = len(batch)
+
+        latency = batch.get("latency")
+        if latency is None:
+            pos = [batch.get(f"sat_pos_{c}", np.full(n, np.nan)) for c in "xyz"]
+            altitude = np.sqrt(pos[0] ** 2 + pos[1] ** 2 + pos[2] ** 2) - EARTH_RADIUS_KM
+            latency = altitude / LIGHT_SPEED_KM_S * 1000.0  # ms
+
+        bandwidth = batch.get("bandwidth", np.full(n, self.default_bandwidth))
+        snr = batch.get("snr", np.zeros(n))
+
+        lifetime = batch.get("lifetime")
+        if lifetime is None:
+            offset = batch.get("beam_offset", np.full(n, np.nan))
+            radius = batch.get("beam_radius", np.full(n, np.nan))
+            lifetime = np.maximum(radius - offset, 0.0) / self.offset_rate
+
+        top = self.rank_arrays(batch.link_ids, latency, bandwidth, snr, lifetime, k)
+        return [
+            {
+                "link_id": int(top["link_id"][i]),
+                "score": float(top["score"][i]),
+                "latency": float(top["latency"][i]),
+                "throughput": float(top["throughput"][i]),
+                "lifetime": float(top["lifetime"][i]),
+            }
+            for i in range(len(top["link_id"]))
+        ]
+
+    @staticmethod
+    def score_arrays(latency, bandwidth, snr, lifetime) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized throughput and QoS score, same formula as rank().
+        """
+        throughput = np.asarray(bandwidth, dtype=float) * (1 + np.asarray(snr, dtype=float))
+        score = np.round(throughput - latency + lifetime, 3)
+        return throughput, np.where(np.isnan(score), -np.inf, score)
+
+    def rank_arrays(
+        self,
+        link_ids: np.ndarray,
+        latency: np.ndarray,
+        bandwidth: np.ndarray,
+        snr: np.ndarray,
+        lifetime: np.ndarray,
+        k: Optional[int] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Score many candidates at once and return the top k as columns,
+        best first. Uses partial selection (argpartition), so the cost is
+        O(n + k log k) instead of a full sort.
+        """
+        latency = np.asarray(latency, dtype=float)
+        lifetime = np.asarray(lifetime, dtype=float)
+        throughput, score = self.score_arrays(latency, bandwidth, snr, lifetime)
+        n = len(score)
+        k = min(k or self.top_k, n)
+
+        if k < n:
+            top = np.argpartition(-score, k - 1)[:k]
+        else:
+            top = np.arange(n)
+        top = top[np.argsort(-score[top], kind="stable")]
+
+        def pick(values):
+            return np.broadcast_to(values, (n,))[top]
+
+        return {
+            "link_id": np.asarray(link_ids)[top],
+            "score": score[top],
+            "latency": pick(latency),
+            "throughput": pick(throughput),
+            "lifetime": pick(lifetime),
+        }
+
+    def incremental(self) -> "IncrementalTopK":
+        """
+        Top-k index that is updated as individual candidates change.
+        """
+        return IncrementalTopK(self)
+
+
+class IncrementalTopK:
+    """
+    Keeps candidates in a max-heap with lazy deletion, so an update
+    costs O(log n) and top(k) costs O(k log n) (plus skipped stale
+    entries), independent of the number of unchanged candidates.
+    """
+
+    def __init__(self, ranker: QoSRanker):
+        self.ranker = ranker
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._entries: Dict[Hashable, Tuple[int, Dict[str, Any]]] = {}
+        self._seq = 0
+        self.updates = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def update(self, link_id: Hashable, latency: float, bandwidth: float, snr: float, lifetime: float) -> None:
+        self.update_many([link_id], [latency], [bandwidth], [snr], [lifetime])
+
+    def update_many(
+        self,
+        link_ids: Sequence[Hashable],
+        latency: Sequence[float],
+        bandwidth: Sequence[float],
+        snr: Sequence[float],
+        lifetime: Sequence[float],
+    ) -> None:
+        """
+        Rescore changed candidates (vectorized) and push their new entries.
+        """
+        latency = np.asarray(latency, dtype=float)
+        lifetime = np.asarray(lifetime, dtype=float)
+        throughput, score = QoSRanker.score_arrays(latency, bandwidth, snr, lifetime)
+
+        for i, link_id in enumerate(link_ids):
+            self._seq += 1
+            record = {
+                "link_id": link_id,
+                "score": float(score[i]),
+                "latency": float(latency[i]),
+                "throughput": float(throughput[i]),
+                "lifetime": float(lifetime[i]),
+            }
+            self._entries[link_id] = (self._seq, record)
+            heapq.heappush(self._heap, (-record["score"], self._seq, link_id))
+
+        self.updates += len(link_ids)
+        self._maybe_compact()
+
+    def remove(self, link_id: Hashable) -> None:
+        self._entries.pop(link_id, None)
+        self._maybe_compact()
+
+    def top(self, k: int) -> List[Dict[str, Any]]:
+        """
+        Best k candidates, highest score first.
+        """
+        popped, result = [], []
+
+        while self._heap and len(result) < k:
+            entry = heapq.heappop(self._heap)
+            _, seq, link_id = entry
+            current = self._entries.get(link_id)
+            if current is None or current[0] != seq:
+                continue  # stale entry, drop it for good
+            popped.append(entry)
+            result.append(current[1])
+
+        for entry in popped:
+            heapq.heappush(self._heap, entry)
+        return result
+
+    def _maybe_compact(self) -> None:
+        # Rebuild once stale entries dominate the heap
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [(-record["score"], seq, link_id) for link_id, (seq, record) in self._entries.items()]
+            heapq.heapify(self._heap)
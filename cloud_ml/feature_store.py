@@ -1,23 +1,43 @@
+import copy
 from collections import deque
-from typing import Dict, Any, Deque
+from typing import Dict, Any, Deque, Optional, Union
 
-from core_types import AlignedState
+import numpy as np
+
+from core_types import AlignedState, AlignedStateBatch
+
+
+FEATURES = ("snr", "doppler", "timing_drift", "beam_offset", "beam_radius", "attenuation")
 
 
 class FeatureStore:
     """
     Maintains time-windowed features shared across all ML heads.
+
+    Accepts either a single-link AlignedState (one dict per sample) or an
+    AlignedStateBatch (one dict of per-link column arrays per sample).
     """
 
     def __init__(self, window_size: int = 10):
         self.window_size = window_size
         self.history: Deque[Dict[str, Any]] = deque(maxlen=window_size)
+        # Bumped on every update, so consumers can tell the window changed
+        self.version = 0
 
-    def update(self, state: AlignedState) -> None:
+    def update(self, state: Union[AlignedState, AlignedStateBatch]) -> None:
         """
         Extract and store features from the aligned state.
         """
 
+        self.version += 1
+
+        if isinstance(state, AlignedStateBatch):
+            features = {"time": state.time, "link_ids": state.link_ids}
+            for name in FEATURES:
+                features[name] = state.get(name)
+            self.history.append(features)
+            return
+
         features = {
             "time": state.time,
             "snr": state.rf.get("snr"),
@@ -36,8 +56,300 @@ class FeatureStore:
         """
         return list(self.history)
 
+    def is_batched(self) -> bool:
+        """
+        True when the stored samples are per-link column arrays.
+        """
+        return bool(self.history) and "link_ids" in self.history[-1]
+
     def is_ready(self) -> bool:
         """
         Check if sufficient history exists for time-series models.
         """
         return len(self.history) >= 3
+
+
+class RingFeatureStore:
+    """
+    Multi-link feature store backed by preallocated NumPy ring buffers.
+
+    Samples are stored as (feature, link, slot) with every slot written
+    twice (slot and slot + window), so the time-ordered window is always
+    one contiguous slice and window() returns a view, never a copy.
+    Rolling sum, sum of squares, time-weighted sum and EWMA are updated
+    incrementally, giving O(1) per link and tick mean / variance / EWMA /
+    least-squares slope. Only finite samples enter the running sums; a
+    per-column count of non-finite samples makes the statistics NaN
+    while such a sample is in the window, and exact again once it leaves.
+
+    snapshot() gives a read-only copy of the window and aggregates for
+    readers that may outlive the tick (heads abandoned at their
+    deadline, process pools).
+    """
+
+    def __init__(
+        self,
+        link_ids,
+        features=FEATURES,
+        window_size: int = 10,
+        ewma_alpha: float = 0.3,
+        resync_every: int = 1024,
+    ):
+        self.link_ids = np.asarray(link_ids, dtype=np.int64)
+        self.features = tuple(features)
+        self.feature_index = {name: i for i, name in enumerate(self.features)}
+        self.window_size = window_size
+        self.ewma_alpha = ewma_alpha
+        self.resync_every = resync_every
+
+        n_feat, n_links, w = len(self.features), len(self.link_ids), window_size
+        self._data = np.full((n_feat, n_links, 2 * w), np.nan)
+        self._times = np.zeros(2 * w)
+        self._pos = 0
+        self.count = 0
+        self.updates = 0
+
+        # Running aggregates; times are relative to _t_ref for precision
+        self._t_ref: Optional[float] = None
+        self._sum = np.zeros((n_feat, n_links))
+        self._sumsq = np.zeros((n_feat, n_links))
+        self._sum_tx = np.zeros((n_feat, n_links))
+        self._sum_t = 0.0
+        self._sum_tt = 0.0
+        self._ewma = np.full((n_feat, n_links), np.nan)
+        # Non-finite samples currently in the window
+        self._missing = np.zeros((n_feat, n_links), dtype=np.int64)
+
+        self.frozen = False
+        self._snapshot: Optional["RingFeatureStore"] = None
+
+    # -------------------- Updates --------------------
+
+    def update(self, batch: AlignedStateBatch) -> None:
+        """
+        Append one tick of features for every link.
+        """
+        values = np.full(self._sum.shape, np.nan)
+        if not len(batch.link_ids):
+            # Nothing reported: an all-NaN tick
+            self.update_values(batch.time, values)
+            return
+
+        rows, found = None, None
+        if not (batch.link_ids is self.link_ids or np.array_equal(batch.link_ids, self.link_ids)):
+            # Links absent from the batch get NaN for this tick; batch ids
+            # need not be sorted
+            ids = np.asarray(batch.link_ids)
+            order = np.argsort(ids, kind="stable")
+            rows = order[np.minimum(np.searchsorted(ids, self.link_ids, sorter=order), len(ids) - 1)]
+            found = ids[rows] == self.link_ids
+
+        for i, name in enumerate(self.features):
+            column = batch.get(name)
+            if column is None:
+                continue
+            if rows is None:
+                values[i] = column
+            else:
+                values[i] = np.where(found, column[rows], np.nan)
+
+        self.update_values(batch.time, values)
+
+    @property
+    def version(self) -> int:
+        return self.updates
+
+    def update_values(self, time: float, values: np.ndarray) -> None:
+        """
+        Append one (feature, link) sample matrix at `time`.
+        """
+        if self.frozen:
+            raise TypeError("RingFeatureStore snapshot is read-only")
+        if self._t_ref is None:
+            self._t_ref = time
+        t = time - self._t_ref
+        w = self.window_size
+        slot = self._pos
+
+        # --- Remove the sample leaving the window ---
+        if self.count == w:
+            old = self._data[:, :, slot]
+            old_t = self._times[slot]
+            gone = ~np.isfinite(old)
+            if gone.any():
+                self._missing -= gone
+                old = np.where(gone, 0.0, old)
+            self._sum -= old
+            self._sumsq -= old * old
+            self._sum_tx -= old_t * old
+            self._sum_t -= old_t
+            self._sum_tt -= old_t * old_t
+        else:
+            self.count += 1
+
+        # --- Write twice so the ordered window stays contiguous ---
+        self._data[:, :, slot] = values
+        self._data[:, :, slot + w] = values
+        self._times[slot] = t
+        self._times[slot + w] = t
+        self._pos = (slot + 1) % w
+
+        bad = ~np.isfinite(values)
+        if bad.any():
+            self._missing += bad
+            values = np.where(bad, 0.0, values)
+        self._sum += values
+        self._sumsq += values * values
+        self._sum_tx += t * values
+        self._sum_t += t
+        self._sum_tt += t * t
+
+        a = self.ewma_alpha
+        values = self._data[:, :, slot]
+        self._ewma = np.where(np.isnan(self._ewma), values, a * values + (1 - a) * self._ewma)
+
+        self.updates += 1
+        if self.updates % self.resync_every == 0:
+            self._resync()
+
+    def load_window(self, times: np.ndarray, window: np.ndarray) -> None:
+        """
+        Replay a (features, links, count) window sampled at `times`
+        (e.g. migrated from another store), then recompute the running
+        sums from it. Rolling statistics then agree with the source
+        store up to float rounding, not bit for bit: its sums carry the
+        rounding of its whole update history.
+        """
+        for i, t in enumerate(times):
+            self.update_values(float(t), window[:, :, i])
+        if self.count:
+            self._resync()
+
+    def _resync(self) -> None:
+        """
+        Recompute the running sums from the window (bounds float drift)
+        and move the time reference to the oldest sample.
+        """
+        data = self._window_slice(self._data)
+        times = self._window_slice(self._times)
+
+        shift = times[0]
+        self._t_ref += shift
+        times = times - shift
+        w = self.window_size
+        slots = (self._pos - self.count + np.arange(self.count)) % w
+        self._times[slots] = times
+        self._times[slots + w] = times
+
+        bad = ~np.isfinite(data)
+        self._missing = bad.sum(axis=2)
+        data = np.where(bad, 0.0, data)
+        self._sum = data.sum(axis=2)
+        self._sumsq = (data * data).sum(axis=2)
+        self._sum_tx = (data * times).sum(axis=2)
+        self._sum_t = float(times.sum())
+        self._sum_tt = float((times * times).sum())
+
+    def snapshot(self) -> "RingFeatureStore":
+        """
+        Read-only copy of the current window (oldest sample first, so
+        only `count` slots are copied) and running aggregates. Taken
+        once per update.
+        """
+        if self.frozen:
+            return self
+        cached = self._snapshot
+        if cached is not None and cached.updates == self.updates:
+            return cached
+
+        snap = copy.copy(self)
+        snap._data = self.window_all().copy()
+        snap._times = self._window_slice(self._times).copy()
+        snap._pos = self.count % self.window_size
+        for name in ("_sum", "_sumsq", "_sum_tx", "_ewma", "_missing"):
+            setattr(snap, name, getattr(self, name).copy())
+        snap.frozen = True
+        snap._snapshot = None
+        self._snapshot = snap
+        return snap
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {**self.__dict__, "_snapshot": None}
+
+    # -------------------- Views --------------------
+
+    def _window_slice(self, array: np.ndarray) -> np.ndarray:
+        start = (self._pos - self.count) % self.window_size
+        return array[..., start:start + self.count]
+
+    def window(self, feature: str) -> np.ndarray:
+        """
+        (links, count) oldest-to-newest view of one feature (no copy).
+        """
+        return self._window_slice(self._data[self.feature_index[feature]])
+
+    def window_all(self) -> np.ndarray:
+        """
+        (features, links, count) view of every feature.
+        """
+        return self._window_slice(self._data)
+
+    def times(self) -> np.ndarray:
+        """
+        Absolute sample times of the window, oldest first.
+        """
+        return self._window_slice(self._times) + (self._t_ref or 0.0)
+
+    def latest(self, feature: str) -> np.ndarray:
+        return self._data[self.feature_index[feature], :, (self._pos - 1) % self.window_size]
+
+    # -------------------- Rolling statistics --------------------
+
+    def finite_count(self, feature: str) -> np.ndarray:
+        """
+        Per-link number of finite samples of the feature in the window.
+        """
+        return self.count - self._missing[self.feature_index[feature]]
+
+    def _complete(self, i: int, values: np.ndarray) -> np.ndarray:
+        # NaN for links with a non-finite sample in the window
+        return np.where(self._missing[i] > 0, np.nan, values)
+
+    def mean(self, feature: str) -> np.ndarray:
+        i = self.feature_index[feature]
+        return self._complete(i, self._sum[i] / max(self.count, 1))
+
+    def variance(self, feature: str) -> np.ndarray:
+        i = self.feature_index[feature]
+        n = max(self.count, 1)
+        mean = self._sum[i] / n
+        return self._complete(i, np.maximum(self._sumsq[i] / n - mean * mean, 0.0))
+
+    def ewma(self, feature: str) -> np.ndarray:
+        return self._ewma[self.feature_index[feature]]
+
+    def slope(self, feature: str) -> np.ndarray:
+        """
+        Least-squares slope of the feature over window time (units / s).
+        """
+        i = self.feature_index[feature]
+        n = self.count
+        denom = n * self._sum_tt - self._sum_t ** 2
+        if n < 2 or denom <= 0:
+            return np.full(len(self.link_ids), np.nan)
+        return self._complete(i, (n * self._sum_tx[i] - self._sum_t * self._sum[i]) / denom)
+
+    def trends(self, feature: str) -> Dict[str, np.ndarray]:
+        """
+        Pre-aggregated per-link trend of one feature.
+        """
+        return {
+            "latest": self.latest(feature),
+            "mean": self.mean(feature),
+            "std": np.sqrt(self.variance(feature)),
+            "ewma": self.ewma(feature),
+            "slope": self.slope(feature),
+        }
+
+    def is_ready(self) -> bool:
+        return self.count >= 3
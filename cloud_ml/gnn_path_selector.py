@@ -1,15 +1,98 @@
 import networkx as nx
-from typing import Dict, Any, Optional
+import numpy as np
+from typing import Dict, Any, List, Optional, Union
+
+from cloud_ml.path_engine import PathEngine
+from cloud_ml.topology_store import TopologyStore
+from digital_twin.contact_plan import ContactPlan
 
 
 class SafePathSelector:
     """
     Selects the safest feasible path using topology-aware reasoning.
+
+    With a contact plan, edges between nodes the plan knows about are
+    only used if they are visible at `at_time`.
+
+    The graph can be a networkx graph or a TopologyStore; the store is
+    searched directly on its CSR form.
+
+    Paths are found with the hop-bounded PathEngine (at most max_hops
+    edges); select_exhaustive() keeps the original enumeration of every
+    simple path as a reference.
     """
 
-    def select(self, graph: nx.Graph, source: str, target: str) -> Optional[Dict[str, Any]]:
+    def __init__(self, contact_plan: Optional[ContactPlan] = None, max_hops: int = 4):
+        self.contact_plan = contact_plan
+        self.max_hops = max_hops
+
+    def _visible_subgraph(self, graph: nx.Graph, at_time: float) -> nx.Graph:
+        plan = self.contact_plan
+
+        def edge_visible(u, v) -> bool:
+            if (u, v) not in plan.pair_index:
+                return True
+            return plan.is_visible(u, v, at_time)
+
+        return nx.subgraph_view(graph, filter_edge=edge_visible)
+
+    def _visible_edges(self, store: TopologyStore, at_time: float) -> np.ndarray:
+        plan = self.contact_plan
+        mask = np.ones(len(store.edge_scores()), dtype=bool)
+
+        rows, pairs = [], []
+        for u, v, row in store.edges():
+            pair = plan.pair_index.get((u, v))
+            if pair is not None:
+                rows.append(row)
+                pairs.append(pair)
+        if rows:
+            mask[rows] = plan.visible_many(np.asarray(pairs), at_time)
+        return mask
+
+    def _engine(self, graph: Union[nx.Graph, TopologyStore], at_time: Optional[float]) -> PathEngine:
+        if isinstance(graph, TopologyStore):
+            if self.contact_plan is not None and at_time is not None:
+                return graph.engine(self._visible_edges(graph, at_time))
+            return graph.engine()
+        if self.contact_plan is not None and at_time is not None:
+            graph = self._visible_subgraph(graph, at_time)
+        return PathEngine.from_networkx(graph)
+
+    def select(
+        self,
+        graph: Union[nx.Graph, TopologyStore],
+        source: str,
+        target: str,
+        at_time: Optional[float] = None,
+    ) -> Optional[Dict[str, Any]]:
+        return self._engine(graph, at_time).best_path(source, target, self.max_hops)
+
+    def select_k(
+        self,
+        graph: Union[nx.Graph, TopologyStore],
+        source: str,
+        target: str,
+        k: int = 3,
+        at_time: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Top k safest paths, best first.
+        """
+        return self._engine(graph, at_time).k_best_paths(source, target, k, self.max_hops)
+
+    def select_exhaustive(
+        self,
+        graph: nx.Graph,
+        source: str,
+        target: str,
+        at_time: Optional[float] = None,
+    ) -> Optional[Dict[str, Any]]:
+        if self.contact_plan is not None and at_time is not None:
+            graph = self._visible_subgraph(graph, at_time)
+
         try:
-            paths = nx.all_simple_paths(graph, source, target, cutoff=4)
+            paths = nx.all_simple_paths(graph, source, target, cutoff=self.max_hops)
         except (nx.NodeNotFound, nx.NetworkXNoPath):
             return None
 
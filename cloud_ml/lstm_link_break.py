@@ -1,6 +1,30 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Union
 
-from cloud_ml.feature_store import FeatureStore
+import numpy as np
+
+from cloud_ml.feature_store import FeatureStore, RingFeatureStore
+
+
+# Codes returned by predict_batch()
+REASON_CODES = (
+    "insufficient_history",
+    "missing_beam_data",
+    "already_outside_beam",
+    "invalid_time_delta",
+    "non_increasing_offset",
+    "temporal_trend_extrapolation",
+)
+CONFIDENCE_LEVELS = ("low", "medium", "high")
+
+(
+    INSUFFICIENT_HISTORY,
+    MISSING_BEAM_DATA,
+    ALREADY_OUTSIDE_BEAM,
+    INVALID_TIME_DELTA,
+    NON_INCREASING_OFFSET,
+    TEMPORAL_TREND_EXTRAPOLATION,
+) = range(len(REASON_CODES))
+LOW, MEDIUM, HIGH = range(len(CONFIDENCE_LEVELS))
 
 
 class LinkBreakPredictor:
@@ -8,7 +32,31 @@ class LinkBreakPredictor:
     Predicts time-to-link-break using temporal feature trends.
     """
 
-    def predict(self, feature_store: FeatureStore) -> Dict[str, Any]:
+    def __init__(
+        self,
+        weighting: Optional[str] = None,
+        decay: float = 0.8,
+        robust: bool = False,
+        robust_iterations: int = 3,
+        huber_k: float = 1.345,
+    ):
+        # Options of predict_batch(): sample weighting over the window
+        # (None, "linear" or "exponential") and Huber IRLS refinement
+        if weighting not in (None, "linear", "exponential"):
+            raise ValueError(f"Unknown weighting '{weighting}'")
+        self.weighting = weighting
+        self.decay = decay
+        self.robust = robust
+        self.robust_iterations = robust_iterations
+        self.huber_k = huber_k
+
+    def predict(self, feature_store: Union[FeatureStore, RingFeatureStore]) -> Dict[str, Any]:
+        if isinstance(feature_store, RingFeatureStore):
+            return self.predict_batch(feature_store)
+
+        if feature_store.is_batched():
+            return self._predict_columns(feature_store.get_sequence())
+
         if not feature_store.is_ready():
             return {
                 "time_to_break": None,
@@ -66,3 +114,207 @@ class LinkBreakPredictor:
             "confidence": "medium",
             "reason": "temporal_trend_extrapolation",
         }
+
+    def _predict_columns(self, seq: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Same rules as predict(), applied to every link of a batched
+        feature window at once. time_to_break is NaN where unknown.
+        """
+        latest = seq[-1]
+        link_ids = latest["link_ids"]
+        n = len(link_ids)
+
+        if len(seq) < 3:
+            return {
+                "link_ids": link_ids,
+                "time_to_break": np.full(n, np.nan),
+                "confidence": np.full(n, "low", dtype=object),
+                "reason": np.full(n, "insufficient_history", dtype=object),
+            }
+
+        prev = seq[-2]
+        nan = np.full(n, np.nan)
+
+        beam_offset = latest.get("beam_offset")
+        beam_radius = latest.get("beam_radius")
+        beam_offset = nan if beam_offset is None else beam_offset
+        beam_radius = nan if beam_radius is None else beam_radius
+        prev_offset = prev.get("beam_offset")
+        prev_offset = beam_offset if prev_offset is None else prev_offset
+
+        delta_time = latest["time"] - prev["time"]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            offset_rate = (beam_offset - prev_offset) / delta_time if delta_time > 0 else nan
+            time_to_break = np.round((beam_radius - beam_offset) / offset_rate, 3)
+
+        missing = np.isnan(beam_offset) | np.isnan(beam_radius)
+        outside = ~missing & (beam_offset >= beam_radius)
+        invalid_dt = ~missing & ~outside & (delta_time <= 0)
+        rest = ~missing & ~outside & ~invalid_dt
+        non_increasing = rest & ~(offset_rate > 0)
+        predicted = rest & (offset_rate > 0)
+
+        conditions = [missing, outside, invalid_dt, non_increasing, predicted]
+
+        return {
+            "link_ids": link_ids,
+            "time_to_break": np.select(
+                [outside, predicted], [0.0, time_to_break], default=np.nan
+            ),
+            "confidence": np.select(
+                conditions, ["low", "high", "low", "medium", "medium"], default="low"
+            ).astype(object),
+            "reason": np.select(
+                conditions,
+                [
+                    "missing_beam_data",
+                    "already_outside_beam",
+                    "invalid_time_delta",
+                    "non_increasing_offset",
+                    "temporal_trend_extrapolation",
+                ],
+                default="missing_beam_data",
+            ).astype(object),
+        }
+
+    # -------------------- Windowed, vectorized prediction --------------------
+
+    def _sample_weights(self, n: int) -> np.ndarray:
+        if self.weighting == "linear":
+            return np.arange(1, n + 1, dtype=float)
+        if self.weighting == "exponential":
+            return self.decay ** np.arange(n - 1, -1, -1, dtype=float)
+        return np.ones(n)
+
+    @staticmethod
+    def _weighted_fit(t: np.ndarray, x: np.ndarray, w: np.ndarray):
+        """
+        Per-row weighted least squares x ~ a + b t. w is (links, n) with
+        zeros for missing samples. Returns (intercept, slope, Sw, Stt).
+        """
+        sw = w.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            t_mean = (w * t).sum(axis=1) / sw
+            x_mean = (w * x).sum(axis=1) / sw
+            dt = t - t_mean[:, None]
+            stt = (w * dt * dt).sum(axis=1)
+            slope = (w * dt * (x - x_mean[:, None])).sum(axis=1) / stt
+        return x_mean - slope * t_mean, slope, sw, stt
+
+    def _aggregate_fit(self, store: RingFeatureStore, t: np.ndarray):
+        """
+        Unweighted OLS straight from the store's running aggregates,
+        O(1) per link. Returns (level at latest sample, slope, slope
+        standard error, finite samples, time spread). Links with a
+        non-finite sample in the window get a NaN slope.
+        """
+        n = store.count
+        mean = store.mean("beam_offset")
+        var = store.variance("beam_offset")
+        b = store.slope("beam_offset")
+
+        t_mean = t.mean()
+        stt = float(((t - t_mean) ** 2).sum())
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ssr = np.maximum(n * var - b * b * stt, 0.0)
+            se = np.sqrt(ssr / max(n - 2, 1) / stt)
+        return mean - b * t_mean, b, se, store.finite_count("beam_offset"), np.full(len(b), stt)
+
+    def _window_fit(self, x: np.ndarray, t: np.ndarray):
+        """
+        Weighted (and optionally Huber IRLS) fit over the window view.
+        Same return values as _aggregate_fit().
+        """
+        valid = np.isfinite(x)
+        w = np.where(valid, self._sample_weights(x.shape[1])[None, :], 0.0)
+        x0 = np.where(valid, x, 0.0)
+
+        intercept, b, sw, stt = self._weighted_fit(t, x0, w)
+
+        if self.robust:
+            for _ in range(self.robust_iterations):
+                resid = x0 - (intercept[:, None] + b[:, None] * t)
+                abs_r = np.where(valid, np.abs(resid), 0.0)
+                # MAD scale; np.median is much cheaper than np.nanmedian
+                scale = 1.4826 * np.median(abs_r, axis=1)
+                scale = np.where(scale > 0, scale, np.inf)
+                w = w * np.minimum(1.0, self.huber_k * scale[:, None] / np.maximum(abs_r, 1e-12))
+                intercept, b, sw, stt = self._weighted_fit(t, x0, w)
+
+        resid = x0 - (intercept[:, None] + b[:, None] * t)
+        n_obs = valid.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sigma2 = (w * resid * resid).sum(axis=1) / sw * n_obs / np.maximum(n_obs - 2, 1)
+            se = np.sqrt(sigma2 * sw / np.maximum(n_obs, 1) / stt)
+        return intercept, b, se, n_obs, stt
+
+    def predict_batch(self, store: RingFeatureStore) -> Dict[str, Any]:
+        """
+        Fit a windowed (weighted, optionally Huber-robust) beam offset
+        slope for every link in one NumPy pass and extrapolate to the
+        beam edge. Returns arrays: time_to_break (NaN where unknown),
+        confidence and reason codes (see CONFIDENCE_LEVELS, REASON_CODES),
+        plus the fitted slope and its standard error.
+        """
+        n_links = len(store.link_ids)
+        time_to_break = np.full(n_links, np.nan)
+        confidence = np.full(n_links, LOW, dtype=np.int8)
+        reason = np.full(n_links, INSUFFICIENT_HISTORY, dtype=np.int8)
+        slope = np.full(n_links, np.nan)
+        stderr = np.full(n_links, np.nan)
+
+        result = {
+            "link_ids": store.link_ids,
+            "time_to_break": time_to_break,
+            "confidence": confidence,
+            "reason": reason,
+            "slope": slope,
+            "slope_stderr": stderr,
+        }
+
+        if not store.is_ready():
+            return result
+
+        x = store.window("beam_offset")
+        times = store.times()
+        t = times - times[-1]  # seconds relative to the latest sample
+        latest = x[:, -1]
+        radius = store.latest("beam_radius")
+
+        if self.weighting is None and not self.robust:
+            intercept, b, se, n_obs, stt = self._aggregate_fit(store, t)
+        else:
+            intercept, b, se, n_obs, stt = self._window_fit(x, t)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            # Extrapolate from the fitted level, less sensitive to jitter
+            ttb = (radius - intercept) / b
+            t_stat = b / se
+
+        # --- Reason codes (first matching rule wins) ---
+        missing = ~np.isfinite(latest) | ~np.isfinite(radius) | (n_obs < 3)
+        outside = ~missing & (latest >= radius)
+        bad_time = ~missing & ~outside & ~(stt > 0)
+        # No usable fit (e.g. a gap in the window): unknown, not flat
+        missing |= ~outside & ~bad_time & ~np.isfinite(b)
+        flat = ~missing & ~outside & ~bad_time & ~(b > 0)
+        predicted = ~missing & ~outside & ~bad_time & ~flat
+
+        reason[:] = np.select(
+            [missing, outside, bad_time, flat],
+            [MISSING_BEAM_DATA, ALREADY_OUTSIDE_BEAM, INVALID_TIME_DELTA, NON_INCREASING_OFFSET],
+            default=TEMPORAL_TREND_EXTRAPOLATION,
+        )
+        time_to_break[outside] = 0.0
+        time_to_break[predicted] = np.round(ttb[predicted], 3)
+
+        confidence[outside] = HIGH
+        confidence[flat] = MEDIUM
+        confidence[predicted] = np.where(
+            t_stat[predicted] >= 5.0, HIGH, np.where(t_stat[predicted] >= 2.0, MEDIUM, LOW)
+        )
+
+        slope[:] = b
+        stderr[:] = se
+        return result
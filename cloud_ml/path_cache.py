@@ -0,0 +1,222 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from cloud_ml.gnn_path_selector import SafePathSelector
+from cloud_ml.topology_store import EdgeChange, TopologyStore
+
+
+class _Entry:
+    __slots__ = ("lineage", "version", "result", "edges", "from_source", "to_target", "added")
+
+    def __init__(
+        self,
+        store: TopologyStore,
+        result: Optional[Dict[str, Any]],
+        source: Hashable,
+        target: Hashable,
+        max_hops: int,
+    ):
+        self.lineage = store.lineage
+        self.version = store.version
+        self.result = result
+        path = result["path"] if result else []
+        self.edges: Set[frozenset] = {frozenset(e) for e in zip(path[:-1], path[1:])}
+
+        # Hop distances at this version, and edges added since
+        self.from_source = store.hop_distances(source, max_hops)
+        self.to_target = store.hop_distances(target, max_hops)
+        self.added: List[Tuple[int, int]] = []
+
+
+class PathCache:
+    """
+    Memoizes SafePathSelector.select over a TopologyStore.
+
+    Entries are keyed by (store lineage, source, target, max_hops), so a
+    store and its snapshots share them, and remember the topology
+    version they were computed at. On lookup, the change log of the
+    store (or snapshot) passed in, since that version, decides whether
+    the cached best path can still be trusted:
+
+    - an edge on the path removed or worsened -> recompute
+    - an edge on the path improved -> still optimal, rescore in place
+    - an edge off the path removed or worsened -> still optimal
+    - an edge off the path added or improved -> recompute only if a path
+      through it fits in max_hops and could beat the cached score,
+      bounded by score(edge) + (max_hops - 1) * max(best edge score, 0)
+
+    Hop feasibility uses hop distances from the source / to the target
+    taken when the entry was computed, lowered conservatively for the
+    edges added since. If the change log no longer covers the entry's
+    version, it is recomputed. Anything else (networkx graphs,
+    contact-plan filtered queries whose visibility changes with time,
+    endpoints not yet in the store, snapshots older than the entry) is
+    passed straight to the selector.
+    """
+
+    def __init__(self, selector: Optional[SafePathSelector] = None, maxsize: int = 1024, max_added: int = 64):
+        self.selector = selector or SafePathSelector()
+        self.maxsize = maxsize
+        # Recompute once this many edges were added since an entry was built
+        self.max_added = max_added
+        self._entries: "OrderedDict[Tuple, _Entry]" = OrderedDict()
+        # Heads may call select() from executor threads
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.revalidations = 0
+        self.evictions = 0
+        self.bypassed = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # -------------------- Validation --------------------
+
+    @staticmethod
+    def _lower_hops(base: np.ndarray, added: List[Tuple[int, int]], nodes: Set[int], limit: int) -> Dict[int, int]:
+        """
+        Lower bounds on the current hop distance of `nodes`, given the
+        distances at the entry's version and the edges added since. A
+        path either avoids the added edges, or leaves the last one it
+        uses at one of its endpoints (then one more hop unless that
+        endpoint is the node itself).
+        """
+        ends = {x for edge in added for x in edge}
+        hops = {x: int(base[x]) if x < len(base) else limit for x in nodes | ends}
+
+        for _ in range(limit):
+            via = min((min(hops[p], hops[q]) + 1 for p, q in added), default=limit)
+            changed = False
+            for x in hops:
+                best = min(
+                    [hops[x], via + 1]
+                    + [hops[p] + 1 for p, q in added if q == x]
+                    + [hops[q] + 1 for p, q in added if p == x]
+                )
+                if best < hops[x]:
+                    hops[x] = best
+                    changed = True
+            if not changed:
+                break
+        return hops
+
+    def _reachable(self, entry: _Entry, a: int, b: int, max_hops: int) -> bool:
+        limit = max_hops + 1
+        near = self._lower_hops(entry.from_source, entry.added, {a, b}, limit)
+        far = self._lower_hops(entry.to_target, entry.added, {a, b}, limit)
+        return min(near[a] + 1 + far[b], near[b] + 1 + far[a]) <= max_hops
+
+    def _still_valid(self, entry: _Entry, store: TopologyStore, changes: List[EdgeChange], max_hops: int) -> bool:
+        # Cached scores are rounded to 3 decimals; compare with that much slack
+        cached = entry.result["score"] - 1e-3 if entry.result else float("-inf")
+        best_edge = None
+        rescore = False
+
+        for change in changes:
+            if change.op == "add":
+                entry.added.append((store.index[change.u], store.index[change.v]))
+        if len(entry.added) > self.max_added:
+            return False
+
+        for change in changes:
+            on_path = frozenset((change.u, change.v)) in entry.edges
+            before = float("-inf") if change.score_before is None else change.score_before
+            after = float("-inf") if change.score_after is None else change.score_after
+
+            if on_path:
+                if after < before:
+                    return False
+                rescore = True
+            elif after > before:
+                if best_edge is None:
+                    best_edge = max(store.max_edge_score(), 0.0)
+                if after + (max_hops - 1) * best_edge <= cached:
+                    continue
+                if self._reachable(entry, store.index[change.u], store.index[change.v], max_hops):
+                    return False
+
+        if rescore:
+            entry.result = {**entry.result, "score": store.score_path(entry.result["path"])}
+        return True
+
+    # -------------------- Lookup --------------------
+
+    def select(
+        self,
+        graph: Any,
+        source: Hashable,
+        target: Hashable,
+        at_time: Optional[float] = None,
+    ) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._select(graph, source, target, at_time)
+
+    def _select(self, graph: Any, source: Hashable, target: Hashable, at_time: Optional[float]) -> Optional[Dict[str, Any]]:
+        selector = self.selector
+        if (
+            not isinstance(graph, TopologyStore)
+            or (selector.contact_plan is not None and at_time is not None)
+            # Hop distances need both endpoints anchored in the store
+            or source not in graph.index
+            or target not in graph.index
+        ):
+            self.bypassed += 1
+            return selector.select(graph, source, target, at_time)
+
+        key = (graph.lineage, source, target, selector.max_hops)
+        entry = self._entries.get(key)
+
+        if entry is not None and graph.version < entry.version:
+            # A snapshot older than the entry (e.g. a late head): answer it uncached
+            self.bypassed += 1
+            return selector.select(graph, source, target)
+
+        if entry is not None:
+            if entry.version == graph.version:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry.result
+
+            changes = graph.changes_since(entry.version)
+            if changes is not None and self._still_valid(entry, graph, changes, selector.max_hops):
+                entry.version = graph.version
+                self.hits += 1
+                self.revalidations += 1
+                self._entries.move_to_end(key)
+                return entry.result
+
+            self.invalidations += 1
+
+        self.misses += 1
+        result = selector.select(graph, source, target)
+        self._entries[key] = _Entry(graph, result, source, target, selector.max_hops)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "revalidations": self.revalidations,
+            "evictions": self.evictions,
+            "bypassed": self.bypassed,
+        }
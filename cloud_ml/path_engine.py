@@ -0,0 +1,302 @@
+import heapq
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import networkx as nx
+import numpy as np
+
+
+EDGE_ATTRIBUTES = ("latency", "stability", "switch_cost")
+
+# Float slack when comparing path costs against lower bounds
+_EPS = 1e-9
+
+
+class PathEngine:
+    """
+    Hop-bounded best path search over a CSR adjacency.
+
+    A path's score is the sum over its edges of
+    stability - latency - switch_cost (as in SafePathSelector), i.e.
+    the best path minimizes the additive cost latency + switch_cost -
+    stability using at most `max_hops` edges.
+
+    Search works on (node, hops) labels: one vectorized relaxation pass
+    per hop layer gives, for every node, the cheapest cost to reach the
+    target within h hops. That is exact for simple paths whenever the
+    cheapest walk is simple (always the case for nonnegative costs, once
+    zero-cost cycles are cut). With negative edge costs a walk may loop,
+    and the search falls back to a branch and bound enumeration of
+    simple paths, pruned by the same per-layer bounds.
+    """
+
+    def __init__(
+        self,
+        nodes: Sequence[Hashable],
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        weight: np.ndarray,
+    ):
+        """
+        nodes: node names; indptr/indices: CSR arcs (both directions for
+        undirected graphs); weight: per-arc score (higher is better).
+        """
+        self.nodes = list(nodes)
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.weight = np.asarray(weight, dtype=float)
+        self.cost = -self.weight
+
+        self.tail = np.repeat(np.arange(len(self.nodes)), np.diff(self.indptr))
+        self.nonnegative = bool(np.all(self.cost >= 0))
+
+    @classmethod
+    def from_networkx(cls, graph: nx.Graph) -> "PathEngine":
+        nodes = list(graph.nodes)
+        index = {node: i for i, node in enumerate(nodes)}
+
+        tails, heads, weights = [], [], []
+        for u, v, edge in graph.edges(data=True):
+            latency = edge.get("latency", 0)
+            stability = edge.get("stability", 0)
+            switch_cost = edge.get("switch_cost", 0)
+            w = stability - latency - switch_cost
+
+            tails.append(index[u])
+            heads.append(index[v])
+            weights.append(w)
+            if not graph.is_directed():
+                tails.append(index[v])
+                heads.append(index[u])
+                weights.append(w)
+
+        tails = np.asarray(tails, dtype=np.int64)
+        order = np.argsort(tails, kind="stable")
+        indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(tails, minlength=len(nodes)), out=indptr[1:])
+
+        return cls(nodes, indptr, np.asarray(heads, dtype=np.int64)[order], np.asarray(weights, dtype=float)[order])
+
+    # -------------------- Bounds --------------------
+
+    def _bounds(self, target: int, max_hops: int, arc_mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        (max_hops + 1, N) array: cheapest cost from each node to the
+        target using at most h arcs. The target is absorbing (paths end
+        the first time they reach it).
+        """
+        n = len(self.nodes)
+        cost = self.cost if arc_mask is None else np.where(arc_mask, self.cost, np.inf)
+        # Rows of nodes that have at least one arc; reduceat needs non-empty segments
+        rows = np.flatnonzero(np.diff(self.indptr) > 0)
+
+        bounds = np.full((max_hops + 1, n), np.inf)
+        bounds[0, target] = 0.0
+
+        for h in range(1, max_hops + 1):
+            layer = bounds[h - 1].copy()
+            if len(rows):
+                via = cost + bounds[h - 1][self.indices]
+                best = np.minimum.reduceat(via, self.indptr[rows])
+                layer[rows] = np.minimum(layer[rows], best)
+            layer[target] = 0.0
+            bounds[h] = layer
+
+        return bounds
+
+    # -------------------- Search --------------------
+
+    def path_score(self, path: Sequence[int]) -> float:
+        score = 0.0
+        for u, v in zip(path[:-1], path[1:]):
+            score += float(self.weight[self._arc(u, v)])
+        return score
+
+    def _arc(self, u: int, v: int, arc_mask: Optional[np.ndarray] = None) -> int:
+        """
+        Best usable arc u -> v (parallel arcs keep the highest score).
+        """
+        lo, hi = self.indptr[u], self.indptr[u + 1]
+        arcs = lo + np.flatnonzero(self.indices[lo:hi] == v)
+        if arc_mask is not None:
+            arcs = arcs[arc_mask[arcs]]
+        return int(arcs[np.argmax(self.weight[arcs])])
+
+    def _walk(self, source: int, target: int, bounds: np.ndarray, cost: np.ndarray) -> List[int]:
+        """
+        Follow the per-layer bounds from source to target.
+        """
+        walk = [source]
+        u, h = source, len(bounds) - 1
+
+        while u != target:
+            lo, hi = self.indptr[u], self.indptr[u + 1]
+            via = cost[lo:hi] + bounds[h - 1][self.indices[lo:hi]]
+            u = int(self.indices[lo + int(np.argmin(via))])
+            walk.append(u)
+            h -= 1
+
+        return walk
+
+    @staticmethod
+    def _cut_cycles(walk: List[int]) -> List[int]:
+        path, seen = [], {}
+        for node in walk:
+            if node in seen:
+                del path[seen[node] + 1:]
+                seen = {n: i for i, n in enumerate(path)}
+            else:
+                seen[node] = len(path)
+                path.append(node)
+        return path
+
+    def _branch_and_bound(
+        self,
+        source: int,
+        target: int,
+        bounds: np.ndarray,
+        cost: np.ndarray,
+        banned: Optional[np.ndarray],
+    ) -> Optional[List[int]]:
+        """
+        Exact search over simple paths, pruning any prefix whose cost
+        plus the remaining-hop bound cannot beat the best path so far.
+        """
+        max_hops = len(bounds) - 1
+        best_cost = np.inf
+        best_path = None
+
+        visited = np.zeros(len(self.nodes), dtype=bool) if banned is None else banned.copy()
+        visited[source] = True
+        path = [source]
+
+        def extend(u: int, spent: float) -> None:
+            nonlocal best_cost, best_path
+            hops_left = max_hops - (len(path) - 1)
+            lo, hi = self.indptr[u], self.indptr[u + 1]
+
+            heads = self.indices[lo:hi]
+            arc_cost = cost[lo:hi]
+            reach = spent + arc_cost + bounds[hops_left - 1][heads]
+            # Most promising first, so good paths tighten the bound early
+            for j in np.argsort(reach, kind="stable"):
+                if reach[j] >= best_cost - _EPS:
+                    break
+                v = int(heads[j])
+                if visited[v]:
+                    continue
+                if v == target:
+                    best_cost = spent + arc_cost[j]
+                    best_path = path + [v]
+                    continue
+                visited[v] = True
+                path.append(v)
+                extend(v, spent + arc_cost[j])
+                path.pop()
+                visited[v] = False
+
+        if max_hops > 0:
+            extend(source, 0.0)
+        return best_path
+
+    def _best(
+        self,
+        source: int,
+        target: int,
+        max_hops: int,
+        arc_mask: Optional[np.ndarray] = None,
+        banned: Optional[np.ndarray] = None,
+    ) -> Optional[List[int]]:
+        """
+        Cheapest simple source -> target path within max_hops arcs, as
+        node indices. Arcs off in arc_mask and nodes in banned are skipped.
+        """
+        if source == target or max_hops <= 0:
+            return None
+
+        if banned is not None:
+            usable = ~banned[self.tail] & ~banned[self.indices]
+            arc_mask = usable if arc_mask is None else arc_mask & usable
+        cost = self.cost if arc_mask is None else np.where(arc_mask, self.cost, np.inf)
+
+        bounds = self._bounds(target, max_hops, arc_mask)
+        if not np.isfinite(bounds[max_hops, source]):
+            return None
+
+        walk = self._walk(source, target, bounds, cost)
+        if len(set(walk)) == len(walk):
+            return walk
+        if self.nonnegative:
+            return self._cut_cycles(walk)
+        return self._branch_and_bound(source, target, bounds, cost, banned)
+
+    def _result(self, path: List[int]) -> Dict[str, Any]:
+        return {
+            "path": [self.nodes[i] for i in path],
+            "score": round(self.path_score(path), 3),
+        }
+
+    def best_path(self, source: Hashable, target: Hashable, max_hops: int = 4) -> Optional[Dict[str, Any]]:
+        """
+        Highest scoring simple path with at most max_hops edges, or None.
+        """
+        if source not in self.index or target not in self.index:
+            return None
+        path = self._best(self.index[source], self.index[target], max_hops)
+        return None if path is None else self._result(path)
+
+    def k_best_paths(
+        self,
+        source: Hashable,
+        target: Hashable,
+        k: int,
+        max_hops: int = 4,
+    ) -> List[Dict[str, Any]]:
+        """
+        Top k simple paths by score (Yen's algorithm), best first.
+        """
+        if source not in self.index or target not in self.index:
+            return []
+        s, t = self.index[source], self.index[target]
+
+        first = self._best(s, t, max_hops)
+        if first is None:
+            return []
+
+        accepted: List[List[int]] = [first]
+        seen = {tuple(first)}
+        candidates: List[Tuple[float, int, List[int]]] = []
+        counter = 0
+
+        while len(accepted) < k:
+            last = accepted[-1]
+
+            for i in range(len(last) - 1):
+                spur, root = last[i], last[:i + 1]
+
+                # Arcs already used by accepted paths sharing this root
+                arc_mask = np.ones(len(self.indices), dtype=bool)
+                for path in accepted:
+                    if path[:i + 1] == root and len(path) > i + 1:
+                        lo, hi = self.indptr[spur], self.indptr[spur + 1]
+                        arc_mask[lo + np.flatnonzero(self.indices[lo:hi] == path[i + 1])] = False
+
+                banned = np.zeros(len(self.nodes), dtype=bool)
+                banned[root[:-1]] = True
+
+                tail = self._best(spur, t, max_hops - i, arc_mask, banned)
+                if tail is None:
+                    continue
+
+                path = root[:-1] + tail
+                if tuple(path) in seen:
+                    continue
+                seen.add(tuple(path))
+                counter += 1
+                heapq.heappush(candidates, (-self.path_score(path), counter, path))
+
+            if not candidates:
+                break
+            accepted.append(heapq.heappop(candidates)[2])
+
+        return [self._result(path) for path in accepted]
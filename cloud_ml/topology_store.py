@@ -0,0 +1,536 @@
+import itertools
+from collections import deque
+from typing import Any, Deque, Dict, Hashable, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+import networkx as nx
+import numpy as np
+
+from cloud_ml.path_engine import EDGE_ATTRIBUTES, PathEngine
+from core_types import TelemetryBatch, TelemetryPacket
+
+
+EdgeKey = Tuple[int, int]
+
+# Identifies a store and its snapshots (see TopologyStore.lineage)
+_lineages = itertools.count()
+
+
+class EdgeChange(NamedTuple):
+    """
+    One entry of the change log. Scores are stability - latency -
+    switch_cost before and after the change (None if the edge did not
+    exist on that side).
+    """
+    version: int
+    op: str  # "add" | "remove" | "update"
+    u: Hashable
+    v: Hashable
+    score_before: Optional[float]
+    score_after: Optional[float]
+
+
+class TopologyStore:
+    """
+    Live constellation topology as edge columns plus a CSR adjacency.
+
+    Edges live in a columnar table (endpoints, latency, stability,
+    switch_cost, alive flag) that add / remove / update deltas modify in
+    place; the CSR arrays used for path search are rebuilt lazily, in
+    one vectorized pass, only when a query sees a new version. Each
+    applied delta bumps `version` and is recorded in a bounded change log.
+
+    Edges are undirected. Edges coming from telemetry are owned by their
+    origin (e.g. the reporting link), so a chain that stops listing an
+    edge removes it unless another origin still reports it.
+
+    snapshot() gives a read-only copy of the current version for readers
+    that may still run while the store is updated (inference heads that
+    outlive their tick, process pools). It shares `lineage` with the
+    store, so caches keyed by lineage carry across versions.
+    """
+
+    def __init__(
+        self,
+        latency: float = 25.0,
+        stability: float = 7.0,
+        switch_cost: float = 1.0,
+        capacity: int = 64,
+        log_size: int = 4096,
+    ):
+        # Attributes for edges reported without any
+        self.defaults = {"latency": latency, "stability": stability, "switch_cost": switch_cost}
+
+        self.nodes: List[Hashable] = []
+        self.index: Dict[Hashable, int] = {}
+
+        self._u = np.zeros(capacity, dtype=np.int64)
+        self._v = np.zeros(capacity, dtype=np.int64)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self.columns: Dict[str, np.ndarray] = {name: np.zeros(capacity) for name in EDGE_ATTRIBUTES}
+        self._rows: Dict[EdgeKey, int] = {}
+        self._free: List[int] = []
+        self._size = 0
+
+        self._owners: Dict[EdgeKey, Set[Hashable]] = {}
+        self._origins: Dict[Hashable, Set[EdgeKey]] = {}
+        # Sorted edge codes last applied per batch origin
+        self._batch_codes: Dict[Hashable, np.ndarray] = {}
+        self._id_tables: Dict[str, np.ndarray] = {}
+
+        self.version = 0
+        self.changes: Deque[EdgeChange] = deque(maxlen=log_size)
+        # Version of the newest change pushed out of the log; changes
+        # after it are all retained
+        self._log_floor = 0
+        self._pending: List[Tuple[str, EdgeKey, Optional[float], Optional[float]]] = []
+
+        self._csr: Optional[Tuple[int, np.ndarray, np.ndarray, np.ndarray]] = None
+        self._engine: Optional[Tuple[int, PathEngine]] = None
+
+        self.lineage = next(_lineages)
+        self.frozen = False
+        self._snapshot: Optional["TopologyStore"] = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def number_of_nodes(self) -> int:
+        return len(self.nodes)
+
+    def number_of_edges(self) -> int:
+        return len(self._rows)
+
+    # -------------------- Edge table --------------------
+
+    def _writable(self) -> None:
+        if self.frozen:
+            raise TypeError("TopologyStore snapshot is read-only")
+
+    def add_node(self, node: Hashable) -> int:
+        i = self.index.get(node)
+        if i is None:
+            self._writable()
+            i = self.index[node] = len(self.nodes)
+            self.nodes.append(node)
+        return i
+
+    def _key(self, u: Hashable, v: Hashable, create: bool = False) -> Optional[EdgeKey]:
+        if create:
+            a, b = self.add_node(u), self.add_node(v)
+        else:
+            a, b = self.index.get(u), self.index.get(v)
+            if a is None or b is None:
+                return None
+        return (a, b) if a <= b else (b, a)
+
+    def _row_score(self, row: int) -> float:
+        c = self.columns
+        return float(c["stability"][row] - c["latency"][row] - c["switch_cost"][row])
+
+    def _grow(self) -> None:
+        capacity = 2 * len(self._alive)
+        self._u = np.resize(self._u, capacity)
+        self._v = np.resize(self._v, capacity)
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:len(self._alive)] = self._alive
+        self._alive = alive
+        for name, column in self.columns.items():
+            self.columns[name] = np.resize(column, capacity)
+
+    def _set(self, key: EdgeKey, attrs: Dict[str, Any], owner: Hashable) -> None:
+        self._writable()
+        row = self._rows.get(key)
+        before = None
+
+        if row is None:
+            if self._free:
+                row = self._free.pop()
+            else:
+                if self._size == len(self._alive):
+                    self._grow()
+                row = self._size
+                self._size += 1
+            self._rows[key] = row
+            self._u[row], self._v[row] = key
+            self._alive[row] = True
+            for name in EDGE_ATTRIBUTES:
+                self.columns[name][row] = attrs.get(name, self.defaults[name])
+            op = "add"
+        else:
+            before = self._row_score(row)
+            for name in EDGE_ATTRIBUTES:
+                if name in attrs:
+                    self.columns[name][row] = attrs[name]
+            op = "update"
+
+        self._owners.setdefault(key, set()).add(owner)
+        if owner is not None:
+            self._origins.setdefault(owner, set()).add(key)
+
+        after = self._row_score(row)
+        if op == "add" or after != before:
+            self._pending.append((op, key, before, after))
+
+    def _drop(self, key: EdgeKey) -> None:
+        self._writable()
+        row = self._rows.pop(key, None)
+        if row is None:
+            return
+        before = self._row_score(row)
+        self._alive[row] = False
+        self._free.append(row)
+        for owner in self._owners.pop(key, ()):
+            if owner is not None:
+                self._origins.get(owner, set()).discard(key)
+        self._pending.append(("remove", key, before, None))
+
+    def _commit(self) -> int:
+        """
+        Publish pending edge changes as one new version.
+        """
+        if not self._pending:
+            return 0
+        self.version += 1
+        changes = self.changes
+        for op, (a, b), before, after in self._pending:
+            if len(changes) == changes.maxlen:
+                self._log_floor = changes[0].version
+            changes.append(EdgeChange(self.version, op, self.nodes[a], self.nodes[b], before, after))
+        count = len(self._pending)
+        self._pending = []
+        return count
+
+    # -------------------- Deltas --------------------
+
+    def add_edge(self, u: Hashable, v: Hashable, **attrs) -> None:
+        self._set(self._key(u, v, create=True), attrs, None)
+        self._commit()
+
+    def update_edge(self, u: Hashable, v: Hashable, **attrs) -> None:
+        key = self._key(u, v)
+        if key is None or key not in self._rows:
+            raise KeyError((u, v))
+        self._set(key, attrs, None)
+        self._commit()
+
+    def remove_edge(self, u: Hashable, v: Hashable) -> None:
+        key = self._key(u, v)
+        if key is not None:
+            self._drop(key)
+        self._commit()
+
+    def has_edge(self, u: Hashable, v: Hashable) -> bool:
+        return self._key(u, v) in self._rows
+
+    def edge(self, u: Hashable, v: Hashable) -> Dict[str, float]:
+        row = self._rows[self._key(u, v)]
+        return {name: float(self.columns[name][row]) for name in EDGE_ATTRIBUTES}
+
+    @staticmethod
+    def _edge_spec(spec) -> Tuple[Hashable, Hashable, Dict[str, Any]]:
+        if isinstance(spec, dict):
+            return spec["u"], spec["v"], {k: spec[k] for k in EDGE_ATTRIBUTES if k in spec}
+        u, v, *rest = spec
+        return u, v, dict(rest[0]) if rest else {}
+
+    def apply_delta(
+        self,
+        added: Iterable = (),
+        removed: Iterable = (),
+        updated: Iterable = (),
+        origin: Hashable = None,
+    ) -> int:
+        """
+        Apply one delta as a single version. Edges are (u, v),
+        (u, v, attrs) or {"u", "v", latency, ...} dicts. Returns the
+        number of effective changes.
+        """
+        for spec in removed:
+            u, v, _ = self._edge_spec(spec)
+            key = self._key(u, v)
+            if key is not None:
+                self._drop(key)
+        for spec in added:
+            u, v, attrs = self._edge_spec(spec)
+            self._set(self._key(u, v, create=True), attrs, origin)
+        for spec in updated:
+            u, v, attrs = self._edge_spec(spec)
+            key = self._key(u, v)
+            if key in self._rows:
+                self._set(key, attrs, origin)
+        return self._commit()
+
+    def _sync_origin(
+        self,
+        origin: Hashable,
+        keys: Set[EdgeKey],
+        added: Optional[Set[EdgeKey]] = None,
+        removed: Optional[Set[EdgeKey]] = None,
+    ) -> None:
+        """
+        Make `origin` report exactly `keys`: new ones are added with
+        default attributes, edges it no longer reports lose that owner.
+        `added` / `removed` skip the diff when the caller already has it.
+        """
+        current = self._origins.setdefault(origin, set())
+        for key in (keys - current) if added is None else added:
+            self._set(key, {}, origin)
+        for key in (current - keys) if removed is None else removed:
+            owners = self._owners.get(key, set())
+            owners.discard(origin)
+            current.discard(key)
+            if not owners:
+                self._drop(key)
+
+    def apply_payload(self, payload: Dict[str, Any], origin: Hashable = "topology") -> int:
+        """
+        Apply a topology payload. "active_links" is the current chain of
+        nodes reported by `origin`; "added_links", "removed_links" and
+        "updated_links" are explicit deltas.
+        """
+        chain = payload.get("active_links")
+        if chain is not None:
+            chain = [n for n in chain if n not in (None, "", b"")]
+            keys = {self._key(u, v, create=True) for u, v in zip(chain[:-1], chain[1:]) if u != v}
+            self._sync_origin(origin, keys)
+
+        explicit = [payload.get(name, ()) for name in ("added_links", "removed_links", "updated_links")]
+        if any(explicit):
+            return self.apply_delta(*explicit, origin=origin)
+        return self._commit()
+
+    def apply_packet(self, packet: TelemetryPacket) -> int:
+        if packet.source != "topology":
+            return 0
+        origin = "topology" if packet.link_id is None else ("link", packet.link_id)
+        return self.apply_payload(packet.payload, origin)
+
+    def apply_batch(
+        self,
+        batch: TelemetryBatch,
+        satellites: np.ndarray,
+        sat_name: str = "SAT-{}",
+        gateway_name: str = "GW-{}",
+    ) -> int:
+        """
+        Apply a columnar topology batch: each valid row links its
+        satellite (satellites[row]) to isl_prev, isl_next and its
+        gateway. The batch as a whole is one origin.
+        """
+        rows = np.flatnonzero(batch.valid)
+        sats = np.asarray(satellites, dtype=np.int64)[rows]
+
+        def node_ids(ids: np.ndarray, name: str) -> np.ndarray:
+            # Raw id -> node index lookup table per name pattern; only
+            # ids not seen before are formatted and added
+            table = self._id_tables.get(name, np.empty(0, dtype=np.int64))
+            if len(ids) and ids.max() >= len(table):
+                table = np.concatenate([table, np.full(int(ids.max()) + 1 - len(table), -1, dtype=np.int64)])
+            for i in np.unique(ids[table[ids] < 0]):
+                table[i] = self.add_node(name.format(int(i)))
+            self._id_tables[name] = table
+            return table[ids]
+
+        ends = []
+        for column, name in (("isl_prev", sat_name), ("isl_next", sat_name), ("gateway", gateway_name)):
+            if column in batch.columns:
+                peers = np.broadcast_to(batch.columns[column], batch.valid.shape)[rows].astype(np.int64)
+                ends.append(np.column_stack([node_ids(sats, sat_name), node_ids(peers, name)]))
+        if not ends:
+            return 0
+
+        ends = np.sort(np.vstack(ends), axis=1)
+        ends = ends[ends[:, 0] != ends[:, 1]]
+        codes = np.unique(ends[:, 0] << 32 | ends[:, 1])
+
+        origin = ("batch", batch.source)
+        previous = self._batch_codes.get(origin, np.empty(0, dtype=np.int64))
+        if np.array_equal(codes, previous):
+            return 0
+        self._batch_codes[origin] = codes
+
+        def keys(values: np.ndarray) -> Set[EdgeKey]:
+            return {(int(c >> 32), int(c & 0xFFFFFFFF)) for c in values}
+
+        self._sync_origin(origin, keys(codes), keys(np.setdiff1d(codes, previous)), keys(np.setdiff1d(previous, codes)))
+        return self._commit()
+
+    # -------------------- Snapshots --------------------
+
+    def snapshot(self) -> "TopologyStore":
+        """
+        Read-only copy of the current version (edge table, nodes and
+        change log; no ownership bookkeeping). Taken once per version and
+        node count, so unchanged ticks share one snapshot and its CSR.
+        """
+        if self.frozen:
+            return self
+        cached = self._snapshot
+        if cached is not None and cached.version == self.version and len(cached.nodes) == len(self.nodes):
+            return cached
+
+        size = self._size
+        snap = TopologyStore.__new__(TopologyStore)
+        snap.defaults = dict(self.defaults)
+        snap.nodes = list(self.nodes)
+        snap.index = dict(self.index)
+        snap._u = self._u[:size].copy()
+        snap._v = self._v[:size].copy()
+        snap._alive = self._alive[:size].copy()
+        snap.columns = {name: column[:size].copy() for name, column in self.columns.items()}
+        snap._rows = dict(self._rows)
+        snap._free = []
+        snap._size = size
+        snap._owners, snap._origins, snap._batch_codes, snap._id_tables = {}, {}, {}, {}
+        snap.version = self.version
+        snap.changes = deque(self.changes, maxlen=self.changes.maxlen)
+        snap._log_floor = self._log_floor
+        snap._pending = []
+        # CSR / engine arrays are rebuilt, never modified, so they can be shared
+        snap._csr, snap._engine = self._csr, self._engine
+        snap.lineage = self.lineage
+        snap.frozen = True
+        snap._snapshot = None
+        self._snapshot = snap
+        return snap
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Derived arrays are rebuilt on demand; not worth pickling
+        return {**self.__dict__, "_csr": None, "_engine": None, "_snapshot": None}
+
+    # -------------------- Compact form --------------------
+
+    def csr(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (indptr, indices, arc_edge) over live edges, both directions;
+        arc_edge maps each arc to its row in the edge columns.
+        """
+        if self._csr is not None and self._csr[0] == self.version:
+            return self._csr[1:]
+
+        rows = np.flatnonzero(self._alive[:self._size])
+        tails = np.concatenate([self._u[rows], self._v[rows]])
+        heads = np.concatenate([self._v[rows], self._u[rows]])
+        arc_edge = np.concatenate([rows, rows])
+
+        order = np.argsort(tails, kind="stable")
+        indptr = np.zeros(len(self.nodes) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(tails, minlength=len(self.nodes)), out=indptr[1:])
+
+        self._csr = (self.version, indptr, heads[order], arc_edge[order])
+        return self._csr[1:]
+
+    def edge_scores(self) -> np.ndarray:
+        """
+        Per-row QoS score stability - latency - switch_cost (dead rows included).
+        """
+        c = self.columns
+        return c["stability"][:self._size] - c["latency"][:self._size] - c["switch_cost"][:self._size]
+
+    def hop_distances(self, node: Hashable, max_hops: int) -> np.ndarray:
+        """
+        Hop count from `node` to every node (max_hops + 1 beyond max_hops).
+        """
+        indptr, indices, _ = self.csr()
+        n = len(self.nodes)
+        dist = np.full(n, max_hops + 1, dtype=np.int64)
+        if node not in self.index:
+            return dist
+
+        tail = np.repeat(np.arange(n), np.diff(indptr))
+        frontier = np.zeros(n, dtype=bool)
+        frontier[self.index[node]] = True
+        dist[self.index[node]] = 0
+
+        for h in range(1, max_hops + 1):
+            reached = np.zeros(n, dtype=bool)
+            reached[indices[frontier[tail]]] = True
+            frontier = reached & (dist > max_hops)
+            if not frontier.any():
+                break
+            dist[frontier] = h
+        return dist
+
+    def max_edge_score(self) -> float:
+        scores = self.edge_scores()[self._alive[:self._size]]
+        return float(scores.max()) if len(scores) else float("-inf")
+
+    def engine(self, edge_mask: Optional[np.ndarray] = None) -> PathEngine:
+        """
+        PathEngine over the current version, sharing the CSR arrays.
+        edge_mask (per edge row) hides edges, e.g. those not visible.
+        """
+        if edge_mask is None and self._engine is not None and self._engine[0] == self.version:
+            return self._engine[1]
+
+        indptr, indices, arc_edge = self.csr()
+        weight = self.edge_scores()[arc_edge]
+        if edge_mask is not None:
+            weight = np.where(np.asarray(edge_mask)[arc_edge], weight, -np.inf)
+
+        engine = PathEngine(self.nodes, indptr, indices, weight)
+        if edge_mask is None:
+            self._engine = (self.version, engine)
+        return engine
+
+    def best_path(self, source: Hashable, target: Hashable, max_hops: int = 4) -> Optional[Dict[str, Any]]:
+        return self.engine().best_path(source, target, max_hops)
+
+    def k_best_paths(self, source: Hashable, target: Hashable, k: int, max_hops: int = 4) -> List[Dict[str, Any]]:
+        return self.engine().k_best_paths(source, target, k, max_hops)
+
+    def score_path(self, path: Sequence[Hashable]) -> Optional[float]:
+        """
+        Score of an explicit path, or None if any of its edges is gone.
+        """
+        scores = self.edge_scores()
+        score = 0.0
+        for u, v in zip(path[:-1], path[1:]):
+            row = self._rows.get(self._key(u, v))
+            if row is None:
+                return None
+            score += float(scores[row])
+        return round(score, 3)
+
+    def edges(self) -> Iterable[Tuple[Hashable, Hashable, int]]:
+        """
+        Live edges as (u, v, row).
+        """
+        for (a, b), row in self._rows.items():
+            yield self.nodes[a], self.nodes[b], row
+
+    def changes_since(self, version: int) -> Optional[List[EdgeChange]]:
+        """
+        Changes after `version`, or None if the log no longer reaches back
+        that far (including when only part of a version's changes is left).
+        """
+        if version >= self.version:
+            return []
+        if version < self._log_floor or not self.changes or self.changes[0].version > version + 1:
+            return None
+        recent = []
+        for change in reversed(self.changes):
+            if change.version <= version:
+                break
+            recent.append(change)
+        recent.reverse()
+        return recent
+
+    def to_networkx(self) -> nx.Graph:
+        graph = nx.Graph()
+        graph.add_nodes_from(self.nodes)
+        for u, v, row in self.edges():
+            graph.add_edge(u, v, **{name: float(self.columns[name][row]) for name in EDGE_ATTRIBUTES})
+        return graph
+
+    @classmethod
+    def from_networkx(cls, graph: nx.Graph, **kwargs) -> "TopologyStore":
+        store = cls(**kwargs)
+        for node in graph.nodes:
+            store.add_node(node)
+        # Missing attributes count as 0, as in SafePathSelector
+        store.apply_delta(added=[
+            (u, v, {name: data.get(name, 0) for name in EDGE_ATTRIBUTES})
+            for u, v, data in graph.edges(data=True)
+        ])
+        return store
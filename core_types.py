@@ -1,14 +1,27 @@
 # core_types.py (conceptual, no need separate file yet)
 
 from dataclasses import dataclass
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 import time
 
+import numpy as np
+
 @dataclass
 class TelemetryPacket:
     timestamp: float          # source timestamp
     source: str               # geometry / rf / topology / env
     payload: Dict[str, Any]   # actual data
+    link_id: Optional[int] = None   # None for the single-link demo stream
+
+
+@dataclass
+class TelemetryBatch:
+    time: float                     # tick time (simulated clock)
+    source: str                     # geometry / beam / rf / topology / environment
+    link_ids: np.ndarray            # (n,) int link ids
+    timestamps: np.ndarray          # (n,) per-link source timestamps (skewed)
+    valid: np.ndarray               # (n,) False where the packet was dropped
+    columns: Dict[str, np.ndarray]  # one (n,) array per payload field
 
 
 @dataclass
@@ -19,3 +32,85 @@ class AlignedState:
     beam: Dict[str, Any]
     topology: Dict[str, Any]
     environment: Dict[str, Any]
+
+
+# Columns carried by batched telemetry and AlignedStateBatch, per source
+BATCH_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "geometry": ("sat_pos_x", "sat_pos_y", "sat_pos_z", "sat_vel_x", "sat_vel_y", "sat_vel_z"),
+    "beam": ("beam_offset", "beam_radius"),
+    "rf": ("snr", "doppler", "timing_drift"),
+    "topology": ("isl_prev", "isl_next", "gateway"),
+    "environment": ("attenuation",),
+}
+
+# Fill value of integer columns for links a source has not reported yet
+# (float columns use NaN)
+MISSING_ID = -1
+
+
+class AlignedStateBatch:
+    """
+    Struct-of-arrays aligned state for many links at one tick.
+    One NumPy column per feature, row i belongs to link_ids[i].
+    """
+
+    __slots__ = ("time", "link_ids", "columns", "_rows")
+
+    def __init__(self, time: float, link_ids: np.ndarray, columns: Dict[str, np.ndarray]):
+        self.time = time
+        self.link_ids = link_ids
+        self.columns = columns
+        self._rows: Optional[Dict[int, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.link_ids)
+
+    def column(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def get(self, name: str, default: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        return self.columns.get(name, default)
+
+    def row(self, link_id: int) -> int:
+        """
+        Row index of a link id.
+        """
+        if self._rows is None:
+            self._rows = {int(l): i for i, l in enumerate(self.link_ids)}
+        return self._rows[int(link_id)]
+
+    def take(self, rows: np.ndarray) -> "AlignedStateBatch":
+        """
+        Batch restricted to (and ordered by) the given rows.
+        """
+        return AlignedStateBatch(
+            self.time,
+            self.link_ids[rows],
+            {name: column[rows] for name, column in self.columns.items()},
+        )
+
+    def state(self, link_id: int) -> AlignedState:
+        """
+        Per-link AlignedState view, for code that still works on one link.
+        """
+        i = self.row(link_id)
+        payloads: Dict[str, Dict[str, Any]] = {}
+
+        for source, names in BATCH_COLUMNS.items():
+            payload = {
+                name: self.columns[name][i].item()
+                for name in names
+                if name in self.columns
+            }
+            payload = {
+                name: value for name, value in payload.items()
+                if not (isinstance(value, int) and value == MISSING_ID)
+            }
+            if source == "geometry" and payload:
+                payload = {
+                    "sat_pos": [payload.get(f"sat_pos_{c}") for c in "xyz"],
+                    "sat_vel": [payload.get(f"sat_vel_{c}") for c in "xyz"],
+                }
+            payloads[source] = payload
+
+        return AlignedState(time=self.time, **payloads)
@@ -2,23 +2,11 @@ import time
 import streamlit as st
 import networkx as nx
 
-from edge_ingestion.stream import telemetry_stream
-from edge_ingestion.time_align import TimeAligner
-
-from digital_twin.state_replica import DigitalTwinState
-from digital_twin.forward_evolution import ForwardEvolution
-from digital_twin.rtd import RTDEstimator
-
-from cloud_ml.feature_store import FeatureStore
-from cloud_ml.lstm_link_break import LinkBreakPredictor
-from cloud_ml.ann_qos_ranker import QoSRanker
-from cloud_ml.gnn_path_selector import SafePathSelector
-
-from explainability.reasoning_object import ReasoningObject
-from explainability.narrative_engine import NarrativeEngine
+from edge_ingestion.stream import PacketSource, telemetry_stream
+from pipeline.orchestrator import Pipeline, logger_sink
 
 # 🔽 NEW: logging import
-from logging_observability.logger import InferenceLogger
+from logging_observability.logger import BufferedInferenceLogger
 
 
 # -------------------- Streamlit Setup --------------------
@@ -31,21 +19,29 @@ st.title("LEO Explainable Predictive AI – Real-Time Dashboard")
 st.caption("Predictive, parallel, and explainable inference for LEO link stability")
 
 # -------------------- System Initialization --------------------
-aligner = TimeAligner()
-twin = DigitalTwinState()
-evolver = ForwardEvolution()
-rtd_estimator = RTDEstimator()
-
-features = FeatureStore()
-link_predictor = LinkBreakPredictor()
-qos_ranker = QoSRanker()
-path_selector = SafePathSelector()
-narrative_engine = NarrativeEngine()
-
-# 🔽 NEW: initialize logger ONCE
-logger = InferenceLogger()
-
-stream = telemetry_stream()
+# 🔽 NEW: initialize logger ONCE (writes on a background thread, flushed at exit)
+logger = BufferedInferenceLogger()
+
+# Demo parallel links
+candidates = [
+    {"id": "L1", "latency": 30, "bandwidth": 10, "snr": 15, "lifetime": 6},
+    {"id": "L2", "latency": 45, "bandwidth": 20, "snr": 10, "lifetime": 9},
+]
+
+# Demo topology
+G = nx.Graph()
+G.add_edge("SAT-A", "SAT-B", latency=20, stability=8, switch_cost=1)
+G.add_edge("SAT-B", "GW-1", latency=25, stability=7, switch_cost=1)
+
+# Same stage graph as the demo and the headless runner (pipeline/cli.py),
+# fed by the simulated single-link telemetry stream
+pipeline = Pipeline(
+    source=PacketSource(telemetry_stream()),
+    candidates=candidates,
+    topology=G,
+    route=("SAT-A", "GW-1"),
+    sinks=[logger_sink(logger)],
+)
 
 # -------------------- Dashboard Layout --------------------
 col1, col2 = st.columns(2)
@@ -57,63 +53,15 @@ col6 = st.container()
 if "logs" not in st.session_state:
     st.session_state.logs = []
 
-while True:
-    packet = next(stream)
-    aligned = aligner.add_packet(packet)
-
-    if aligned is None:
-        time.sleep(0.1)
-        continue
-
-    # --- Digital Twin ---
-    twin.update(aligned)
-    twin_state = twin.get_state()
-    constraints = evolver.evolve(twin_state)
-    rtd = rtd_estimator.compute(twin_state)
-
-    # --- Cloud ML ---
-    features.update(twin_state)
-    link_pred = link_predictor.predict(features)
-
-    # Demo parallel links
-    candidates = [
-        {"id": "L1", "latency": 30, "bandwidth": 10, "snr": 15, "lifetime": 6},
-        {"id": "L2", "latency": 45, "bandwidth": 20, "snr": 10, "lifetime": 9},
-    ]
-    qos = qos_ranker.rank(candidates)
-
-    # Demo topology
-    G = nx.Graph()
-    G.add_edge("SAT-A", "SAT-B", latency=20, stability=8, switch_cost=1)
-    G.add_edge("SAT-B", "GW-1", latency=25, stability=7, switch_cost=1)
-
-    path = path_selector.select(G, "SAT-A", "GW-1")
-
-    # --- Explainability ---
-    reasoning = ReasoningObject(
-        link_prediction=link_pred,
-        qos_ranking=qos,
-        path_selection=path,
-        twin_constraints=constraints,
-        rtd=rtd
-    )
-
-    reasoning_dict = reasoning.as_dict()
-    narrative = narrative_engine.generate(reasoning_dict)
-
-    # -------------------- 🔽 LOGGING (THIS IS THE CODE YOU ASKED ABOUT) --------------------
-    logger.log(
-        aligned_state=twin_state.__dict__,
-        twin_constraints=constraints,
-        ml_outputs={
-            "link_break": link_pred,
-            "qos": qos,
-            "path": path
-        },
-        explanation=narrative,
-        rtd=rtd
-    )
-    # -----------------------------------------------------------------------
+for record in pipeline.ticks():
+    reasoning = record.reasoning
+    link_state = record.link_state()
+    constraints = reasoning["twin_constraints"]
+    rtd = reasoning["uncertainty_rtd"]
+    link_pred = reasoning["link_break_prediction"]
+    qos = reasoning["parallel_link_qos"]
+    path = reasoning["safe_path"]
+    narrative = record.narrative
 
     # --- Local observability (dashboard logs) ---
     st.session_state.logs.append({
@@ -127,9 +75,9 @@ while True:
     with col1:
         st.subheader("📡 Physical / Ingested State")
         st.json({
-            "SNR": twin_state.rf.get("snr"),
-            "Beam Offset": twin_state.beam.get("beam_offset"),
-            "Doppler": twin_state.rf.get("doppler"),
+            "SNR": link_state.get("snr"),
+            "Beam Offset": link_state.get("beam_offset"),
+            "Doppler": link_state.get("doppler"),
         })
 
     with col2:
@@ -155,4 +103,3 @@ while True:
         st.subheader("📊 Observability / Logs")
         st.table(st.session_state.logs)
 
-    time.sleep(1)
@@ -0,0 +1,320 @@
+import threading
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from digital_twin.propagator import EARTH_RADIUS_KM, OrbitPropagator
+
+
+Pair = Tuple[Hashable, Hashable]
+
+
+class ContactPlan:
+    """
+    Precomputed visibility intervals per node pair.
+
+    Satellite-to-ground (elevation above a minimum) and inter-satellite
+    (line of sight clear of the Earth, within max range) contacts are
+    sampled from the propagated orbits over a look-ahead and stored as
+    sorted interval arrays in CSR layout (one segment per pair). Point
+    and next-event queries are binary searches; extend() appends new
+    look-ahead without recomputing the past.
+
+    A contact still open at the end of the computed plan has an end of
+    inf. Queries that would report such an end first extend the plan, up
+    to `query_horizon_seconds` past the query time (default four
+    look-aheads, more than an orbit at the default); a contact still
+    open then is reported as ending at inf. Queries and extensions are
+    serialized by a lock, since heads share the plan across threads.
+
+    Like the propagator, Earth rotation is ignored, so ground stations
+    are fixed in the propagation frame.
+    """
+
+    def __init__(
+        self,
+        epoch: float,
+        satellites: Sequence[Hashable],
+        sat_pos: np.ndarray,
+        sat_vel: np.ndarray,
+        ground_stations: Optional[Dict[Hashable, Sequence[float]]] = None,
+        isl_pairs: Optional[Iterable[Pair]] = None,
+        min_elevation_deg: float = 10.0,
+        max_isl_range_km: float = 5000.0,
+        step_seconds: float = 5.0,
+        lookahead_seconds: float = 1800.0,
+        query_horizon_seconds: Optional[float] = None,
+    ):
+        self.epoch = epoch
+        self.satellites = list(satellites)
+        self.sat_index = {name: i for i, name in enumerate(self.satellites)}
+        self.propagator = OrbitPropagator(sat_pos, sat_vel)
+
+        self.ground_names = list(ground_stations or {})
+        self.ground_pos = np.asarray([ground_stations[g] for g in self.ground_names], dtype=float).reshape(-1, 3)
+
+        self.min_elevation = np.radians(min_elevation_deg)
+        self.max_isl_range = max_isl_range_km
+        self.step = step_seconds
+        self.lookahead = lookahead_seconds
+        self.query_horizon = 4 * lookahead_seconds if query_horizon_seconds is None else query_horizon_seconds
+
+        # --- Pair catalogue: all sat-ground pairs, then the ISL pairs ---
+        self.pairs: List[Pair] = [(s, g) for s in self.satellites for g in self.ground_names]
+        self.pairs += [tuple(p) for p in (isl_pairs or [])]
+        self.pair_index: Dict[Pair, int] = {}
+        for i, (a, b) in enumerate(self.pairs):
+            self.pair_index[(a, b)] = i
+            self.pair_index[(b, a)] = i
+        self.peers: Dict[Hashable, List[Tuple[Hashable, int]]] = {}
+        for i, (a, b) in enumerate(self.pairs):
+            self.peers.setdefault(a, []).append((b, i))
+            self.peers.setdefault(b, []).append((a, i))
+
+        # --- Interval index (CSR over pairs) ---
+        self.pair_ptr = np.zeros(len(self.pairs) + 1, dtype=np.int64)
+        self.starts = np.empty(0)
+        self.ends = np.empty(0)
+        self._keys = np.empty(0)
+        self.computed_until = epoch
+        self._lock = threading.RLock()
+
+        self.extend(epoch + lookahead_seconds)
+
+    # -------------------- Construction --------------------
+
+    def _margins(self, times: np.ndarray) -> np.ndarray:
+        """
+        Visibility margin per pair and sample time: > 0 means visible.
+        """
+        pos, _ = self.propagator.propagate(times - self.epoch)
+        margins = []
+
+        if len(self.ground_names):
+            # Elevation above the minimum, for every (sat, ground) pair
+            g_hat = self.ground_pos / np.linalg.norm(self.ground_pos, axis=1)[:, None]
+            d = pos[:, None, :, :] - self.ground_pos[None, :, None, :]
+            sin_el = np.einsum("sgtk,gk->sgt", d, g_hat) / np.linalg.norm(d, axis=3)
+            margins.append((np.arcsin(np.clip(sin_el, -1, 1)) - self.min_elevation).reshape(-1, len(times)))
+
+        isl = self.pairs[len(self.satellites) * len(self.ground_names):]
+        if isl:
+            a = pos[[self.sat_index[p[0]] for p in isl]]
+            b = pos[[self.sat_index[p[1]] for p in isl]]
+            d = b - a
+            dist = np.linalg.norm(d, axis=2)
+            # Closest approach of the segment a->b to the Earth's center
+            u = np.clip(-np.einsum("ptk,ptk->pt", a, d) / np.maximum(dist ** 2, 1e-9), 0, 1)
+            closest = np.linalg.norm(a + u[:, :, None] * d, axis=2)
+            margins.append(np.minimum(closest - EARTH_RADIUS_KM, self.max_isl_range - dist))
+
+        return np.vstack(margins) if margins else np.empty((0, len(times)))
+
+    def extend(self, until: float) -> None:
+        """
+        Compute contacts from the current end of the plan up to `until`.
+        """
+        with self._lock:
+            self._extend(until)
+
+    def _extend(self, until: float) -> None:
+        if until <= self.computed_until:
+            return
+
+        start = self.computed_until
+        n_steps = max(1, int(np.ceil((until - start) / self.step)))
+        times = start + np.arange(n_steps + 1) * self.step
+        margin = self._margins(times)
+
+        new_starts: List[List[float]] = [[] for _ in self.pairs]
+        new_ends: List[List[float]] = [[] for _ in self.pairs]
+
+        if margin.size:
+            visible = margin > 0
+            # Interpolated zero crossings of the margin between samples
+            change = np.diff(visible.astype(np.int8), axis=1)
+            p_idx, t_idx = np.nonzero(change)
+            m0 = margin[p_idx, t_idx]
+            m1 = margin[p_idx, t_idx + 1]
+            cross = times[t_idx] + self.step * m0 / (m0 - m1)
+
+            opened = visible[:, 0].copy()
+            open_at = np.where(opened, start, np.nan)
+            for p, c, rising in zip(p_idx, cross, change[p_idx, t_idx] > 0):
+                if rising:
+                    open_at[p] = c
+                else:
+                    new_starts[p].append(open_at[p])
+                    new_ends[p].append(c)
+                    open_at[p] = np.nan
+            # Still open at the end of the window: the end is not known yet
+            for p in np.flatnonzero(~np.isnan(open_at)):
+                new_starts[p].append(open_at[p])
+                new_ends[p].append(np.inf)
+
+        self.computed_until = float(times[-1])
+        self._merge(new_starts, new_ends, start)
+
+    def _merge(self, new_starts: List[List[float]], new_ends: List[List[float]], boundary: float) -> None:
+        starts, ends, ptr = [], [], [0]
+
+        for p in range(len(self.pairs)):
+            lo, hi = self.pair_ptr[p], self.pair_ptr[p + 1]
+            old_s = list(self.starts[lo:hi])
+            old_e = list(self.ends[lo:hi])
+            add_s, add_e = new_starts[p], new_ends[p]
+
+            # A contact open at the old boundary continues into the new window
+            if old_e and old_e[-1] == np.inf:
+                if add_s and add_s[0] <= boundary:
+                    old_e[-1] = add_e[0]
+                    add_s, add_e = add_s[1:], add_e[1:]
+                else:
+                    old_e[-1] = boundary
+
+            starts += old_s + add_s
+            ends += old_e + add_e
+            ptr.append(len(starts))
+
+        self.starts = np.asarray(starts, dtype=float)
+        self.ends = np.asarray(ends, dtype=float)
+        self.pair_ptr = np.asarray(ptr, dtype=np.int64)
+        self._rebuild_keys()
+
+    def _rebuild_keys(self) -> None:
+        # Composite key pair * span + time keeps every segment sorted in one array
+        self._span = (self.computed_until - self.epoch) + 10 * self.lookahead + 1.0
+        pair_of = np.repeat(np.arange(len(self.pairs)), np.diff(self.pair_ptr))
+        self._keys = pair_of * self._span + (self.starts - self.epoch)
+
+    def advance(self, now: float) -> None:
+        """
+        Keep the plan `lookahead` seconds ahead of now and forget
+        contacts that already ended.
+        """
+        with self._lock:
+            keep = self.ends >= now
+            pair_of = np.repeat(np.arange(len(self.pairs)), np.diff(self.pair_ptr))
+            counts = np.bincount(pair_of[keep], minlength=len(self.pairs))
+            self.starts, self.ends = self.starts[keep], self.ends[keep]
+            self.pair_ptr = np.concatenate([[0], np.cumsum(counts)])
+            self._rebuild_keys()
+            self._extend(now + self.lookahead)
+
+    # -------------------- Queries --------------------
+
+    def _locate(self, pairs: np.ndarray, t: np.ndarray) -> np.ndarray:
+        """
+        Index of the last interval of each pair starting at or before t,
+        or -1 if there is none.
+        """
+        rel = np.clip(t - self.epoch, 0.0, self._span - 1.0)
+        idx = np.searchsorted(self._keys, pairs * self._span + rel, side="right") - 1
+        found = (idx >= self.pair_ptr[pairs]) & (idx >= 0)
+        found &= self.starts[np.maximum(idx, 0)] <= t if len(self.starts) else False
+        return np.where(found, idx, -1)
+
+    def pair_ids(self, a: Sequence[Hashable], b: Sequence[Hashable]) -> np.ndarray:
+        return np.asarray([self.pair_index[(x, y)] for x, y in zip(a, b)], dtype=np.int64)
+
+    def visible_many(self, pairs: np.ndarray, t) -> np.ndarray:
+        """
+        Vectorized point-in-time query over pair ids.
+        """
+        pairs = np.asarray(pairs, dtype=np.int64)
+        t = np.broadcast_to(np.asarray(t, dtype=float), pairs.shape)
+        with self._lock:
+            idx = self._locate(pairs, t)
+            return (idx >= 0) & (t < self.ends[np.maximum(idx, 0)])
+
+    def _extend_for(self, t: np.ndarray) -> bool:
+        """
+        Extend the plan for an answer at times t that hit an open end;
+        False once it already reaches the query horizon past t.
+        """
+        limit = float(np.max(t)) + self.query_horizon
+        if self.computed_until >= limit:
+            return False
+        self._extend(min(self.computed_until + self.lookahead, limit))
+        return True
+
+    def next_loss_many(self, pairs: np.ndarray, t) -> np.ndarray:
+        """
+        Absolute end time of the current contact per pair, NaN where
+        the pair is not in contact at t, inf where the contact lasts
+        beyond the query horizon.
+        """
+        pairs = np.asarray(pairs, dtype=np.int64)
+        t = np.broadcast_to(np.asarray(t, dtype=float), pairs.shape)
+        with self._lock:
+            while True:
+                idx = self._locate(pairs, t)
+                end = self.ends[np.maximum(idx, 0)] if len(self.ends) else np.full(pairs.shape, np.nan)
+                end = np.where((idx >= 0) & (t < end), end, np.nan)
+                if not np.isinf(end).any() or not self._extend_for(t):
+                    return end
+
+    def is_visible(self, a: Hashable, b: Hashable, t: float) -> bool:
+        pair = self.pair_index.get((a, b))
+        if pair is None:
+            raise KeyError((a, b))
+        return bool(self.visible_many(np.array([pair]), t)[0])
+
+    def next_loss(self, a: Hashable, b: Hashable, t: float) -> Optional[float]:
+        """
+        When the current a-b contact ends, or None if not in contact
+        (inf if it lasts beyond the query horizon).
+        """
+        end = self.next_loss_many(np.array([self.pair_index[(a, b)]]), t)[0]
+        return None if np.isnan(end) else float(end)
+
+    def next_contact(self, a: Hashable, b: Hashable, t: float) -> Optional[Tuple[float, float]]:
+        """
+        Current or next a-b contact window as (start, end); end is inf
+        if the contact lasts beyond the query horizon.
+        """
+        pair = self.pair_index[(a, b)]
+        with self._lock:
+            while True:
+                lo, hi = self.pair_ptr[pair], self.pair_ptr[pair + 1]
+                i = lo + np.searchsorted(self.ends[lo:hi], t, side="right")
+                if i >= hi:
+                    return None
+                if self.ends[i] != np.inf or not self._extend_for(np.array([t])):
+                    return float(self.starts[i]), float(self.ends[i])
+
+    def contacts_at(self, node: Hashable, t: float) -> List[Hashable]:
+        peers = self.peers.get(node, [])
+        if not peers:
+            return []
+        visible = self.visible_many(np.array([i for _, i in peers]), t)
+        return [peer for (peer, _), v in zip(peers, visible) if v]
+
+    def next_event(self, a: Hashable, b: Hashable, t: float) -> Dict[str, Any]:
+        """
+        When the a-b link next disappears, and which peer of `b` can
+        replace `a` at that moment (the one with the longest remaining
+        contact).
+        """
+        loss = self.next_loss(a, b, t)
+        if loss is None:
+            return {"loss_time": None, "replacement": None, "replacement_until": None, "reason": "not_in_contact"}
+        if loss == np.inf:
+            return {
+                "loss_time": None, "replacement": None, "replacement_until": None,
+                "reason": "outside_prediction_horizon",
+            }
+
+        peers = [(peer, i) for peer, i in self.peers.get(b, []) if peer != a]
+        if peers:
+            ends = self.next_loss_many(np.array([i for _, i in peers]), loss)
+            if np.any(~np.isnan(ends)):
+                best = int(np.nanargmax(ends))
+                return {
+                    "loss_time": loss,
+                    "replacement": peers[best][0],
+                    "replacement_until": float(ends[best]),
+                    "reason": "handover_available",
+                }
+
+        return {"loss_time": loss, "replacement": None, "replacement_until": None, "reason": "no_replacement"}
@@ -1,17 +1,95 @@
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Optional, Tuple, Union
 import math
 
-from core_types import AlignedState
+import numpy as np
+
+from core_types import AlignedState, AlignedStateBatch
+from digital_twin.contact_plan import ContactPlan
+from digital_twin.propagator import OrbitPropagator
 
 
 class ForwardEvolution:
     """
     Deterministically projects near-future constraint evolution
     using physics-based approximations.
+
+    Predicts, per link: beam exit, visibility loss of the serving
+    ground point, and route expiry (whichever of the two comes first).
+    Batches are evaluated for every link in one vectorized pass. With a
+    ContactPlan and a link_nodes mapping (link ids -> satellite and
+    ground node names), batch visibility loss is read from the plan
+    instead of being recomputed from geometry.
     """
 
-    def __init__(self, horizon_seconds: float = 10.0):
+    def __init__(
+        self,
+        horizon_seconds: float = 10.0,
+        offset_rate: float = 0.02,
+        footprint_radius_km: float = 350.0,
+        min_elevation_deg: float = 10.0,
+        lookahead_seconds: float = 900.0,
+        ground_stations: Optional[np.ndarray] = None,
+        contact_plan: Optional[ContactPlan] = None,
+        link_nodes: Optional[Callable[[np.ndarray], Tuple[list, list]]] = None,
+    ):
         self.horizon = horizon_seconds
+        # Fallback offset velocity when no geometry is available,
+        # units per second (from simulation)
+        self.offset_rate = offset_rate
+        # Ground radius (km) covered by one beam radius unit of offset
+        self.footprint_radius_km = footprint_radius_km
+        self.min_elevation_deg = min_elevation_deg
+        # Horizon for the geometric (visibility / route) predictions
+        self.lookahead = lookahead_seconds
+        # Optional (G, 3) ground station positions (km), indexed by the
+        # topology "gateway" field; defaults to the current nadir point
+        self.ground_stations = None if ground_stations is None else np.asarray(ground_stations, dtype=float)
+        self.contact_plan = contact_plan
+        self.link_nodes = link_nodes
+
+    # -------------------- Geometry helpers --------------------
+
+    def _propagator(self, pos: np.ndarray, vel: np.ndarray) -> OrbitPropagator:
+        return OrbitPropagator(pos, vel)
+
+    def _ground_points(self, propagator: OrbitPropagator, gateway: Optional[np.ndarray]) -> np.ndarray:
+        if self.ground_stations is None or gateway is None:
+            return propagator.nadir_points()
+        gateway = np.asarray(gateway, dtype=int)
+        ground = self.ground_stations[gateway % len(self.ground_stations)]
+        # Links with no reported gateway (MISSING_ID) use the nadir point
+        unknown = gateway < 0
+        if unknown.any():
+            ground = np.where(unknown[:, None], propagator.nadir_points(), ground)
+        return ground
+
+    def _offset_rates(self, propagator: Optional[OrbitPropagator], radius: np.ndarray) -> np.ndarray:
+        """
+        Beam offset velocity derived from the propagated ground track;
+        falls back to the configured rate where geometry is missing.
+        """
+        if propagator is None:
+            return np.full(len(radius), self.offset_rate)
+        rate = propagator.ground_speed() / self.footprint_radius_km * radius
+        return np.where(np.isfinite(rate), rate, self.offset_rate)
+
+    @staticmethod
+    def _state_geometry(state: AlignedState):
+        pos = state.geometry.get("sat_pos")
+        vel = state.geometry.get("sat_vel")
+        if pos is None or vel is None:
+            return None
+        return np.asarray([pos], dtype=float), np.asarray([vel], dtype=float)
+
+    @staticmethod
+    def _batch_geometry(batch: AlignedStateBatch):
+        names = [f"sat_pos_{c}" for c in "xyz"] + [f"sat_vel_{c}" for c in "xyz"]
+        if any(batch.get(name) is None for name in names):
+            return None
+        cols = [batch.column(name) for name in names]
+        return np.column_stack(cols[:3]), np.column_stack(cols[3:])
+
+    # -------------------- Single link --------------------
 
     def predict_beam_exit(self, state: AlignedState) -> Dict[str, Any]:
         """
@@ -32,9 +110,11 @@ class ForwardEvolution:
         if offset >= radius:
             return {"beam_exit_time": 0.0, "reason": "already_outside"}
 
-        # Estimate offset velocity (simple linear approximation)
+        # Offset velocity from the satellite's ground-track speed
         # Assumption: offset increases monotonically near beam edge
-        estimated_offset_rate = 0.02  # units per second (from simulation)
+        geometry = self._state_geometry(state)
+        propagator = self._propagator(*geometry) if geometry else None
+        estimated_offset_rate = float(self._offset_rates(propagator, np.array([radius]))[0])
 
         if estimated_offset_rate <= 0:
             return {"beam_exit_time": None, "reason": "non_progressing_offset"}
@@ -53,12 +133,158 @@ class ForwardEvolution:
             "reason": "predicted",
         }
 
-    def evolve(self, state: AlignedState) -> Dict[str, Any]:
+    def predict_visibility_loss(self, state: AlignedState) -> Dict[str, Any]:
+        """
+        Predict time until the satellite drops below the minimum
+        elevation of its ground point.
+        """
+        geometry = self._state_geometry(state)
+        if geometry is None:
+            return {"visibility_loss_time": None, "reason": "missing_geometry_data"}
+
+        gateway = state.topology.get("gateway")
+        batch = self._visibility_arrays(*geometry, None if gateway is None else np.array([gateway]))
+        t = float(batch["visibility_loss_time"][0])
+
+        return {
+            "visibility_loss_time": None if math.isnan(t) else round(t, 3),
+            "reason": batch["reason"][0],
+        }
+
+    @staticmethod
+    def predict_route_expiry(beam_exit: Dict[str, Any], visibility_loss: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        The current route expires at the first of beam exit and visibility loss.
+        """
+        candidates = [
+            (beam_exit.get("beam_exit_time"), "beam_exit"),
+            (visibility_loss.get("visibility_loss_time"), "visibility_loss"),
+        ]
+        known = [(t, reason) for t, reason in candidates if t is not None]
+
+        if not known:
+            return {"route_expiry_time": None, "reason": "outside_prediction_horizon"}
+
+        t, reason = min(known)
+        return {"route_expiry_time": t, "reason": reason}
+
+    # -------------------- Whole batch --------------------
+
+    def _visibility_arrays(self, pos: np.ndarray, vel: np.ndarray, gateway: Optional[np.ndarray]) -> Dict[str, Any]:
+        propagator = self._propagator(pos, vel)
+        ground = self._ground_points(propagator, gateway)
+        t_loss = np.round(propagator.visibility_loss_time(ground, self.min_elevation_deg), 3)
+
+        missing = ~np.isfinite(propagator.radius) | ~np.isfinite(propagator.omega)
+        lost = ~missing & (t_loss == 0.0)
+        beyond = ~missing & ~lost & ~(t_loss <= self.lookahead)
+        predicted = ~missing & ~lost & ~beyond
+
+        return {
+            "visibility_loss_time": np.where(predicted | lost, t_loss, np.nan),
+            "reason": np.select(
+                [missing, lost, beyond],
+                ["missing_geometry_data", "already_not_visible", "outside_prediction_horizon"],
+                default="predicted",
+            ).astype(object),
+        }
+
+    def predict_beam_exit_batch(self, batch: AlignedStateBatch) -> Dict[str, Any]:
+        """
+        Vectorized predict_beam_exit() for every link of a batch.
+        beam_exit_time is NaN where no exit is predicted.
+        """
+        n = len(batch)
+        offset = batch.get("beam_offset", np.full(n, np.nan))
+        radius = batch.get("beam_radius", np.full(n, np.nan))
+
+        geometry = self._batch_geometry(batch)
+        propagator = self._propagator(*geometry) if geometry else None
+        rate = self._offset_rates(propagator, radius)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            time_to_exit = np.round((radius - offset) / rate, 3)
+
+        incomplete = np.isnan(offset) | np.isnan(radius)
+        outside = ~incomplete & (offset >= radius)
+        stalled = ~incomplete & ~outside & ~(rate > 0)
+        beyond = ~incomplete & ~outside & ~stalled & (time_to_exit > self.horizon)
+        predicted = ~incomplete & ~outside & ~stalled & ~beyond
+
+        return {
+            "link_ids": batch.link_ids,
+            "beam_exit_time": np.select([outside, predicted], [0.0, time_to_exit], default=np.nan),
+            "reason": np.select(
+                [incomplete, outside, stalled, beyond],
+                ["incomplete_beam_data", "already_outside", "non_progressing_offset", "outside_prediction_horizon"],
+                default="predicted",
+            ).astype(object),
+        }
+
+    def _visibility_from_plan(self, batch: AlignedStateBatch) -> Dict[str, Any]:
+        sats, grounds = self.link_nodes(batch.link_ids)
+        pairs = self.contact_plan.pair_ids(sats, grounds)
+        t_loss = np.round(self.contact_plan.next_loss_many(pairs, batch.time) - batch.time, 3)
+
+        lost = np.isnan(t_loss)
+        beyond = ~lost & (t_loss > self.lookahead)
+        return {
+            "link_ids": batch.link_ids,
+            "visibility_loss_time": np.where(lost, 0.0, np.where(beyond, np.nan, t_loss)),
+            "reason": np.select(
+                [lost, beyond], ["already_not_visible", "outside_prediction_horizon"], default="predicted"
+            ).astype(object),
+        }
+
+    def predict_visibility_loss_batch(self, batch: AlignedStateBatch) -> Dict[str, Any]:
+        if self.contact_plan is not None and self.link_nodes is not None:
+            return self._visibility_from_plan(batch)
+
+        geometry = self._batch_geometry(batch)
+        if geometry is None:
+            n = len(batch)
+            return {
+                "link_ids": batch.link_ids,
+                "visibility_loss_time": np.full(n, np.nan),
+                "reason": np.full(n, "missing_geometry_data", dtype=object),
+            }
+        return {"link_ids": batch.link_ids, **self._visibility_arrays(*geometry, batch.get("gateway"))}
+
+    @staticmethod
+    def predict_route_expiry_batch(beam_exit: Dict[str, Any], visibility_loss: Dict[str, Any]) -> Dict[str, Any]:
+        beam_t = beam_exit["beam_exit_time"]
+        vis_t = visibility_loss["visibility_loss_time"]
+
+        expiry = np.fmin(beam_t, vis_t)
+        reason = np.where(
+            np.isnan(expiry),
+            "outside_prediction_horizon",
+            np.where(np.isnan(vis_t) | (beam_t <= vis_t), "beam_exit", "visibility_loss"),
+        ).astype(object)
+
+        return {"link_ids": beam_exit["link_ids"], "route_expiry_time": expiry, "reason": reason}
+
+    # -------------------- Entry point --------------------
+
+    def evolve(self, state: Union[AlignedState, AlignedStateBatch]) -> Dict[str, Any]:
         """
         Perform forward evolution and return constraint predictions.
         """
 
+        if isinstance(state, AlignedStateBatch):
+            beam_exit = self.predict_beam_exit_batch(state)
+            visibility_loss = self.predict_visibility_loss_batch(state)
+            return {
+                "beam_exit": beam_exit,
+                "visibility_loss": visibility_loss,
+                "route_expiry": self.predict_route_expiry_batch(beam_exit, visibility_loss),
+            }
+
+        beam_exit = self.predict_beam_exit(state)
+        visibility_loss = self.predict_visibility_loss(state)
+
         return {
-            "beam_exit": self.predict_beam_exit(state),
-            # Future: visibility loss, route expiry
+            "beam_exit": beam_exit,
+            "visibility_loss": visibility_loss,
+            "route_expiry": self.predict_route_expiry(beam_exit, visibility_loss),
         }
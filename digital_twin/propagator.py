@@ -0,0 +1,98 @@
+from typing import Tuple
+
+import numpy as np
+
+
+EARTH_RADIUS_KM = 6378.137
+
+
+class OrbitPropagator:
+    """
+    Vectorized two-body propagation for circular(ized) orbits.
+
+    Each satellite rotates in the plane of its current position and
+    velocity at its instantaneous angular rate. Earth rotation is
+    ignored, which is adequate over look-aheads of a few minutes.
+    """
+
+    def __init__(self, pos: np.ndarray, vel: np.ndarray):
+        """
+        pos, vel: (N, 3) arrays in km and km/s (Earth-centered frame).
+        """
+        self.pos = np.asarray(pos, dtype=float)
+        self.vel = np.asarray(vel, dtype=float)
+
+        self.radius = np.linalg.norm(self.pos, axis=1)
+        h = np.cross(self.pos, self.vel)
+        h_norm = np.linalg.norm(h, axis=1)
+
+        self.r_hat = self.pos / self.radius[:, None]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.h_hat = h / h_norm[:, None]
+            # Angular rate (rad/s)
+            self.omega = h_norm / self.radius ** 2
+        # In-plane unit vector 90 degrees ahead of the satellite
+        self.t_hat = np.cross(self.h_hat, self.r_hat)
+
+    def propagate(self, times: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Positions and velocities at `times` seconds from now, for every
+        satellite in one batched call. Returns two (N, T, 3) arrays.
+        """
+        times = np.asarray(times, dtype=float)
+        theta = self.omega[:, None] * times[None, :]
+        cos_t = np.cos(theta)[:, :, None]
+        sin_t = np.sin(theta)[:, :, None]
+
+        r_hat = self.r_hat[:, None, :]
+        t_hat = self.t_hat[:, None, :]
+        radius = self.radius[:, None, None]
+        speed = (self.omega * self.radius)[:, None, None]
+
+        pos = radius * (r_hat * cos_t + t_hat * sin_t)
+        vel = speed * (t_hat * cos_t - r_hat * sin_t)
+        return pos, vel
+
+    def ground_speed(self) -> np.ndarray:
+        """
+        Speed of the sub-satellite point (km/s).
+        """
+        return self.omega * EARTH_RADIUS_KM
+
+    def visibility_loss_time(
+        self,
+        ground: np.ndarray,
+        min_elevation_deg: float = 10.0,
+    ) -> np.ndarray:
+        """
+        Time (s) until each satellite drops below min elevation as seen
+        from its ground point (ground: (N, 3) km). Closed form: the
+        cosine of the central angle evolves as A * cos(omega * t - phi).
+        0.0 if not visible now, inf for a stationary satellite.
+        """
+        ground = np.asarray(ground, dtype=float)
+        g_hat = ground / np.linalg.norm(ground, axis=1)[:, None]
+
+        eps = np.radians(min_elevation_deg)
+        # Max Earth central angle at which the satellite is above eps
+        lam = np.arccos(np.clip(EARTH_RADIUS_KM / self.radius * np.cos(eps), -1.0, 1.0)) - eps
+        cos_lam = np.cos(lam)
+
+        a = np.einsum("ij,ij->i", g_hat, self.r_hat)
+        b = np.einsum("ij,ij->i", g_hat, self.t_hat)
+        amplitude = np.hypot(a, b)
+        phi = np.arctan2(b, a)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            exit_angle = np.arccos(np.clip(cos_lam / amplitude, -1.0, 1.0))
+            t_loss = (exit_angle + phi) / self.omega
+
+        visible = a >= cos_lam
+        t_loss = np.where(visible, np.maximum(t_loss, 0.0), 0.0)
+        return np.where(visible & (self.omega <= 0), np.inf, t_loss)
+
+    def nadir_points(self) -> np.ndarray:
+        """
+        Ground points directly below each satellite now (km).
+        """
+        return self.r_hat * EARTH_RADIUS_KM
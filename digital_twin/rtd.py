@@ -1,5 +1,5 @@
 import time
-from typing import Optional
+from typing import Callable, Optional
 
 from core_types import AlignedState
 
@@ -8,11 +8,20 @@ class RTDEstimator:
     """
     Computes Replication Time Difference (RTD) between
     real system time and digital twin time.
+
+    "Now" comes from the monotonic clock, anchored to the wall clock
+    once at construction, so wall-clock steps (NTP, manual changes)
+    do not show up as RTD jumps. A custom clock (e.g. a simulated one
+    for replay) can be passed instead.
     """
 
+    def __init__(self, clock: Optional[Callable[[], float]] = None):
+        self._offset = time.time() - time.monotonic()
+        self.clock = clock or (lambda: time.monotonic() + self._offset)
+
     def compute(self, state: AlignedState) -> float:
         """
-        RTD = | current wall time - state timestamp |
+        RTD = | current time - state timestamp |
         """
-        now = time.time()
+        now = self.clock()
         return abs(now - state.time)
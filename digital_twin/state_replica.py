@@ -1,28 +1,203 @@
-from typing import Dict, Any
-from copy import deepcopy
+from collections import deque
+from types import MappingProxyType
+from typing import Any, Deque, Hashable, Iterator, List, Mapping, Optional, Tuple, Union
 
-from core_types import AlignedState
+import numpy as np
+
+from core_types import AlignedState, AlignedStateBatch
+
+
+# Key under which single-link (non-batched) states are stored
+DEFAULT_LINK: Hashable = None
+
+PAYLOAD_FIELDS = ("geometry", "rf", "beam", "topology", "environment")
+
+
+def freeze_state(state: AlignedState) -> AlignedState:
+    """
+    Read-only shallow copy of an aligned state: payload dicts become
+    mapping proxies and list values become tuples.
+    """
+    frozen = {}
+    for field in PAYLOAD_FIELDS:
+        payload = getattr(state, field)
+        if isinstance(payload, MappingProxyType):
+            frozen[field] = payload
+            continue
+        frozen[field] = MappingProxyType({
+            key: tuple(value) if isinstance(value, list) else value
+            for key, value in payload.items()
+        })
+    return AlignedState(time=state.time, **frozen)
+
+
+def freeze_batch(batch: AlignedStateBatch) -> AlignedStateBatch:
+    """
+    Read-only views over the batch columns (no data is copied).
+    The twin takes ownership: upstream must not write the arrays afterwards.
+    """
+    def readonly(array: np.ndarray) -> np.ndarray:
+        if not array.flags.writeable:
+            return array
+        view = array.view()
+        view.flags.writeable = False
+        return view
+
+    return AlignedStateBatch(
+        time=batch.time,
+        link_ids=readonly(batch.link_ids),
+        columns={name: readonly(column) for name, column in batch.columns.items()},
+    )
+
+
+class LinkMap(Mapping):
+    """
+    Immutable link -> state map split into `fanout` chunks by key hash.
+    set() returns a new map that copies only the chunk holding the key
+    and shares every other chunk, so publishing one link costs
+    O(n / fanout + fanout) instead of O(n).
+    """
+
+    __slots__ = ("_chunks", "_size")
+
+    def __init__(self, fanout: int = 64):
+        self._chunks: Tuple[Mapping[Hashable, AlignedState], ...] = (MappingProxyType({}),) * fanout
+        self._size = 0
+
+    def _index(self, key: Hashable) -> int:
+        return hash(key) % len(self._chunks)
+
+    def __getitem__(self, key: Hashable) -> AlignedState:
+        return self._chunks[self._index(key)][key]
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        return self._chunks[self._index(key)].get(key, default)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._chunks[self._index(key)]
+
+    def __iter__(self) -> Iterator[Hashable]:
+        for chunk in self._chunks:
+            yield from chunk
+
+    def __len__(self) -> int:
+        return self._size
+
+    def set(self, key: Hashable, value: AlignedState) -> "LinkMap":
+        i = self._index(key)
+        chunk = dict(self._chunks[i])
+        added = key not in chunk
+        chunk[key] = value
+
+        updated = LinkMap.__new__(LinkMap)
+        updated._chunks = self._chunks[:i] + (MappingProxyType(chunk),) + self._chunks[i + 1:]
+        updated._size = self._size + added
+        return updated
+
+
+class TwinSnapshot:
+    """
+    Immutable, versioned view of the twin. Unchanged per-link states
+    are shared between consecutive versions.
+    """
+
+    __slots__ = ("version", "time", "links", "batch")
+
+    def __init__(
+        self,
+        version: int,
+        time: float,
+        links: LinkMap,
+        batch: Optional[AlignedStateBatch],
+    ):
+        self.version = version
+        self.time = time
+        self.links = links
+        self.batch = batch
+
+    def state(self, link_id: Hashable = DEFAULT_LINK) -> AlignedState:
+        state = self.links.get(link_id)
+        if state is not None:
+            return state
+        if self.batch is not None and link_id is not None:
+            return freeze_state(self.batch.state(link_id))
+        raise KeyError(link_id)
 
 
 class DigitalTwinState:
     """
     Maintains a mirrored copy of the latest aligned physical state.
+
+    Every update publishes a new immutable snapshot (copy-on-write);
+    readers get read-only views without copying or locking, and a
+    bounded history of past versions stays readable.
     """
 
-    def __init__(self):
-        self._state: AlignedState | None = None
+    def __init__(self, history: int = 16):
+        self._snapshot: Optional[TwinSnapshot] = None
+        self._history: Deque[TwinSnapshot] = deque(maxlen=history)
+        self._version = 0
 
-    def update(self, aligned_state: AlignedState) -> None:
+    def update(
+        self,
+        aligned_state: Union[AlignedState, AlignedStateBatch],
+        link_id: Hashable = DEFAULT_LINK,
+    ) -> TwinSnapshot:
         """
-        Update the twin with the latest aligned state.
-        A deep copy is used to avoid mutation from upstream layers.
+        Update the twin with the latest aligned state (one link) or batch
+        (all links) and publish a new version.
         """
-        self._state = deepcopy(aligned_state)
+        previous = self._snapshot
+        links: LinkMap = previous.links if previous else LinkMap()
+        batch = previous.batch if previous else None
+
+        if isinstance(aligned_state, AlignedStateBatch):
+            batch = freeze_batch(aligned_state)
+        else:
+            # Only the chunk of the changed link is copied; the rest is shared
+            links = links.set(link_id, freeze_state(aligned_state))
 
-    def get_state(self) -> AlignedState:
+        self._version += 1
+        snapshot = TwinSnapshot(self._version, aligned_state.time, links, batch)
+
+        # Single reference swap: readers see either the old or the new version
+        self._history.append(snapshot)
+        self._snapshot = snapshot
+        return snapshot
+
+    def get_snapshot(self, version: Optional[int] = None) -> TwinSnapshot:
         """
-        Return the current replicated state.
+        Return the latest snapshot, or a specific retained version.
         """
-        if self._state is None:
+        snapshot = self._snapshot
+        if snapshot is None:
             raise RuntimeError("Digital Twin state has not been initialized yet.")
-        return deepcopy(self._state)
+        if version is None or version == snapshot.version:
+            return snapshot
+
+        for past in reversed(self._history):
+            if past.version == version:
+                return past
+        raise KeyError(f"Twin version {version} is no longer retained")
+
+    def get_state(self, link_id: Hashable = DEFAULT_LINK) -> AlignedState:
+        """
+        Return the current replicated state (read-only view).
+        """
+        return self.get_snapshot().state(link_id)
+
+    def get_batch(self) -> AlignedStateBatch:
+        """
+        Return the current replicated batch (read-only column views).
+        """
+        batch = self.get_snapshot().batch
+        if batch is None:
+            raise RuntimeError("Digital Twin holds no batched state.")
+        return batch
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def versions(self) -> List[int]:
+        return [snapshot.version for snapshot in self._history]
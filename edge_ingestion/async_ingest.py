@@ -0,0 +1,434 @@
+# edge_ingestion/async_ingest.py
+
+import asyncio
+import json
+from collections import OrderedDict, deque
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Union,
+)
+
+from core_types import AlignedState, AlignedStateBatch, TelemetryBatch, TelemetryPacket
+from edge_ingestion import codec
+from edge_ingestion.time_align import TimeAligner
+
+
+BACKPRESSURE_POLICIES = ("block", "drop_oldest", "coalesce_latest")
+
+# Queue item: one packet, or a columnar batch of one source (binary codec)
+Item = Union[TelemetryPacket, TelemetryBatch]
+
+Decoder = Callable[[bytes, str], List[Item]]
+
+
+def decode_json(data: bytes, source: str) -> List[TelemetryPacket]:
+    """
+    Default wire decoder: one JSON object per line with
+    timestamp, payload and optional link_id.
+    """
+    packets = []
+    for line in data.splitlines():
+        if not line.strip():
+            continue
+        obj = json.loads(line)
+        packets.append(TelemetryPacket(
+            timestamp=obj["timestamp"],
+            source=obj.get("source", source),
+            payload=obj.get("payload", {}),
+            link_id=obj.get("link_id"),
+        ))
+    return packets
+
+
+def decode_codec_batches(data: bytes, source: str) -> List[TelemetryBatch]:
+    """
+    Binary codec decoder yielding one columnar batch per frame, with
+    columns viewing the receive buffer (no per-packet objects). Batches
+    go through TimeAligner.add_batch.
+    """
+    return list(codec.decode_batches(data))
+
+
+def _size(item: Item) -> int:
+    return len(item.link_ids) if isinstance(item, TelemetryBatch) else 1
+
+
+class SourceQueue:
+    """
+    Bounded queue between one producer and the aligner.
+
+    Backpressure policies when full:
+    - block: the producer waits for space
+    - drop_oldest: the oldest queued packet is discarded
+    - coalesce_latest: a queued packet of the same link (of the same
+      source, for packets without a link id) is replaced by the newer
+      one; otherwise the oldest is discarded
+
+    Items may also be columnar batches; under coalesce_latest a batch
+    replaces a queued batch of the same link set.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        maxsize: int = 1024,
+        policy: str = "drop_oldest",
+        notify: Optional[asyncio.Event] = None,
+    ):
+        if policy not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"Unknown backpressure policy '{policy}', expected one of {BACKPRESSURE_POLICIES}")
+
+        self.source = source
+        self.maxsize = maxsize
+        self.policy = policy
+        self.notify = notify
+
+        self._items: Union[deque, OrderedDict] = OrderedDict() if policy == "coalesce_latest" else deque()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+
+        self.enqueued = 0
+        self.dequeued = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def full(self) -> bool:
+        return len(self._items) >= self.maxsize
+
+    @staticmethod
+    def _key(item: Item) -> Any:
+        if isinstance(item, TelemetryBatch):
+            return ("batch", item.link_ids.tobytes())
+        # Unkeyed packets (single-link stream) are one link per source
+        return (item.source,) if item.link_id is None else item.link_id
+
+    def put_nowait(self, packet: Item) -> bool:
+        """
+        Enqueue without waiting. Returns False if the packet was dropped
+        (only possible with the block policy, e.g. from a UDP callback).
+        """
+        if self.policy == "coalesce_latest":
+            key = self._key(packet)
+            if key in self._items:
+                self._items[key] = packet
+                self.coalesced += 1
+                self.enqueued += 1
+                return True
+            if self.full():
+                self._items.popitem(last=False)
+                self.dropped += 1
+            self._items[key] = packet
+        else:
+            if self.full():
+                if self.policy == "block":
+                    self.dropped += 1
+                    return False
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(packet)
+
+        self.enqueued += 1
+        self.max_depth = max(self.max_depth, len(self._items))
+        if self.full():
+            self._not_full.clear()
+        if self.notify is not None:
+            self.notify.set()
+        return True
+
+    async def put(self, packet: Item) -> None:
+        """
+        Enqueue, waiting for space under the block policy.
+        """
+        if self.policy == "block":
+            while self.full():
+                self._not_full.clear()
+                await self._not_full.wait()
+        self.put_nowait(packet)
+
+    def get_nowait(self) -> Optional[Item]:
+        if not self._items:
+            return None
+        if self.policy == "coalesce_latest":
+            _, packet = self._items.popitem(last=False)
+        else:
+            packet = self._items.popleft()
+        self.dequeued += 1
+        if not self.full():
+            self._not_full.set()
+        return packet
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "depth": len(self._items),
+            "max_depth": self.max_depth,
+            "maxsize": self.maxsize,
+            "policy": self.policy,
+            "enqueued": self.enqueued,
+            "dequeued": self.dequeued,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+        }
+
+
+# -------------------- Producers --------------------
+
+class SourceProducer:
+    """
+    Base class: an independent producer for one telemetry source.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self.received = 0
+
+    async def run(self, queue: SourceQueue) -> None:
+        raise NotImplementedError
+
+
+class InProcessProducer(SourceProducer):
+    """
+    In-process stand-in for a real feed. Forwards packets of its source
+    from a sync or async iterable, optionally paced by `interval` seconds.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        packets: Union[Iterable[Item], AsyncIterable[Item]],
+        interval: Optional[float] = None,
+    ):
+        super().__init__(source)
+        self.packets = packets
+        self.interval = interval
+
+    async def run(self, queue: SourceQueue) -> None:
+        if hasattr(self.packets, "__aiter__"):
+            async for packet in self.packets:
+                await self._forward(packet, queue)
+        else:
+            for packet in self.packets:
+                await self._forward(packet, queue)
+
+    async def _forward(self, packet: Item, queue: SourceQueue) -> None:
+        if packet.source != self.source:
+            return
+        self.received += _size(packet)
+        await queue.put(packet)
+        # Always yield so one fast source cannot starve the others
+        await asyncio.sleep(self.interval or 0)
+
+
+class _DatagramProtocol(asyncio.DatagramProtocol):
+    def __init__(self, producer: "UDPProducer", queue: SourceQueue):
+        self.producer = producer
+        self.queue = queue
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        for item in self.producer.decode(data, self.producer.source):
+            self.producer.received += _size(item)
+            self.queue.put_nowait(item)
+
+
+class UDPProducer(SourceProducer):
+    """
+    Reads datagrams from a local UDP socket. Pass
+    decode=decode_codec_batches for binary frames (or
+    codec.decode_packets to get packets). Under the block policy,
+    packets arriving at a full queue are dropped (UDP cannot wait).
+    """
+
+    def __init__(self, source: str, host: str = "127.0.0.1", port: int = 0, decode: Decoder = decode_json):
+        super().__init__(source)
+        self.host = host
+        self.port = port
+        self.decode = decode
+        self.transport: Optional[asyncio.DatagramTransport] = None
+
+    async def run(self, queue: SourceQueue) -> None:
+        loop = asyncio.get_running_loop()
+        self.transport, _ = await loop.create_datagram_endpoint(
+            lambda: _DatagramProtocol(self, queue),
+            local_addr=(self.host, self.port),
+        )
+        self.port = self.transport.get_extra_info("sockname")[1]
+        try:
+            await asyncio.Future()  # run until cancelled
+        finally:
+            self.transport.close()
+
+
+class TCPProducer(SourceProducer):
+    """
+    Listens on a local TCP socket and reads newline-delimited JSON, or
+    binary codec frames with framing="codec" (decoded to columnar
+    batches by default). Block policy applies real backpressure to the
+    sender.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        decode: Optional[Decoder] = None,
+        framing: str = "lines",
+    ):
+        if framing not in ("lines", "codec"):
+            raise ValueError(f"Unknown framing '{framing}'")
+        super().__init__(source)
+        self.host = host
+        self.port = port
+        self.framing = framing
+        self.decode = decode or (decode_codec_batches if framing == "codec" else decode_json)
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def _read_frame(self, reader: asyncio.StreamReader) -> bytes:
+        if self.framing == "lines":
+            return await reader.readline()
+        try:
+            header = await reader.readexactly(codec.HEADER_DTYPE.itemsize)
+            body = await reader.readexactly(codec.frame_size(header) - len(header))
+        except asyncio.IncompleteReadError:
+            return b""
+        return header + body
+
+    async def run(self, queue: SourceQueue) -> None:
+        async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+            try:
+                while frame := await self._read_frame(reader):
+                    for item in self.decode(frame, self.source):
+                        self.received += _size(item)
+                        await queue.put(item)
+            finally:
+                writer.close()
+
+        self.server = await asyncio.start_server(handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        async with self.server:
+            await self.server.serve_forever()
+
+
+# -------------------- Ingestion front end --------------------
+
+class AsyncIngestion:
+    """
+    Runs one producer per telemetry source, each feeding its own bounded
+    queue, and a consumer that drains the queues round-robin into the
+    TimeAligner. A slow or bursty source only fills its own queue.
+
+    Packets go through TimeAligner.add_packet and yield AlignedStates;
+    columnar batches (binary codec frames) go through add_batch and
+    yield AlignedStateBatches. Pass `link_ids` (or an aligner built
+    with them) to fix the batch-mode link set.
+
+    Aligned states wait in `states`, bounded by `max_states`. While it
+    is full the consumer stops draining, so a slow reader backs up into
+    the per-source queues and their backpressure policies.
+    """
+
+    def __init__(
+        self,
+        producers: Iterable[SourceProducer],
+        aligner: Optional[TimeAligner] = None,
+        maxsize: int = 1024,
+        policy: Union[str, Dict[str, str]] = "drop_oldest",
+        drain_batch: int = 64,
+        link_ids: Optional[Iterable[int]] = None,
+        max_states: int = 256,
+    ):
+        self.producers = list(producers)
+        self.aligner = aligner or TimeAligner(link_ids=link_ids)
+        self.drain_batch = drain_batch
+
+        self._data = asyncio.Event()
+        self.queues: Dict[str, SourceQueue] = {}
+        for producer in self.producers:
+            source_policy = policy.get(producer.source, "drop_oldest") if isinstance(policy, dict) else policy
+            self.queues[producer.source] = SourceQueue(
+                producer.source, maxsize=maxsize, policy=source_policy, notify=self._data
+            )
+
+        self.states: "asyncio.Queue[Union[AlignedState, AlignedStateBatch]]" = asyncio.Queue(maxsize=max_states)
+        # Emitted by the aligner, waiting for room in `states`
+        self._emitted: Deque[Union[AlignedState, AlignedStateBatch]] = deque()
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        for producer in self.producers:
+            self._tasks.append(asyncio.create_task(producer.run(self.queues[producer.source])))
+        self._tasks.append(asyncio.create_task(self._consume()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def aligned(self) -> AsyncIterator[Union[AlignedState, AlignedStateBatch]]:
+        """
+        Async iterator over aligned states, in timestamp order.
+        """
+        while True:
+            yield await self.states.get()
+
+    def drain_once(self) -> int:
+        """
+        Move up to drain_batch items per source into the aligner.
+        Nothing is drained while earlier states wait for room in `states`.
+        """
+        self._flush()
+        if self._emitted:
+            return 0
+        moved = 0
+        for queue in self.queues.values():
+            for _ in range(self.drain_batch):
+                item = queue.get_nowait()
+                if item is None:
+                    break
+                moved += 1
+                if isinstance(item, TelemetryBatch):
+                    batch = self.aligner.add_batch(item)
+                    if batch is not None:
+                        self._emitted.append(batch)
+                    continue
+                state = self.aligner.add_packet(item)
+                if state is not None:
+                    self._emitted.append(state)
+                self._emitted.extend(self.aligner.drain())
+        self._flush()
+        return moved
+
+    def _flush(self) -> None:
+        while self._emitted and not self.states.full():
+            self.states.put_nowait(self._emitted.popleft())
+
+    async def _consume(self) -> None:
+        while True:
+            # Wait for the reader to make room before draining more
+            while self._emitted:
+                await self.states.put(self._emitted.popleft())
+            if not any(len(queue) for queue in self.queues.values()):
+                await self._data.wait()
+            self._data.clear()
+            while self.drain_once():
+                # Let producers run between passes
+                await asyncio.sleep(0)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "queues": {source: q.metrics() for source, q in self.queues.items()},
+            "aligner": self.aligner.stats(),
+            "pending_states": self.states.qsize() + len(self._emitted),
+        }
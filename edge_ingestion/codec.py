@@ -0,0 +1,246 @@
+# edge_ingestion/codec.py
+
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from core_types import TelemetryBatch, TelemetryPacket
+
+
+MAGIC = 0x4C45  # "LE"
+VERSION = 1
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+# Frame = header + `count` fixed-size records of the source's layout.
+HEADER_DTYPE = np.dtype([
+    ("magic", "<u2"),
+    ("version", "u1"),
+    ("source_id", "u1"),
+    ("count", "<u4"),
+])
+
+_RECORD_HEAD = [("link_id", "<u4"), ("timestamp", "<f8")]
+
+# Fixed-size active_links field of topology records: node names of the
+# chain, UTF-8, zero-padded
+ACTIVE_LINKS_MAX = 4
+NODE_NAME_BYTES = 16
+
+RECORD_DTYPES: Dict[str, np.dtype] = {
+    "geometry": np.dtype(_RECORD_HEAD + [
+        ("sat_pos_x", "<f8"), ("sat_pos_y", "<f8"), ("sat_pos_z", "<f8"),
+        ("sat_vel_x", "<f8"), ("sat_vel_y", "<f8"), ("sat_vel_z", "<f8"),
+    ]),
+    "beam": np.dtype(_RECORD_HEAD + [("beam_offset", "<f8"), ("beam_radius", "<f8")]),
+    "rf": np.dtype(_RECORD_HEAD + [("snr", "<f8"), ("doppler", "<f8"), ("timing_drift", "<f8")]),
+    "topology": np.dtype(_RECORD_HEAD + [
+        ("isl_prev", "<i4"), ("isl_next", "<i4"), ("gateway", "<i4"),
+        ("active_links", f"S{NODE_NAME_BYTES}", (ACTIVE_LINKS_MAX,)),
+    ]),
+    "environment": np.dtype(_RECORD_HEAD + [("attenuation", "<f8")]),
+}
+
+SOURCE_IDS: Dict[str, int] = {source: i for i, source in enumerate(RECORD_DTYPES)}
+SOURCE_NAMES: Dict[int, str] = {i: source for source, i in SOURCE_IDS.items()}
+
+# link_id used on the wire for packets without one (single-link stream)
+NO_LINK = 0xFFFFFFFF
+
+
+# -------------------- Encoding --------------------
+
+def _frame(source: str, records: np.ndarray) -> bytes:
+    header = np.zeros(1, dtype=HEADER_DTYPE)
+    header["magic"] = MAGIC
+    header["version"] = VERSION
+    header["source_id"] = SOURCE_IDS[source]
+    header["count"] = len(records)
+    return header.tobytes() + records.tobytes()
+
+
+def payload_fields(source: str, payload: Dict) -> Dict:
+    """
+    Map a dict payload onto flat record / batch column names
+    (geometry vectors become sat_pos_x ... sat_vel_z).
+    """
+    if source == "geometry":
+        fields = {}
+        for vector in ("sat_pos", "sat_vel"):
+            values = payload.get(vector)
+            if values is not None:
+                fields.update({f"{vector}_{c}": v for c, v in zip("xyz", values)})
+        return fields
+    return payload
+
+
+def _record_fields(source: str, payload: Dict) -> Dict:
+    """
+    payload_fields() plus the fixed-size wire form of active_links.
+    Raises ValueError for a chain that does not fit, rather than
+    truncating it.
+    """
+    fields = payload_fields(source, payload)
+    if source == "topology" and "active_links" in fields:
+        names = [str(n).encode() for n in fields["active_links"]]
+        if len(names) > ACTIVE_LINKS_MAX:
+            raise ValueError(f"active_links has {len(names)} nodes, the wire format holds {ACTIVE_LINKS_MAX}")
+        for name in names:
+            if len(name) > NODE_NAME_BYTES or not name:
+                raise ValueError(f"Node name {name!r} does not fit in {NODE_NAME_BYTES} bytes")
+        fields = {**fields, "active_links": names + [b""] * (ACTIVE_LINKS_MAX - len(names))}
+    return fields
+
+
+def encode_packets(packets: Iterable[TelemetryPacket]) -> bytes:
+    """
+    Encode packets, one frame per source in first-seen order.
+    Fields absent from a payload are encoded as zero; an active_links
+    chain longer than ACTIVE_LINKS_MAX names of NODE_NAME_BYTES raises
+    ValueError.
+    """
+    by_source: Dict[str, List[TelemetryPacket]] = {}
+    for packet in packets:
+        by_source.setdefault(packet.source, []).append(packet)
+
+    frames = []
+    for source, group in by_source.items():
+        dtype = RECORD_DTYPES[source]
+        records = np.zeros(len(group), dtype=dtype)
+        for i, packet in enumerate(group):
+            record = records[i]
+            record["link_id"] = NO_LINK if packet.link_id is None else packet.link_id
+            record["timestamp"] = packet.timestamp
+            for name, value in _record_fields(source, packet.payload).items():
+                if name in dtype.names:
+                    record[name] = value
+        frames.append(_frame(source, records))
+
+    return b"".join(frames)
+
+
+def encode_packet(packet: TelemetryPacket) -> bytes:
+    return encode_packets([packet])
+
+
+def encode_batch(batch: TelemetryBatch) -> bytes:
+    """
+    Encode the valid rows of a columnar batch as a single frame.
+    """
+    dtype = RECORD_DTYPES[batch.source]
+    rows = np.flatnonzero(batch.valid)
+    records = np.zeros(len(rows), dtype=dtype)
+    records["link_id"] = batch.link_ids[rows]
+    records["timestamp"] = batch.timestamps[rows]
+    for name, column in batch.columns.items():
+        if name in dtype.names:
+            records[name] = np.broadcast_to(column, batch.valid.shape)[rows]
+    return _frame(batch.source, records)
+
+
+# -------------------- Decoding --------------------
+
+def decode_frames(buffer: Buffer) -> Iterator[Tuple[str, np.ndarray]]:
+    """
+    Yield (source, records) for every frame of a receive buffer.
+    Records are structured arrays viewing the buffer (no copies).
+    """
+    view = memoryview(buffer)
+    offset = 0
+
+    while offset < len(view):
+        if len(view) - offset < HEADER_DTYPE.itemsize:
+            raise ValueError("Truncated frame header")
+
+        header = np.frombuffer(view, dtype=HEADER_DTYPE, count=1, offset=offset)[0]
+        if header["magic"] != MAGIC:
+            raise ValueError(f"Bad frame magic 0x{int(header['magic']):04x}")
+        if header["version"] != VERSION:
+            raise ValueError(f"Unsupported frame version {int(header['version'])}")
+
+        source = SOURCE_NAMES.get(int(header["source_id"]))
+        if source is None:
+            raise ValueError(f"Unknown source id {int(header['source_id'])}")
+
+        dtype = RECORD_DTYPES[source]
+        count = int(header["count"])
+        offset += HEADER_DTYPE.itemsize
+
+        if len(view) - offset < count * dtype.itemsize:
+            raise ValueError("Truncated frame body")
+
+        yield source, np.frombuffer(view, dtype=dtype, count=count, offset=offset)
+        offset += count * dtype.itemsize
+
+
+def frame_size(header: Buffer) -> int:
+    """
+    Total frame size in bytes, given at least the header bytes.
+    Used to delimit frames on stream sockets.
+    """
+    h = np.frombuffer(header, dtype=HEADER_DTYPE, count=1)[0]
+    source = SOURCE_NAMES.get(int(h["source_id"]))
+    if h["magic"] != MAGIC or source is None:
+        raise ValueError("Bad frame header")
+    return HEADER_DTYPE.itemsize + int(h["count"]) * RECORD_DTYPES[source].itemsize
+
+
+def records_to_batch(source: str, records: np.ndarray, time: Optional[float] = None) -> TelemetryBatch:
+    """
+    Wrap decoded records as a TelemetryBatch whose columns are
+    strided views into the receive buffer.
+    """
+    columns = {
+        name: records[name]
+        for name in records.dtype.names
+        if name not in ("link_id", "timestamp", "active_links")
+    }
+    timestamps = records["timestamp"]
+    if time is None:
+        time = float(timestamps.max()) if len(records) else 0.0
+
+    return TelemetryBatch(
+        time=time,
+        source=source,
+        link_ids=records["link_id"].astype(np.int64),
+        timestamps=timestamps,
+        valid=np.ones(len(records), dtype=bool),
+        columns=columns,
+    )
+
+
+def decode_batches(buffer: Buffer) -> Iterator[TelemetryBatch]:
+    for source, records in decode_frames(buffer):
+        yield records_to_batch(source, records)
+
+
+def decode_packets(buffer: Buffer, source: Optional[str] = None) -> List[TelemetryPacket]:
+    """
+    Decode a buffer into TelemetryPackets (Decoder signature used by the
+    async producers). Builds Python objects, so prefer decode_batches on
+    hot paths.
+    """
+    packets = []
+
+    for frame_source, records in decode_frames(buffer):
+        names = [n for n in records.dtype.names if n not in ("link_id", "timestamp")]
+        rows = records.tolist()
+        for row in rows:
+            link_id, timestamp, values = row[0], row[1], dict(zip(names, row[2:]))
+
+            if frame_source == "geometry":
+                values = {
+                    "sat_pos": [values["sat_pos_x"], values["sat_pos_y"], values["sat_pos_z"]],
+                    "sat_vel": [values["sat_vel_x"], values["sat_vel_y"], values["sat_vel_z"]],
+                }
+            elif frame_source == "topology":
+                values["active_links"] = [n.decode() for n in values["active_links"] if n]
+
+            packets.append(TelemetryPacket(
+                timestamp=timestamp,
+                source=frame_source,
+                payload=values,
+                link_id=None if link_id == NO_LINK else link_id,
+            ))
+
+    return packets
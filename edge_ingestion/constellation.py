@@ -0,0 +1,281 @@
+# edge_ingestion/constellation.py
+
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Union
+
+import numpy as np
+
+from core_types import TelemetryBatch, TelemetryPacket
+
+
+EARTH_RADIUS_KM = 6378.137
+EARTH_MU = 398600.4418  # km^3 / s^2
+
+SOURCES = ("geometry", "beam", "rf", "topology", "environment")
+
+PACING_MODES = ("realtime", "accelerated", "unthrottled")
+
+PerLink = Union[float, np.ndarray]
+
+
+@dataclass
+class SourceProfile:
+    """
+    Packet drop, clock skew and noise behavior of one telemetry source.
+
+    Every field is either a scalar applied to all links or an
+    array with one value per link.
+    """
+
+    drop_rate: PerLink = 0.0  # probability a link's packet is lost this tick
+    skew: PerLink = 0.0       # max absolute clock skew (seconds)
+    noise: PerLink = 0.0      # std of the additive noise on the source's values
+
+
+# Matches the behavior of the single-link telemetry_stream()
+DEFAULT_PROFILES: Dict[str, SourceProfile] = {
+    "geometry": SourceProfile(drop_rate=0.05, skew=0.02, noise=1.0),
+    "beam": SourceProfile(noise=0.005),
+    "rf": SourceProfile(noise=0.5),
+    "topology": SourceProfile(),
+    "environment": SourceProfile(),
+}
+
+
+class ConstellationGenerator:
+    """
+    Seeded, deterministic telemetry for N satellites x M beams.
+
+    Each tick produces one columnar TelemetryBatch per source, with
+    one row per link (link_id = sat * beams_per_sat + beam).
+    """
+
+    def __init__(
+        self,
+        n_satellites: int = 100,
+        beams_per_sat: int = 16,
+        n_planes: int = 10,
+        altitude_km: float = 550.0,
+        inclination_deg: float = 53.0,
+        n_gateways: int = 8,
+        tick: float = 0.2,
+        mode: str = "realtime",
+        speedup: float = 1.0,
+        seed: int = 0,
+        profiles: Optional[Dict[str, SourceProfile]] = None,
+        start_time: Optional[float] = None,
+    ):
+        if mode not in PACING_MODES:
+            raise ValueError(f"Unknown pacing mode '{mode}', expected one of {PACING_MODES}")
+        if speedup <= 0:
+            raise ValueError("speedup must be positive")
+
+        self.n_satellites = n_satellites
+        self.beams_per_sat = beams_per_sat
+        self.n_links = n_satellites * beams_per_sat
+        self.tick = tick
+        self.mode = mode
+        self.speedup = speedup if mode == "accelerated" else 1.0
+        self.seed = seed
+        self.start_time = time.time() if start_time is None else start_time
+
+        self.profiles = dict(DEFAULT_PROFILES)
+        if profiles:
+            self.profiles.update(profiles)
+
+        self._rng = np.random.default_rng(seed)
+        self.link_ids = np.arange(self.n_links, dtype=np.int64)
+        self.sat_of_link = self.link_ids // beams_per_sat
+
+        # --- Orbital elements (circular orbits, Walker-like spacing) ---
+        self.radius = EARTH_RADIUS_KM + altitude_km
+        self.mean_motion = math.sqrt(EARTH_MU / self.radius ** 3)  # rad / s
+        sats = np.arange(n_satellites)
+        n_planes = max(1, min(n_planes, n_satellites))
+        per_plane = math.ceil(n_satellites / n_planes)
+        plane = sats // per_plane
+        slot = sats % per_plane
+        self._raan = 2 * math.pi * plane / n_planes
+        self._phase0 = 2 * math.pi * slot / per_plane + math.pi * plane / max(per_plane, 1)
+        self._inclination = math.radians(inclination_deg)
+
+        # Neighbours in the same plane form the inter-satellite ring
+        plane_start = plane * per_plane
+        plane_size = np.minimum(per_plane, n_satellites - plane_start)
+        self._isl_prev = (plane_start + (slot - 1) % plane_size).astype(np.int32)
+        self._isl_next = (plane_start + (slot + 1) % plane_size).astype(np.int32)
+        self._gateway = (self.link_ids % max(n_gateways, 1)).astype(np.int32)
+
+        # --- Per-link beam dynamics ---
+        self.beam_radius = np.ones(self.n_links)
+        self._offset_rate = 0.02 * (1.0 + 0.1 * self._rng.standard_normal(self.n_links))
+        self._beam_offset = self._rng.uniform(0.0, 1.0, self.n_links)
+
+        self._step = 0
+
+    # -------------------- Geometry --------------------
+
+    def _orbit(self, t: float):
+        """
+        Return (pos, vel) arrays of shape (n_satellites, 3) at elapsed time t.
+        """
+        u = self._phase0 + self.mean_motion * t
+        cos_u, sin_u = np.cos(u), np.sin(u)
+        cos_o, sin_o = np.cos(self._raan), np.sin(self._raan)
+        cos_i, sin_i = math.cos(self._inclination), math.sin(self._inclination)
+
+        pos = np.empty((self.n_satellites, 3))
+        pos[:, 0] = cos_o * cos_u - sin_o * sin_u * cos_i
+        pos[:, 1] = sin_o * cos_u + cos_o * sin_u * cos_i
+        pos[:, 2] = sin_u * sin_i
+
+        vel = np.empty((self.n_satellites, 3))
+        vel[:, 0] = -cos_o * sin_u - sin_o * cos_u * cos_i
+        vel[:, 1] = -sin_o * sin_u + cos_o * cos_u * cos_i
+        vel[:, 2] = cos_u * sin_i
+
+        speed = self.radius * self.mean_motion
+        return pos * self.radius, vel * speed
+
+    # -------------------- Per-source helpers --------------------
+
+    def _per_link(self, value: PerLink) -> np.ndarray:
+        return np.broadcast_to(np.asarray(value, dtype=float), (self.n_links,))
+
+    def _batch(self, now: float, source: str, columns: Dict[str, np.ndarray]) -> TelemetryBatch:
+        profile = self.profiles[source]
+        n = self.n_links
+
+        skew = self._per_link(profile.skew)
+        timestamps = now + self._rng.uniform(-1.0, 1.0, n) * skew
+        valid = self._rng.random(n) >= self._per_link(profile.drop_rate)
+
+        return TelemetryBatch(
+            time=now,
+            source=source,
+            link_ids=self.link_ids,
+            timestamps=timestamps,
+            valid=valid,
+            columns=columns,
+        )
+
+    def _noise(self, source: str, scale: float = 1.0) -> np.ndarray:
+        sd = self._per_link(self.profiles[source].noise)
+        return self._rng.standard_normal(self.n_links) * sd * scale
+
+    # -------------------- Tick generation --------------------
+
+    def generate_tick(self) -> List[TelemetryBatch]:
+        """
+        Build the batches of the next tick without any pacing.
+        """
+        elapsed = self._step * self.tick
+        now = self.start_time + elapsed
+        self._step += 1
+
+        # --- Geometry source ---
+        pos, vel = self._orbit(elapsed)
+        pos = pos[self.sat_of_link] + self._noise("geometry")[:, None]
+        vel = vel[self.sat_of_link]
+        geometry = {
+            "sat_pos_x": pos[:, 0], "sat_pos_y": pos[:, 1], "sat_pos_z": pos[:, 2],
+            "sat_vel_x": vel[:, 0], "sat_vel_y": vel[:, 1], "sat_vel_z": vel[:, 2],
+        }
+
+        # --- Beam source (handover resets the offset after leaving the beam) ---
+        self._beam_offset += self._offset_rate * self.tick + self._noise("beam")
+        self._beam_offset[self._beam_offset > 1.2 * self.beam_radius] = 0.0
+        np.maximum(self._beam_offset, 0.0, out=self._beam_offset)
+        beam = {
+            "beam_offset": self._beam_offset.copy(),
+            "beam_radius": self.beam_radius,
+        }
+
+        # --- RF source ---
+        snr = np.maximum(5.0, 30.0 - self._beam_offset * 10 + self._noise("rf"))
+        rf = {
+            "snr": snr,
+            "doppler": self._rng.uniform(-2000, 2000, self.n_links),
+            "timing_drift": self._rng.uniform(-5e-6, 5e-6, self.n_links),
+        }
+
+        # --- Topology source ---
+        sats = self.sat_of_link
+        topology = {
+            "isl_prev": self._isl_prev[sats],
+            "isl_next": self._isl_next[sats],
+            "gateway": self._gateway,
+        }
+
+        # --- Environment source ---
+        environment = {
+            "attenuation": self._rng.choice([0.0, 0.1, 0.3], self.n_links),
+        }
+
+        return [
+            self._batch(now, "geometry", geometry),
+            self._batch(now, "beam", beam),
+            self._batch(now, "rf", rf),
+            self._batch(now, "topology", topology),
+            self._batch(now, "environment", environment),
+        ]
+
+    def ticks(self, max_ticks: Optional[int] = None) -> Iterator[List[TelemetryBatch]]:
+        """
+        Yield one list of per-source batches per tick, paced by the mode:
+        realtime (1x), accelerated (speedup x) or unthrottled.
+        """
+        wall_start = time.perf_counter()
+        emitted = 0
+
+        while max_ticks is None or emitted < max_ticks:
+            self.wait(wall_start, emitted)
+            yield self.generate_tick()
+            emitted += 1
+
+    def wait(self, wall_start: float, emitted: int) -> None:
+        """
+        Sleep until tick `emitted` is due, for a run that started at
+        wall_start (time.perf_counter()); no-op when unthrottled.
+        """
+        if self.mode == "unthrottled":
+            return
+        delay = wall_start + emitted * self.tick / self.speedup - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    def stream(self, max_ticks: Optional[int] = None) -> Iterator[TelemetryBatch]:
+        """
+        Flattened form of ticks(): one batch at a time, like telemetry_stream().
+        """
+        for batches in self.ticks(max_ticks):
+            yield from batches
+
+    def packets(self, max_ticks: Optional[int] = None) -> Iterator[TelemetryPacket]:
+        """
+        Explode batches into per-link TelemetryPackets, skipping dropped rows.
+        Useful to drive the scalar TimeAligner; much slower than batches.
+        """
+        for batch in self.stream(max_ticks):
+            yield from batch_to_packets(batch)
+
+
+def batch_to_packets(batch: TelemetryBatch) -> Iterator[TelemetryPacket]:
+    """
+    Convert the valid rows of a columnar batch into TelemetryPackets.
+    """
+    names = list(batch.columns)
+    rows = np.flatnonzero(batch.valid)
+    cols = [batch.columns[name][rows].tolist() for name in names]
+    stamps = batch.timestamps[rows].tolist()
+    links = batch.link_ids[rows].tolist()
+
+    for i in range(len(rows)):
+        yield TelemetryPacket(
+            timestamp=stamps[i],
+            source=batch.source,
+            payload={name: col[i] for name, col in zip(names, cols)},
+            link_id=links[i],
+        )
@@ -3,17 +3,30 @@
 import time
 import random
 import math
-from typing import Iterator
+from typing import Dict, Iterator, List, Optional, Union
 from dataclasses import asdict
 
-from core_types import TelemetryPacket
+import numpy as np
 
+from core_types import BATCH_COLUMNS, TelemetryBatch, TelemetryPacket
+from edge_ingestion.codec import encode_packet, payload_fields
 
-def telemetry_stream() -> Iterator[TelemetryPacket]:
+
+def telemetry_stream(encode: bool = False) -> Iterator[Union[TelemetryPacket, bytes]]:
     """
     Simulates real-time LEO telemetry from multiple sources.
+    With encode=True each packet is yielded as a binary wire frame
+    (see edge_ingestion/codec.py).
     """
 
+    packets = _packet_stream()
+    if encode:
+        return (encode_packet(packet) for packet in packets)
+    return packets
+
+
+def _packet_stream() -> Iterator[TelemetryPacket]:
+
     start_time = time.time()
     beam_offset = 0.0
 
@@ -74,3 +87,70 @@ def telemetry_stream() -> Iterator[TelemetryPacket]:
 
         time.sleep(0.2)
 
+
+
+# Source order within one cycle of the packet stream
+_SOURCE_ORDER = {source: i for i, source in enumerate(BATCH_COLUMNS)}
+
+
+class PacketSource:
+    """
+    Pipeline source over a single-link packet stream such as
+    telemetry_stream(): each stream cycle (packets arrive in
+    geometry, beam, rf, topology, environment order) becomes one tick
+    of one-row batches for link 0. Payloads are flattened onto the
+    BATCH_COLUMNS fields; a source missing from a cycle (a dropped
+    packet) gets an invalid row. The stream paces itself.
+    """
+
+    def __init__(self, packets: Iterator[TelemetryPacket], tick: float = 0.2):
+        self.packets = packets
+        self.tick = tick
+        self.link_ids = np.zeros(1, dtype=np.int64)
+        self.sat_of_link = np.zeros(1, dtype=np.int64)
+        self._next: Optional[TelemetryPacket] = None
+
+    def wait(self, wall_start: float, emitted: int) -> None:
+        return None
+
+    def _take(self) -> Optional[TelemetryPacket]:
+        packet, self._next = self._next, None
+        return packet if packet is not None else next(self.packets, None)
+
+    def generate_tick(self) -> Optional[List[TelemetryBatch]]:
+        cycle: Dict[str, TelemetryPacket] = {}
+        last = -1
+        while True:
+            packet = self._take()
+            if packet is None:
+                break
+            order = _SOURCE_ORDER.get(packet.source)
+            if order is None:
+                continue
+            if order <= last:
+                self._next = packet
+                break
+            cycle[packet.source] = packet
+            last = order
+            if order == len(_SOURCE_ORDER) - 1:
+                break
+
+        if not cycle:
+            return None
+        now = max(packet.timestamp for packet in cycle.values())
+        return [self._batch(now, source, cycle.get(source)) for source in BATCH_COLUMNS]
+
+    def _batch(self, now: float, source: str, packet: Optional[TelemetryPacket]) -> TelemetryBatch:
+        fields = {} if packet is None else payload_fields(source, packet.payload)
+        return TelemetryBatch(
+            time=now,
+            source=source,
+            link_ids=self.link_ids,
+            timestamps=np.array([now if packet is None else packet.timestamp]),
+            valid=np.array([packet is not None]),
+            columns={
+                name: np.array([fields[name]], dtype=float)
+                for name in BATCH_COLUMNS[source]
+                if name in fields
+            },
+        )
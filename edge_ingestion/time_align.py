@@ -1,49 +1,378 @@
 # edge_ingestion/time_align.py
 
-import time
-from collections import defaultdict
-from typing import Optional
+import math
+from bisect import bisect_left, bisect_right
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional
 
-from core_types import TelemetryPacket, AlignedState
+import numpy as np
+
+from core_types import (
+    BATCH_COLUMNS,
+    MISSING_ID,
+    AlignedState,
+    AlignedStateBatch,
+    TelemetryBatch,
+    TelemetryPacket,
+)
+
+
+class SourceBuffer:
+    """
+    Bounded, timestamp-sorted ring buffer for one telemetry source.
+
+    Entries live in [head, len) of two parallel lists; pruning only
+    advances the head and the lists are compacted lazily, so both
+    in-order appends and pruning are amortized O(1).
+    """
+
+    def __init__(self, capacity: int = 256):
+        self.capacity = capacity
+        self.timestamps: List[float] = []
+        self.packets: List[TelemetryPacket] = []
+        self.head = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self.timestamps) - self.head
+
+    def insert(self, packet: TelemetryPacket) -> None:
+        ts = packet.timestamp
+
+        if len(self.timestamps) == self.head or ts >= self.timestamps[-1]:
+            self.timestamps.append(ts)
+            self.packets.append(packet)
+        else:
+            i = bisect_right(self.timestamps, ts, lo=self.head)
+            self.timestamps.insert(i, ts)
+            self.packets.insert(i, packet)
+
+        # Evict the oldest entry once the buffer is full
+        if len(self) > self.capacity:
+            self.head += 1
+            self.evicted += 1
+
+        self._compact()
+
+    def nearest(self, t: float, window: float) -> Optional[TelemetryPacket]:
+        """
+        Packet closest to t, if one lies within +/- window.
+        """
+        i = bisect_left(self.timestamps, t, lo=self.head)
+        best = None
+        best_gap = window
+
+        for j in (i - 1, i):
+            if self.head <= j < len(self.timestamps):
+                gap = abs(self.timestamps[j] - t)
+                if gap <= best_gap:
+                    best, best_gap = self.packets[j], gap
+
+        return best
+
+    def latest_before(self, t: float) -> Optional[TelemetryPacket]:
+        """
+        Newest packet with timestamp <= t.
+        """
+        i = bisect_right(self.timestamps, t, lo=self.head)
+        return self.packets[i - 1] if i > self.head else None
+
+    def earliest(self) -> Optional[float]:
+        return self.timestamps[self.head] if len(self) else None
+
+    def prune(self, before: float) -> None:
+        """
+        Drop every packet older than `before`.
+        """
+        self.head = bisect_left(self.timestamps, before, lo=self.head)
+        self._compact()
+
+    def _compact(self) -> None:
+        if self.head > self.capacity:
+            del self.timestamps[:self.head]
+            del self.packets[:self.head]
+            self.head = 0
 
 
 class TimeAligner:
-    def __init__(self, window: float = 0.1):
+    """
+    Aligns asynchronous telemetry on event (source) time.
+
+    States are emitted on a fixed grid of tick times, in timestamp
+    order, once the watermark (max seen timestamp - watermark_delay)
+    has passed tick + window. For each source the packet closest to the
+    tick within +/- window is used, falling back to the newest earlier
+    packet or the last known value. Packets behind the watermark are
+    counted as late; beyond allowed_lateness they are dropped.
+
+    In batch mode (add_batch) all links of a tick are aligned at once
+    and emitted as one AlignedStateBatch.
+    """
+
+    def __init__(
+        self,
+        window: float = 0.1,
+        tick: float = 0.2,
+        watermark_delay: float = 0.1,
+        allowed_lateness: float = 1.0,
+        capacity: int = 256,
+        link_ids: Optional[Iterable[int]] = None,
+    ):
         self.window = window
-        self.buffer = defaultdict(list)
-        self.last_state = {}
+        self.tick = tick
+        self.watermark_delay = watermark_delay
+        self.allowed_lateness = allowed_lateness
+        self.capacity = capacity
+
+        self.buffers: Dict[str, SourceBuffer] = {}
+        self.last_state: Dict[str, Dict[str, Any]] = {}
+        self.ready: Deque[AlignedState] = deque()
+
+        self.max_event_time = -math.inf
+        # Integer grid index of the next tick (avoids float drift)
+        self.next_index: Optional[int] = None
+
+        self.received = 0
+        self.emitted = 0
+        self.late = 0
+        self.dropped_late = 0
+
+        # --- Batch mode state (per-link last-known columns) ---
+        self.batch_sources = tuple(BATCH_COLUMNS)
+        # Batch mode link set; defaults to the ids of the first batch
+        self._link_ids: Optional[np.ndarray] = (
+            None if link_ids is None else np.unique(np.asarray(list(link_ids), dtype=np.int64))
+        )
+        self._columns: Dict[str, np.ndarray] = {}
+        self._stamps: Dict[str, np.ndarray] = {}
+        self._source_times: Dict[str, float] = {}
+        self._last_batch_time = -math.inf
+
+    # -------------------- Public API --------------------
+
+    @property
+    def next_emit(self) -> Optional[float]:
+        return None if self.next_index is None else self.next_index * self.tick
+
+    @property
+    def watermark(self) -> float:
+        return self.max_event_time - self.watermark_delay
 
     def add_packet(self, packet: TelemetryPacket) -> Optional[AlignedState]:
-        self.buffer[packet.source].append(packet)
+        """
+        Buffer a packet and return the oldest aligned state that became
+        ready, if any. Further ready states are kept for drain().
+        """
+        self.received += 1
+
+        if packet.timestamp < self.watermark:
+            if packet.timestamp < self.watermark - self.allowed_lateness:
+                self.dropped_late += 1
+                return self._pop_ready()
+            self.late += 1
+
+        buffer = self.buffers.get(packet.source)
+        if buffer is None:
+            buffer = self.buffers[packet.source] = SourceBuffer(self.capacity)
+        buffer.insert(packet)
+
+        if packet.timestamp > self.max_event_time:
+            self.max_event_time = packet.timestamp
+
+        if self.next_index is None:
+            self.next_index = math.ceil(packet.timestamp / self.tick)
 
-        current_time = time.time()
+        self._advance(self.watermark)
+        return self._pop_ready()
 
-        # Check if we have enough data to align
-        aligned_payload = {}
+    def add_packets(self, packets: Iterable[TelemetryPacket]) -> List[AlignedState]:
+        """
+        Buffer many packets and return every state that became ready.
+        """
+        for packet in packets:
+            state = self.add_packet(packet)
+            if state is not None:
+                self.ready.appendleft(state)
+        return self.drain()
 
-        for source, packets in self.buffer.items():
-            # Choose packet closest to current_time
-            closest = min(
-                packets,
-                key=lambda p: abs(p.timestamp - current_time),
-                default=None,
-            )
+    def drain(self) -> List[AlignedState]:
+        """
+        Return all ready states, oldest first.
+        """
+        states = list(self.ready)
+        self.ready.clear()
+        return states
 
-            if closest and abs(closest.timestamp - current_time) <= self.window:
-                aligned_payload[source] = closest.payload
-                self.last_state[source] = closest.payload
+    def flush(self) -> List[AlignedState]:
+        """
+        End of stream: emit every remaining tick regardless of watermark.
+        """
+        self._advance(self.max_event_time + self.window)
+        return self.drain()
+
+    def add_batch(self, batch: TelemetryBatch) -> Optional[AlignedStateBatch]:
+        """
+        Merge one columnar source batch into the per-link last-known
+        columns. Once every batch source has reported a tick, all links
+        are emitted together as an AlignedStateBatch for that tick.
+        """
+        self.received += len(batch.link_ids)
+        if self._link_ids is None:
+            if not len(batch.link_ids):
+                # An empty batch cannot define the link set
+                return None
+            # Sorted like a constructor link set; the rows of this batch
+            # are mapped onto it below like any other batch
+            self._link_ids = np.unique(np.asarray(batch.link_ids, dtype=np.int64))
+
+        n = len(self._link_ids)
+        if not n:
+            return None
+
+        if batch.time > self.max_event_time:
+            self.max_event_time = batch.time
+
+        # --- Map batch rows onto known links (ids are kept sorted) ---
+        if batch.link_ids is self._link_ids or np.array_equal(batch.link_ids, self._link_ids):
+            rows = np.arange(n)
+            known = np.ones(n, dtype=bool)
+        else:
+            rows = np.searchsorted(self._link_ids, batch.link_ids)
+            rows = np.minimum(rows, n - 1)
+            known = self._link_ids[rows] == batch.link_ids
+
+        # --- Late and out-of-order rows ---
+        stamps = self._stamps.get(batch.source)
+        if stamps is None:
+            stamps = self._stamps[batch.source] = np.full(n, -np.inf)
+
+        ts = batch.timestamps
+        behind = ts < self.watermark
+        too_late = ts < self.watermark - self.allowed_lateness
+        self.late += int(np.count_nonzero(behind & ~too_late))
+        self.dropped_late += int(np.count_nonzero(too_late))
+
+        mask = batch.valid & known & ~too_late & (ts >= stamps[rows])
+        target = rows[mask]
+
+        for name, values in batch.columns.items():
+            column = self._columns.get(name)
+            if column is None:
+                column = self._columns[name] = self._new_column(np.asarray(values).dtype, n)
+            column[target] = np.broadcast_to(values, mask.shape)[mask]
+
+        stamps[target] = ts[mask]
+        self._source_times[batch.source] = max(
+            self._source_times.get(batch.source, -math.inf), batch.time
+        )
+
+        # --- Emit once every source has reached the same tick ---
+        ready = min(self._source_times.get(s, -math.inf) for s in self.batch_sources)
+        if ready <= self._last_batch_time:
+            return None
+
+        self._last_batch_time = ready
+        self.emitted += 1
+
+        return AlignedStateBatch(
+            time=ready,
+            link_ids=self._link_ids,
+            columns={name: column.copy() for name, column in self._columns.items()},
+        )
+
+    def seed_batch(self, state: AlignedStateBatch) -> None:
+        """
+        Prime the batch mode last-known columns from an aligned batch
+        (e.g. links handed over from another shard). Only links of this
+        aligner are taken; the next add_batch() rows still override them.
+        """
+        if self._link_ids is None:
+            self._link_ids = np.unique(np.asarray(state.link_ids, dtype=np.int64))
+
+        n = len(self._link_ids)
+        if not len(state.link_ids) or not n:
+            return
+        rows = np.minimum(np.searchsorted(self._link_ids, state.link_ids), n - 1)
+        known = self._link_ids[rows] == state.link_ids
+
+        for name, values in state.columns.items():
+            column = self._columns.get(name)
+            if column is None:
+                column = self._columns[name] = self._new_column(values.dtype, n)
+            column[rows[known]] = values[known]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "received": self.received,
+            "emitted": self.emitted,
+            "late": self.late,
+            "dropped_late": self.dropped_late,
+            "evicted": sum(b.evicted for b in self.buffers.values()),
+            "buffered": sum(len(b) for b in self.buffers.values()),
+        }
+
+    # -------------------- Internals --------------------
+
+    @staticmethod
+    def _new_column(dtype: np.dtype, n: int) -> np.ndarray:
+        # Links not reported yet: NaN, or MISSING_ID for integer columns
+        if np.issubdtype(dtype, np.floating):
+            return np.full(n, np.nan)
+        return np.full(n, MISSING_ID, dtype=dtype)
+
+    def _pop_ready(self) -> Optional[AlignedState]:
+        return self.ready.popleft() if self.ready else None
+
+    def _advance(self, limit: float) -> None:
+        while self.next_emit is not None and self.next_emit + self.window <= limit:
+            t = self.next_emit
+            state = self._align(t)
+
+            if state is not None:
+                self.ready.append(state)
+                self.emitted += 1
+                self.next_index += 1
             else:
-                # Use last known value if missing
-                if source in self.last_state:
-                    aligned_payload[source] = self.last_state[source]
+                # Idle gap: jump to the first tick that can see a packet
+                earliest = min(
+                    (b.earliest() for b in self.buffers.values() if len(b)),
+                    default=None,
+                )
+                if earliest is None:
+                    self.next_index += 1
                 else:
-                    return None  # cannot align yet
+                    first = math.ceil((earliest - self.window) / self.tick)
+                    self.next_index = max(self.next_index + 1, first)
+
+            for buffer in self.buffers.values():
+                buffer.prune(self.next_emit - self.window)
+
+    def _align(self, t: float) -> Optional[AlignedState]:
+        aligned_payload: Dict[str, Dict[str, Any]] = {}
+        fresh = False
+
+        for source, buffer in self.buffers.items():
+            packet = buffer.nearest(t, self.window)
+
+            if packet is not None:
+                fresh = True
+            else:
+                packet = buffer.latest_before(t)
+
+            if packet is not None:
+                aligned_payload[source] = packet.payload
+                self.last_state[source] = packet.payload
+            elif source in self.last_state:
+                # Use last known value if missing
+                aligned_payload[source] = self.last_state[source]
+            else:
+                return None  # cannot align yet
 
-        # Clear buffer to prevent memory growth
-        self.buffer.clear()
+        if not fresh:
+            return None
 
         return AlignedState(
-            time=current_time,
+            time=t,
             geometry=aligned_payload.get("geometry", {}),
             rf=aligned_payload.get("rf", {}),
             beam=aligned_payload.get("beam", {}),
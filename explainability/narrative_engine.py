@@ -1,69 +1,255 @@
-from typing import Dict, Any
+import math
+from collections import OrderedDict
+from typing import Callable, Dict, Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def _decimals(step: float) -> int:
+    return max(0, -math.floor(math.log10(step) + 1e-9))
 
 
 class NarrativeEngine:
     """
     Converts structured reasoning into
     clear, operator-friendly explanations.
+
+    Numbers are rounded into quantized slots (`time_step` seconds for
+    time-to-break / beam exit, `value_step` for throughput and path
+    score, `rtd_step` seconds for RTD; None keeps them as given), and
+    the narrative is a function of those slots only. Missing values
+    (None / NaN) and infinities are kept as their own slots: a missing
+    time-to-break or beam exit drops its sentence, anything else is
+    printed as given ("inf", "None"). Its per-link
+    sentences and the sentences shared by all links of a tick are
+    memoized in an LRU cache of `cache_size` entries keyed by their slot
+    tuples (fingerprint()), so repeated states reuse the text instead of
+    rebuilding it; stats() reports the hit rate.
     """
 
-    def generate(self, reasoning: Dict[str, Any]) -> str:
+    # --- Compiled sentence templates ---
+    _TTB = (
+        "The current link is predicted to become infeasible in approximately {} seconds. "
+        "This estimate is based on observed temporal trends in beam alignment."
+    ).format
+    _NO_TTB = "The system does not yet have sufficient confidence to predict link failure timing."
+    _BEAM_EXIT = "The digital twin indicates a beam exit event in {} seconds.".format
+    _QOS = (
+        "{} parallel alternatives are available. "
+        "The strongest candidate offers an estimated throughput of {} units."
+    ).format
+    _NO_QOS = "No viable parallel links are currently available."
+    _PATH = "The safest alternate path spans {} nodes with a composite stability score of {}.".format
+    _MISSING = "This assessment is partial: {} did not complete in time.".format
+    _STALE = "Under load, {} reuse the previous tick's result.".format
+    _PARTIAL = "To meet the tick deadline, {} were computed in reduced form.".format
+    _RTD = "Prediction uncertainty is influenced by a replication time difference of {} seconds.".format
+
+    def __init__(
+        self,
+        time_step: Optional[float] = 0.1,
+        value_step: Optional[float] = 0.01,
+        rtd_step: Optional[float] = 0.001,
+        cache_size: int = 16384,
+    ):
+        self.time_step = time_step
+        self.value_step = value_step
+        self.rtd_step = rtd_step
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple, str]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # -------------------- Slots --------------------
+
+    @staticmethod
+    def _slot(value: Any, step: Optional[float]) -> Any:
+        if value is None or isinstance(value, float) and math.isnan(value):
+            return None
+        if step is None or math.isinf(value):
+            return value
+        return int(round(value / step))
+
+    @staticmethod
+    def _render(slot: Any, step: Optional[float]) -> str:
+        if step is None or not isinstance(slot, int):
+            return f"{slot}"
+        return f"{slot * step:.{_decimals(step)}f}"
+
+    def fingerprint(self, reasoning: Dict[str, Any]) -> Tuple[Tuple, Tuple]:
+        """
+        Everything the narrative depends on, numbers quantized, split
+        into the per-link part (time-to-break, beam exit) and the part
+        shared by every link of a tick. Equal fingerprints give equal text.
+        """
+        lb = reasoning.get("link_break_prediction") or {}
+        twin = reasoning.get("twin_constraints") or {}
+        beam_exit = twin.get("beam_exit") or {}
+        return (
+            (
+                self._slot(lb.get("time_to_break"), self.time_step),
+                self._slot(beam_exit.get("beam_exit_time"), self.time_step),
+            ),
+            self._shared(
+                reasoning.get("parallel_link_qos"),
+                reasoning.get("safe_path"),
+                reasoning.get("uncertainty_rtd", 0.0),
+                reasoning.get("missing_heads"),
+                reasoning.get("freshness"),
+            ),
+        )
+
+    def _shared(
+        self,
+        qos: Optional[Sequence[Dict[str, Any]]],
+        path: Optional[Dict[str, Any]],
+        rtd: float,
+        missing_heads: Optional[List[str]],
+        freshness: Optional[Dict[str, str]],
+    ) -> Tuple:
+        freshness = freshness or {}
+        return (
+            len(qos or ()),
+            self._slot(qos[0]["throughput"], self.value_step) if qos else None,
+            (len(path["path"]), self._slot(path["score"], self.value_step)) if path else None,
+            tuple(missing_heads or ()),
+            tuple(name for name, state in freshness.items() if state == "stale"),
+            tuple(name for name, state in freshness.items() if state == "partial"),
+            self._slot(rtd, self.rtd_step),
+        )
+
+    # -------------------- Text --------------------
+
+    def _compose_link(self, key: Tuple) -> str:
+        _, ttb, beam_exit = key
         parts = []
 
         # --- Link break explanation ---
-        lb = reasoning.get("link_break_prediction", {})
-        ttb = lb.get("time_to_break")
-
         if ttb is not None:
-            parts.append(
-                f"The current link is predicted to become infeasible in approximately "
-                f"{ttb} seconds."
-            )
-            parts.append(
-                f"This estimate is based on observed temporal trends in beam alignment."
-            )
+            parts.append(self._TTB(self._render(ttb, self.time_step)))
         else:
-            parts.append(
-                "The system does not yet have sufficient confidence to predict link failure timing."
-            )
+            parts.append(self._NO_TTB)
 
         # --- Digital twin constraints ---
-        twin = reasoning.get("twin_constraints", {})
-        beam_exit = twin.get("beam_exit", {})
+        if beam_exit is not None:
+            parts.append(self._BEAM_EXIT(self._render(beam_exit, self.time_step)))
+
+        return " ".join(parts)
 
-        if beam_exit.get("beam_exit_time") is not None:
-            parts.append(
-                f"The digital twin indicates a beam exit event in "
-                f"{beam_exit['beam_exit_time']} seconds."
-            )
+    def _compose_shared(self, key: Tuple) -> str:
+        _, n_qos, throughput, path, missing, stale, partial, rtd = key
+        parts = []
 
         # --- Parallel alternatives ---
-        qos = reasoning.get("parallel_link_qos", [])
-        if qos:
-            best = qos[0]
-            parts.append(
-                f"{len(qos)} parallel alternatives are available. "
-                f"The strongest candidate offers an estimated throughput of "
-                f"{round(best['throughput'], 2)} units."
-            )
+        if n_qos:
+            parts.append(self._QOS(n_qos, self._render(throughput, self.value_step)))
         else:
-            parts.append(
-                "No viable parallel links are currently available."
-            )
+            parts.append(self._NO_QOS)
 
         # --- Safe path ---
-        path = reasoning.get("safe_path")
-        if path:
-            parts.append(
-                f"The safest alternate path spans {len(path['path'])} nodes "
-                f"with a composite stability score of {path['score']}."
-            )
+        if path is not None:
+            parts.append(self._PATH(path[0], self._render(path[1], self.value_step)))
+
+        # --- Incomplete inference ---
+        if missing:
+            parts.append(self._MISSING(", ".join(missing)))
+        if stale:
+            parts.append(self._STALE(", ".join(stale)))
+        if partial:
+            parts.append(self._PARTIAL(", ".join(partial)))
 
         # --- Uncertainty ---
-        rtd = reasoning.get("uncertainty_rtd", 0.0)
-        parts.append(
-            f"Prediction uncertainty is influenced by a replication time difference "
-            f"of {rtd} seconds."
-        )
+        parts.append(self._RTD(self._render(rtd, self.rtd_step)))
 
         return " ".join(parts)
+
+    def _lookup(self, key: Tuple, compose: Callable[[Tuple], str]) -> str:
+        cache = self._cache
+        text = cache.get(key)
+        if text is not None:
+            self.hits += 1
+            cache.move_to_end(key)
+            return text
+
+        self.misses += 1
+        text = compose(key)
+        if self.cache_size > 0:
+            cache[key] = text
+            if len(cache) > self.cache_size:
+                cache.popitem(last=False)
+                self.evictions += 1
+        return text
+
+    def generate(self, reasoning: Dict[str, Any]) -> str:
+        link, shared = self.fingerprint(reasoning)
+        return (
+            self._lookup(("link",) + link, self._compose_link)
+            + " "
+            + self._lookup(("shared",) + shared, self._compose_shared)
+        )
+
+    def generate_batch(
+        self,
+        link_prediction: Dict[str, Any],
+        twin_constraints: Optional[Dict[str, Any]] = None,
+        qos_ranking: Optional[Sequence[Dict[str, Any]]] = None,
+        path_selection: Optional[Dict[str, Any]] = None,
+        rtd: float = 0.0,
+        missing_heads: Optional[List[str]] = None,
+        freshness: Optional[Dict[str, str]] = None,
+    ) -> np.ndarray:
+        """
+        One narrative per link of link-aligned head outputs (columns as
+        returned by predict_batch() / evolve(), in the same link order);
+        QoS, path, RTD and freshness are shared by all links. The shared
+        sentences are built once and the per-link ones once per distinct
+        (time-to-break, beam exit) slot pair. Returns an object array of
+        strings.
+
+        The pipeline itself only narrates the focus link of each tick
+        (generate()); this is for consumers that need every link, e.g.
+        bulk exports and benchmarks/narrative_bench.py.
+        """
+        ttb = np.asarray(link_prediction["time_to_break"], dtype=float)
+        beam_exit = (twin_constraints or {}).get("beam_exit") or {}
+        exit_time = beam_exit.get("beam_exit_time")
+        exit_time = np.full(len(ttb), np.nan) if exit_time is None else np.asarray(exit_time, dtype=float)
+
+        def slots(values: np.ndarray) -> List[np.ndarray]:
+            if self.time_step is not None:
+                values = np.round(values / self.time_step)
+            missing = np.isnan(values)
+            return [np.where(missing, 0.0, values), missing]
+
+        pairs, inverse = np.unique(
+            np.column_stack(slots(ttb) + slots(exit_time)), axis=0, return_inverse=True
+        )
+
+        def slot(value: float, missing: float) -> Any:
+            if missing:
+                return None
+            if self.time_step is None or math.isinf(value):
+                return float(value)
+            return int(value)
+
+        tail = " " + self._lookup(
+            ("shared",) + self._shared(qos_ranking, path_selection, rtd, missing_heads, freshness),
+            self._compose_shared,
+        )
+        texts = np.empty(len(pairs), dtype=object)
+        for i, (t, t_missing, e, e_missing) in enumerate(pairs):
+            texts[i] = self._lookup(("link", slot(t, t_missing), slot(e, e_missing)), self._compose_link) + tail
+        return texts[inverse.reshape(-1)]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._cache),
+            "maxsize": self.cache_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
@@ -1,4 +1,4 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 
 class ReasoningObject:
@@ -15,12 +15,18 @@ class ReasoningObject:
         path_selection: Dict[str, Any] | None,
         twin_constraints: Dict[str, Any],
         rtd: float,
+        missing_heads: Optional[List[str]] = None,
+        freshness: Optional[Dict[str, str]] = None,
     ):
         self.link_prediction = link_prediction
         self.qos_ranking = qos_ranking
         self.path_selection = path_selection
         self.twin_constraints = twin_constraints
         self.rtd = rtd
+        # Heads whose output is a fallback (timed out or failed this tick)
+        self.missing_heads = list(missing_heads or [])
+        # Per output: fresh, partial (degraded), stale (reused) or missing
+        self.freshness = dict(freshness or {})
 
     def as_dict(self) -> Dict[str, Any]:
         """
@@ -33,4 +39,6 @@ class ReasoningObject:
             "safe_path": self.path_selection,
             "twin_constraints": self.twin_constraints,
             "uncertainty_rtd": round(self.rtd, 4),
+            "missing_heads": self.missing_heads,
+            "freshness": self.freshness,
         }
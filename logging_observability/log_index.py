@@ -0,0 +1,341 @@
+import argparse
+import glob
+import gzip
+import itertools
+import json
+import os
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set
+
+import numpy as np
+
+
+# Sidecar index of a JSONL log: <log file>.idx
+INDEX_SUFFIX = ".idx"
+# Approximate log bytes covered by one index entry
+BLOCK_BYTES = 64 * 1024
+# Blocks with more distinct link ids than this are not link-indexed
+MAX_BLOCK_LINKS = 64
+
+
+def index_path(log_path: str) -> str:
+    return log_path + INDEX_SUFFIX
+
+
+def _link_id(record: Dict[str, Any]) -> Optional[int]:
+    state = record.get("aligned_state")
+    link_id = state.get("link_id") if isinstance(state, dict) else None
+    return link_id if isinstance(link_id, int) else None
+
+
+class SparseIndexWriter:
+    """
+    Append-only sparse index of a JSONL log being written: one line per
+    block of about `block_bytes` of log, holding its byte offset and
+    length, record count, timestamp range and (up to `max_links`) the
+    link ids it contains.
+
+    A block is only written once its log bytes are, so the index never
+    points past the data; a log that grew without it (another writer, a
+    crash) is caught up from the last indexed block when reopened.
+    """
+
+    def __init__(self, log_path: str, block_bytes: int = BLOCK_BYTES, max_links: int = MAX_BLOCK_LINKS):
+        self.log_path = log_path
+        self.path = index_path(log_path)
+        self.block_bytes = block_bytes
+        self.max_links = max_links
+        self.entries = 0
+        self._block: Optional[Dict[str, Any]] = None
+        # Finished blocks not yet written; flush() writes them
+        self._pending: List[str] = []
+        self._links: Optional[Set[int]] = set()
+
+        end = _indexed_end(self.path)
+        self.file = open(self.path, "a", encoding="utf-8")
+        size = os.path.getsize(log_path) if os.path.exists(log_path) else 0
+        if end < size:
+            self._catch_up(end, size)
+
+    def _catch_up(self, start: int, end: int) -> None:
+        with open(self.log_path, "rb") as f:
+            f.seek(start)
+            offset = start
+            while offset < end:
+                line = f.readline()
+                if not line:
+                    break
+                try:
+                    record = json.loads(line)
+                    self.add(offset, len(line), float(record["timestamp"]), _link_id(record))
+                except (ValueError, KeyError, TypeError):
+                    # Torn or foreign line: still covered by the block bytes
+                    if self._block is not None:
+                        self._block["length"] += len(line)
+                offset += len(line)
+        self.flush_block()
+        self.flush()
+
+    def add(self, offset: int, length: int, timestamp: float, link_id: Optional[int] = None) -> None:
+        """
+        Register one record line at `offset` of `length` bytes.
+        """
+        block = self._block
+        if block is None:
+            block = self._block = {"offset": offset, "length": 0, "records": 0, "t_min": timestamp, "t_max": timestamp}
+            self._links = set()
+        block["length"] = offset + length - block["offset"]
+        block["records"] += 1
+        if timestamp < block["t_min"]:
+            block["t_min"] = timestamp
+        if timestamp > block["t_max"]:
+            block["t_max"] = timestamp
+        if self._links is not None:
+            if link_id is None or len(self._links) >= self.max_links and link_id not in self._links:
+                self._links = None
+            else:
+                self._links.add(link_id)
+        if block["length"] >= self.block_bytes:
+            self.flush_block()
+
+    def flush_block(self) -> None:
+        if self._block is None:
+            return
+        self._block["links"] = sorted(self._links) if self._links is not None else None
+        self._pending.append(json.dumps(self._block) + "\n")
+        self._block = None
+        self.entries += 1
+
+    def flush(self) -> None:
+        """
+        Write the finished blocks; call once their log bytes are written.
+        """
+        if self._pending:
+            self.file.write("".join(self._pending))
+            self._pending = []
+        self.file.flush()
+
+    def close(self) -> None:
+        self.flush_block()
+        self.flush()
+        self.file.close()
+
+
+def _indexed_end(path: str) -> int:
+    # Log offset right after the last indexed block
+    if not os.path.exists(path):
+        return 0
+    end = 0
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break
+            end = max(end, entry["offset"] + entry["length"])
+    return end
+
+
+def build_index(log_path: str, block_bytes: int = BLOCK_BYTES, max_links: int = MAX_BLOCK_LINKS) -> str:
+    """
+    Create (or complete) the sidecar index of an existing uncompressed
+    log, e.g. one written by the synchronous InferenceLogger.
+    """
+    writer = SparseIndexWriter(log_path, block_bytes, max_links)
+    writer.close()
+    return writer.path
+
+
+# -------------------- Reading --------------------
+
+_SEGMENT = re.compile(r"\.(\d{8}T\d{6}Z)\.(\d+)\.")
+
+
+def _segment_order(path: str):
+    # Rotated names carry <UTC time>.<n>; n is only unique per writer process
+    match = _SEGMENT.search(os.path.basename(path))
+    return (os.path.getmtime(path), match.group(1), int(match.group(2))) if match else (os.path.getmtime(path), "", 0)
+
+
+class LogIndex:
+    """
+    A loaded sidecar index. Block timestamps need not be sorted (the
+    wall clock can step back), so lookups bisect the running maximum of
+    t_max and the running minimum (from the end) of t_min instead.
+    """
+
+    def __init__(self, entries: List[Dict[str, Any]]):
+        self.entries = entries
+        self.offsets = np.array([e["offset"] for e in entries], dtype=np.int64)
+        self.lengths = np.array([e["length"] for e in entries], dtype=np.int64)
+        self.t_min = np.array([e["t_min"] for e in entries], dtype=float)
+        self.t_max = np.array([e["t_max"] for e in entries], dtype=float)
+        self.links = [None if e.get("links") is None else set(e["links"]) for e in entries]
+        self._max_t_max = np.maximum.accumulate(self.t_max) if entries else self.t_max
+        self._min_t_min = np.minimum.accumulate(self.t_min[::-1])[::-1] if entries else self.t_min
+
+    @classmethod
+    def load(cls, path: str) -> "LogIndex":
+        entries = []
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    break
+        return cls(entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def end(self) -> int:
+        return int(self.offsets[-1] + self.lengths[-1]) if len(self) else 0
+
+    def blocks(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        link_ids: Optional[Set[int]] = None,
+    ) -> List[int]:
+        """
+        Blocks that may hold records with start <= timestamp < end (and
+        one of link_ids), in file order.
+        """
+        first = 0 if start is None else int(np.searchsorted(self._max_t_max, start, side="left"))
+        last = len(self) if end is None else int(np.searchsorted(self._min_t_min, end, side="left"))
+        selected = []
+        for i in range(first, last):
+            if start is not None and self.t_max[i] < start or end is not None and self.t_min[i] >= end:
+                continue
+            if link_ids is not None and self.links[i] is not None and not (self.links[i] & link_ids):
+                continue
+            selected.append(i)
+        return selected
+
+
+class LogReader:
+    """
+    Range reads over an inference log and its rotated segments
+    (<stem>.<time>.<n><suffix>[.gz]), via their sparse sidecar indexes.
+
+        for record in LogReader("inference_logs.jsonl").read(start, end):
+            ...
+
+    Only the index blocks overlapping the range are read and parsed;
+    records are yielded lazily in file order. Segments without an index
+    get one built on first use (compressed segments are scanned).
+    """
+
+    def __init__(self, log_file: str = "inference_logs.jsonl", build: bool = True):
+        self.log_file = log_file
+        self.build = build
+
+    def segments(self) -> List[str]:
+        """
+        Log files of this log, rotated segments first (oldest first),
+        the active file last.
+        """
+        stem, suffix = os.path.splitext(self.log_file)
+        rotated = [
+            path for path in glob.glob(glob.escape(stem) + ".*" + suffix) + glob.glob(glob.escape(stem) + ".*" + suffix + ".gz")
+            if path != self.log_file and not path.endswith(INDEX_SUFFIX)
+        ]
+        rotated.sort(key=_segment_order)
+        return rotated + ([self.log_file] if os.path.exists(self.log_file) else [])
+
+    def index(self, segment: str) -> Optional[LogIndex]:
+        path = index_path(segment)
+        if not os.path.exists(path):
+            if not self.build or segment.endswith(".gz"):
+                return None
+            build_index(segment)
+        return LogIndex.load(path)
+
+    def read(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        link_ids: Optional[Sequence[int]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Records with start <= timestamp < end (epoch seconds) and, if
+        given, aligned_state.link_id in link_ids.
+        """
+        wanted = None if link_ids is None else set(int(link_id) for link_id in link_ids)
+        for segment in self.segments():
+            index = self.index(segment)
+            # Rotated segments are complete; the active file may have an unindexed tail
+            if index is not None and len(index) and (segment != self.log_file or index.end >= os.path.getsize(segment)):
+                # Whole segment outside the range: not even opened
+                if start is not None and index.t_max.max() < start or end is not None and index.t_min.min() >= end:
+                    continue
+            yield from self._read_segment(segment, index, start, end, wanted)
+
+    def _read_segment(
+        self,
+        segment: str,
+        index: Optional[LogIndex],
+        start: Optional[float],
+        end: Optional[float],
+        wanted: Optional[Set[int]],
+    ) -> Iterator[Dict[str, Any]]:
+        opener = gzip.open if segment.endswith(".gz") else open
+        with opener(segment, "rb") as f:
+            if index is None:
+                yield from _filter(f, start, end, wanted)
+                return
+
+            for i in index.blocks(start, end, wanted):
+                f.seek(int(index.offsets[i]))
+                data = f.read(int(index.lengths[i]))
+                yield from _filter(data.splitlines(), start, end, wanted)
+
+            # Records appended after the last indexed block
+            f.seek(index.end)
+            yield from _filter(f, start, end, wanted)
+
+
+def _filter(lines, start: Optional[float], end: Optional[float], wanted: Optional[Set[int]]) -> Iterator[Dict[str, Any]]:
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        timestamp = record.get("timestamp")
+        if timestamp is None:
+            continue
+        if start is not None and timestamp < start or end is not None and timestamp >= end:
+            continue
+        if wanted is not None and _link_id(record) not in wanted:
+            continue
+        yield record
+
+
+def _time(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        moment = datetime.fromisoformat(value)
+        return (moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)).timestamp()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Print inference log records of a time range.")
+    parser.add_argument("log_file", nargs="?", default="inference_logs.jsonl")
+    parser.add_argument("--start", type=_time, default=None, help="epoch seconds or ISO time (UTC)")
+    parser.add_argument("--end", type=_time, default=None, help="epoch seconds or ISO time (UTC)")
+    parser.add_argument("--link", type=int, action="append", default=None, help="link id, repeatable")
+    parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args()
+
+    records = LogReader(args.log_file).read(args.start, args.end, args.link)
+    for record in itertools.islice(records, args.limit):
+        print(json.dumps(record))
+
+
+if __name__ == "__main__":
+    main()
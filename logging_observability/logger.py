@@ -1,6 +1,48 @@
+import atexit
+import gzip
 import json
+import os
+import shutil
+import threading
 import time
-from typing import Dict, Any, List
+from collections import deque
+from collections.abc import Mapping
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from logging_observability.log_index import BLOCK_BYTES, SparseIndexWriter, index_path
+
+
+def to_json(value: Any) -> Any:
+    """
+    json.dumps fallback for read-only twin views and NumPy values.
+    """
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def make_record(
+    aligned_state: Dict[str, Any],
+    twin_constraints: Dict[str, Any],
+    ml_outputs: Dict[str, Any],
+    explanation: str,
+    rtd: float,
+    timestamp: Optional[float] = None,
+) -> Dict[str, Any]:
+    return {
+        "timestamp": time.time() if timestamp is None else timestamp,
+        "aligned_state": aligned_state,
+        "digital_twin_constraints": twin_constraints,
+        "ml_outputs": ml_outputs,
+        "explanation": explanation,
+        "replication_time_difference": round(rtd, 4),
+    }
 
 
 class InferenceLogger:
@@ -23,15 +65,297 @@ class InferenceLogger:
         """
         Append a single inference record.
         """
+        record = make_record(aligned_state, twin_constraints, ml_outputs, explanation, rtd)
+        with open(self.log_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, default=to_json) + "\n")
+
+
+# fsync policies of BufferedInferenceLogger
+FSYNC_POLICIES = ("never", "interval", "batch")
+
+
+class BufferedInferenceLogger(InferenceLogger):
+    """
+    InferenceLogger that never touches the file on the caller's thread.
+
+    log() timestamps the record and appends it to a bounded in-memory
+    queue (a microsecond or two); a background writer serializes the queue in
+    batches and writes it once `batch_size` records are waiting or every
+    `flush_interval` seconds. When the queue holds `max_queue` records,
+    new ones are dropped and counted rather than blocking the tick.
 
-        record = {
-            "timestamp": time.time(),
-            "aligned_state": aligned_state,
-            "digital_twin_constraints": twin_constraints,
-            "ml_outputs": ml_outputs,
-            "explanation": explanation,
-            "replication_time_difference": round(rtd, 4),
+    fsync: "never" (leave it to the OS), "interval" (at most every
+    `fsync_interval` seconds) or "batch" (after every written batch).
+
+    The active file is always `log_file`. It is rotated once it exceeds
+    `max_bytes` or is older than `rotate_interval` seconds: renamed to
+    <stem>.<UTC time>.<n><suffix>, gzip-compressed when `compress`.
+
+    With `index_block` set, a sparse sidecar index (<log_file>.idx, see
+    log_index.LogReader) maps timestamps and link ids to byte offsets,
+    one entry per block of about that many bytes; it is rotated and
+    compressed along with its file.
+
+    Records are serialized later on the writer thread, so they must not
+    be mutated after log(). close() (also run at exit) drains the queue.
+    """
+
+    def __init__(
+        self,
+        log_file: str = "inference_logs.jsonl",
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+        max_queue: int = 100_000,
+        fsync: str = "interval",
+        fsync_interval: float = 5.0,
+        max_bytes: Optional[int] = 64 * 1024 * 1024,
+        rotate_interval: Optional[float] = None,
+        compress: bool = False,
+        index_block: Optional[int] = BLOCK_BYTES,
+    ):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, got '{fsync}'")
+        super().__init__(log_file)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.compress = compress
+        self.index_block = index_block
+
+        # (timestamp, *log() arguments); records are built by the writer
+        self.queue: Deque[Tuple[Any, ...]] = deque()
+        self.accepted = 0
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self.bytes = 0
+        self.rotations = 0
+        self.errors = 0
+        self.max_depth = 0
+
+        self._file = None
+        self._index: Optional[SparseIndexWriter] = None
+        self._file_bytes = 0
+        self._file_opened = 0.0
+        self._last_fsync = time.monotonic()
+        self._rotated = 0
+        # Records taken off the queue and written (or failed)
+        self._done = 0
+        # Record counts flush() asked for / the writer has flushed up to
+        self._flush_to = 0
+        self._flushed = 0
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="inference-logger", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # -------------------- Producer side --------------------
+
+    def log(
+        self,
+        aligned_state: Dict[str, Any],
+        twin_constraints: Dict[str, Any],
+        ml_outputs: Dict[str, Any],
+        explanation: str,
+        rtd: float,
+    ) -> None:
+        """
+        Queue a single inference record for the writer thread.
+        """
+        queue = self.queue
+        depth = len(queue)
+        if depth >= self.max_queue or self._closed:
+            self.dropped += 1
+            return
+        queue.append((time.time(), aligned_state, twin_constraints, ml_outputs, explanation, rtd))
+        self.accepted += 1
+        if depth + 1 == self.batch_size:
+            self._wake.set()
+        if depth >= self.max_depth:
+            self.max_depth = depth + 1
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until everything queued so far is written and flushed to
+        the file (or timeout); returns whether it was.
+        """
+        target = self.accepted
+        self._flush_to = max(self._flush_to, target)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._flushed < target and self._thread.is_alive():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            self._wake.set()
+            time.sleep(0.001)
+        return self._flushed >= target
+
+    def close(self) -> None:
+        """
+        Stop accepting records, drain the queue and close the file.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        atexit.unregister(self.close)
+
+    def __enter__(self) -> "BufferedInferenceLogger":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": len(self.queue),
+            "accepted": self.accepted,
+            "max_depth": self.max_depth,
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "bytes": self.bytes,
+            "rotations": self.rotations,
+            "errors": self.errors,
         }
 
-        with open(self.log_file, "a", encoding="utf-8") as f:
-            f.write(json.dumps(record) + "\n")
+    # -------------------- Writer thread --------------------
+
+    # Failures that cost a batch but must not stop the writer
+    _WRITE_ERRORS: Tuple[type, ...] = (OSError,)
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            closing = self._closed
+            # Every record flush() counted is already queued
+            requested = self._flush_to
+            while self.queue:
+                batch = self._take(self.batch_size * 4)
+                try:
+                    self._write_batch(batch)
+                except self._WRITE_ERRORS:
+                    self.errors += len(batch)
+                self._done += len(batch)
+            if requested > self._flushed:
+                try:
+                    self._flush_file()
+                except self._WRITE_ERRORS:
+                    self.errors += 1
+                self._flushed = requested
+            self._sync(closing)
+            if closing:
+                break
+        self._close_file()
+        self._flushed = self._done
+
+    def _take(self, limit: int) -> List[Tuple[Any, ...]]:
+        queue = self.queue
+        batch = []
+        # popleft() is atomic, so producers may keep appending meanwhile
+        while queue and len(batch) < limit:
+            batch.append(queue.popleft())
+        return batch
+
+    def _write_batch(self, batch: List[Tuple[Any, ...]]) -> None:
+        lines = []
+        keys = []
+        for timestamp, *args in batch:
+            try:
+                lines.append(json.dumps(make_record(*args, timestamp=timestamp), default=to_json))
+            except (TypeError, ValueError):
+                self.errors += 1
+                continue
+            state = args[0]
+            keys.append((timestamp, state.get("link_id") if isinstance(state, Mapping) else None))
+        if not lines:
+            return
+
+        f = self._current_file()
+        if self._index is not None:
+            data = bytearray()
+            for line, (timestamp, link_id) in zip(lines, keys):
+                encoded = (line + "\n").encode("utf-8")
+                self._index.add(self._file_bytes + len(data), len(encoded), timestamp, link_id)
+                data += encoded
+        else:
+            data = ("\n".join(lines) + "\n").encode("utf-8")
+
+        f.write(data)
+        f.flush()
+        if self._index is not None:
+            # Only after the log bytes it points at
+            self._index.flush()
+        self._file_bytes += len(data)
+        self.bytes += len(data)
+        self.written += len(lines)
+        self.batches += 1
+        if self.fsync == "batch":
+            os.fsync(f.fileno())
+            self._last_fsync = time.monotonic()
+
+    def _flush_file(self) -> None:
+        # Batches are flushed to the file as they are written
+        pass
+
+    def _sync(self, closing: bool) -> None:
+        # Runs after every drain of the queue
+        if self._file is None or self.fsync == "never":
+            return
+        now = time.monotonic()
+        if closing or now - self._last_fsync >= self.fsync_interval:
+            os.fsync(self._file.fileno())
+            self._last_fsync = now
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+
+    # -------------------- Rotation --------------------
+
+    def _current_file(self):
+        if self._file is not None and self._due_for_rotation():
+            self._rotate()
+        if self._file is None:
+            self._file = open(self.log_file, "ab")
+            self._file_bytes = self._file.tell()
+            self._file_opened = time.monotonic()
+            if self.index_block:
+                self._index = SparseIndexWriter(self.log_file, self.index_block)
+        return self._file
+
+    def _due_for_rotation(self) -> bool:
+        if self.max_bytes is not None and self._file_bytes >= self.max_bytes:
+            return True
+        return self.rotate_interval is not None and time.monotonic() - self._file_opened >= self.rotate_interval
+
+    def _rotate(self) -> None:
+        if self.fsync != "never":
+            os.fsync(self._file.fileno())
+        self._close_file()
+
+        self._rotated += 1
+        stem, suffix = os.path.splitext(self.log_file)
+        stamp = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+        target = f"{stem}.{stamp}.{self._rotated}{suffix}"
+        os.replace(self.log_file, target)
+        if self.index_block:
+            os.replace(index_path(self.log_file), index_path(target))
+        if self.compress:
+            with open(target, "rb") as src, gzip.open(target + ".gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(target)
+            if self.index_block:
+                # Offsets stay valid for the decompressed stream
+                os.replace(index_path(target), index_path(target + ".gz"))
+        self.rotations += 1
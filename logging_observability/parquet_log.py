@@ -0,0 +1,397 @@
+import numbers
+import os
+import re
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from core_types import BATCH_COLUMNS
+from logging_observability.logger import BufferedInferenceLogger
+
+
+# -------------------- Schema --------------------
+
+STATE_COLUMNS = tuple(name for names in BATCH_COLUMNS.values() for name in names)
+CONSTRAINTS = ("beam_exit", "visibility_loss", "route_expiry")
+
+_REASON = pa.dictionary(pa.int16(), pa.string())
+_TIMESTAMP = pa.timestamp("us", tz="UTC")
+
+QOS_TYPE = pa.list_(pa.struct([
+    ("link_id", pa.string()),
+    ("score", pa.float64()),
+    ("latency", pa.float64()),
+    ("throughput", pa.float64()),
+    ("lifetime", pa.float64()),
+]))
+
+SCHEMA = pa.schema(
+    [
+        ("timestamp", _TIMESTAMP),
+        ("time", pa.float64()),
+        ("link_id", pa.int64()),
+    ]
+    + [(name, pa.float64()) for name in STATE_COLUMNS]
+    + [field for name in CONSTRAINTS for field in ((f"{name}_time", pa.float64()), (f"{name}_reason", _REASON))]
+    + [
+        ("time_to_break", pa.float64()),
+        ("confidence", _REASON),
+        ("break_reason", _REASON),
+        ("slope", pa.float64()),
+        ("slope_stderr", pa.float64()),
+        ("qos", QOS_TYPE),
+        ("path", pa.list_(pa.string())),
+        ("path_score", pa.float64()),
+        ("narrative_template", pa.dictionary(pa.int32(), pa.string())),
+        ("narrative_params", pa.list_(pa.string())),
+        ("rtd", pa.float64()),
+    ]
+)
+
+# Low-cardinality columns; floats are left to plain encoding + compression
+DICTIONARY_COLUMNS = [
+    "link_id",
+    *(f"{name}_reason" for name in CONSTRAINTS),
+    "confidence",
+    "break_reason",
+    "qos.list.element.link_id",
+    "path.list.element",
+    "narrative_template",
+]
+
+# Hive partition column, one directory per UTC hour
+PARTITION = "hour"
+_PARTITIONING = ds.partitioning(pa.schema([(PARTITION, pa.string())]), flavor="hive")
+
+
+# -------------------- Flattening --------------------
+
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?")
+
+
+def split_narrative(text: str) -> Tuple[str, List[str]]:
+    """
+    Split a narrative into its template (numbers replaced by {}) and the
+    numbers as written, so the few distinct templates dictionary-encode.
+    """
+    template = _NUMBER.sub("{}", text.replace("{", "{{").replace("}", "}}"))
+    return template, _NUMBER.findall(text)
+
+
+def join_narrative(template: Optional[str], params: Optional[Sequence[str]]) -> Optional[str]:
+    if template is None:
+        return None
+    return template.format(*(params or ()))
+
+
+def _float(value: Any) -> Optional[float]:
+    return None if value is None else float(value)
+
+
+def _int(value: Any) -> Optional[int]:
+    if value is None:
+        return None
+    if isinstance(value, numbers.Integral) and not isinstance(value, bool):
+        return int(value)
+    raise TypeError(f"expected an integer, got {type(value).__name__}")
+
+
+def _str(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def flatten_record(
+    timestamp: float,
+    aligned_state: Dict[str, Any],
+    twin_constraints: Dict[str, Any],
+    ml_outputs: Dict[str, Any],
+    explanation: str,
+    rtd: float,
+) -> Dict[str, Any]:
+    """
+    One inference record (InferenceLogger.log() arguments) as a row of
+    SCHEMA. Values that do not fit the schema raise TypeError or
+    ValueError, so a bad record is rejected on its own.
+    """
+    row: Dict[str, Any] = {
+        "timestamp": int(timestamp * 1e6),
+        "time": _float(aligned_state.get("time")),
+        "link_id": _int(aligned_state.get("link_id")),
+    }
+    for name in STATE_COLUMNS:
+        row[name] = _float(aligned_state.get(name))
+
+    twin_constraints = twin_constraints or {}
+    for name in CONSTRAINTS:
+        constraint = twin_constraints.get(name) or {}
+        row[f"{name}_time"] = _float(constraint.get(f"{name}_time"))
+        row[f"{name}_reason"] = _str(constraint.get("reason"))
+
+    prediction = ml_outputs.get("link_break") or {}
+    row["time_to_break"] = _float(prediction.get("time_to_break"))
+    row["confidence"] = _str(prediction.get("confidence"))
+    row["break_reason"] = _str(prediction.get("reason"))
+    row["slope"] = _float(prediction.get("slope"))
+    row["slope_stderr"] = _float(prediction.get("slope_stderr"))
+
+    row["qos"] = [
+        {
+            "link_id": str(link.get("link_id")),
+            "score": _float(link.get("score")),
+            "latency": _float(link.get("latency")),
+            "throughput": _float(link.get("throughput")),
+            "lifetime": _float(link.get("lifetime")),
+        }
+        for link in ml_outputs.get("qos") or []
+    ]
+    path = ml_outputs.get("path")
+    row["path"] = [str(node) for node in path["path"]] if path else None
+    row["path_score"] = _float(path.get("score")) if path else None
+
+    if explanation is None:
+        row["narrative_template"] = row["narrative_params"] = None
+    elif not isinstance(explanation, str):
+        raise TypeError(f"explanation must be a string, got {type(explanation).__name__}")
+    else:
+        row["narrative_template"], row["narrative_params"] = split_narrative(explanation)
+    row["rtd"] = _float(rtd)
+    return row
+
+
+def _hour(seconds: float) -> str:
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime("%Y-%m-%dT%H")
+
+
+# -------------------- Writer --------------------
+
+class _PartFile:
+    """
+    One Parquet file being written; hidden (dot-prefixed, so queries
+    skip it) until closed.
+    """
+
+    def __init__(self, directory: str, name: str, **options):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, name)
+        self.tmp_path = os.path.join(directory, "." + name)
+        self.file = open(self.tmp_path, "wb")
+        self.writer = pq.ParquetWriter(self.file, SCHEMA, **options)
+        self.opened = time.monotonic()
+        self.rows = 0
+        self.pending: List[Dict[str, Any]] = []
+
+    def close(self, fsync: bool) -> int:
+        self.writer.close()
+        self.file.flush()
+        if fsync:
+            os.fsync(self.file.fileno())
+        size = self.file.tell()
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+        return size
+
+
+class ParquetInferenceLogger(BufferedInferenceLogger):
+    """
+    Columnar inference log: records flattened into SCHEMA and written as
+    zstd-compressed Parquet under <root>/hour=YYYY-MM-DDTHH/ (UTC).
+
+    Same log() call and background writer as BufferedInferenceLogger.
+    The writer buffers rows into row groups of `row_group_size`. Rows
+    only become durable and visible to query_logs once their part file
+    is closed, which happens when its hour ends, after `rotate_interval`
+    seconds, at `max_rows`, on flush() or close(), and as set by fsync:
+    after every written batch ("batch"), at least every `fsync_interval`
+    seconds ("interval"), or only then ("never", without fsync).
+    Reasons, confidences, link ids, path nodes and narrative templates
+    are dictionary-encoded; narrative numbers go to narrative_params.
+    """
+
+    _WRITE_ERRORS = (OSError, pa.ArrowException)
+
+    def __init__(
+        self,
+        root: str = "inference_logs",
+        row_group_size: int = 65_536,
+        max_rows: int = 4_000_000,
+        rotate_interval: Optional[float] = 600.0,
+        compression: str = "zstd",
+        batch_size: int = 1024,
+        flush_interval: float = 1.0,
+        max_queue: int = 100_000,
+        fsync: str = "interval",
+        fsync_interval: float = 60.0,
+    ):
+        # Set before the writer thread starts in super().__init__
+        self.row_group_size = row_group_size
+        self.max_rows = max_rows
+        self.compression = compression
+        self._parts: Dict[str, _PartFile] = {}
+        self._sequence = 0
+        super().__init__(
+            root,
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+            max_queue=max_queue,
+            fsync=fsync,
+            fsync_interval=fsync_interval,
+            max_bytes=None,
+            rotate_interval=rotate_interval,
+            index_block=None,
+        )
+
+    @property
+    def root(self) -> str:
+        return self.log_file
+
+    # -------------------- Writer thread --------------------
+
+    def _write_batch(self, batch: List[Tuple[Any, ...]]) -> None:
+        latest = None
+        for record in batch:
+            try:
+                row = flatten_record(*record)
+            except (TypeError, ValueError, AttributeError, OverflowError):
+                self.errors += 1
+                continue
+            hour = _hour(record[0])
+            part = self._parts.get(hour) or self._open(hour)
+            part.pending.append(row)
+            if len(part.pending) >= self.row_group_size:
+                self._flush_part(hour)
+            latest = hour if latest is None or hour > latest else latest
+
+        # Hours behind the newest record are done
+        for hour in [hour for hour in self._parts if latest is not None and hour < latest]:
+            self._close_part(hour)
+
+    def _flush_file(self) -> None:
+        # Row groups are only readable once the file has its footer
+        self._close_file()
+
+    def _sync(self, closing: bool) -> None:
+        now = time.monotonic()
+        for hour, part in list(self._parts.items()):
+            age = now - part.opened
+            if (
+                closing
+                or self.fsync == "batch"
+                or (self.fsync == "interval" and age >= self.fsync_interval)
+                or (self.rotate_interval is not None and age >= self.rotate_interval)
+            ):
+                self._close_part(hour)
+
+    def _close_file(self) -> None:
+        for hour in list(self._parts):
+            self._close_part(hour)
+
+    def _open(self, hour: str) -> _PartFile:
+        self._sequence += 1
+        name = f"part-{int(time.time() * 1000)}-{os.getpid()}-{self._sequence}.parquet"
+        part = self._parts[hour] = _PartFile(
+            os.path.join(self.root, f"{PARTITION}={hour}"),
+            name,
+            compression=self.compression,
+            use_dictionary=DICTIONARY_COLUMNS,
+        )
+        return part
+
+    def _flush_part(self, hour: str) -> None:
+        part = self._parts[hour]
+        self._write_pending(part)
+        if part.rows >= self.max_rows:
+            self._close_part(hour)
+
+    def _close_part(self, hour: str) -> None:
+        part = self._parts.pop(hour, None)
+        if part is None:
+            return
+        self._write_pending(part)
+        self.bytes += part.close(fsync=self.fsync != "never")
+        self.rotations += 1
+
+    def _write_pending(self, part: _PartFile) -> None:
+        if not part.pending:
+            return
+        try:
+            table = pa.Table.from_pylist(part.pending, schema=SCHEMA)
+        except pa.ArrowException:
+            # Rows are validated by flatten_record(); drop the group rather than the writer
+            self.errors += len(part.pending)
+            part.pending = []
+            return
+        part.writer.write_table(table, row_group_size=self.row_group_size)
+        part.rows += len(part.pending)
+        self.written += len(part.pending)
+        self.batches += 1
+        part.pending = []
+
+
+# -------------------- Queries --------------------
+
+Time = Union[float, datetime]
+
+
+def _utc(value: Time) -> datetime:
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    return datetime.fromtimestamp(value, timezone.utc)
+
+
+def query_logs(
+    root: str,
+    start: Optional[Time] = None,
+    end: Optional[Time] = None,
+    columns: Optional[Sequence[str]] = None,
+    link_ids: Optional[Sequence[int]] = None,
+) -> pa.Table:
+    """
+    Records with start <= timestamp < end (epoch seconds or datetimes),
+    reading only the requested columns. Hour partitions outside the range
+    are never opened and row groups are skipped by their timestamp
+    statistics.
+    """
+    dataset = ds.dataset(
+        root,
+        schema=SCHEMA.append(pa.field(PARTITION, pa.string())),
+        format="parquet",
+        partitioning=_PARTITIONING,
+    ) if os.path.isdir(root) else None
+    if dataset is None:
+        table = SCHEMA.empty_table()
+        return table.select(list(columns)) if columns is not None else table
+
+    condition = None
+    if start is not None:
+        start = _utc(start)
+        condition = (ds.field(PARTITION) >= start.strftime("%Y-%m-%dT%H")) & (
+            ds.field("timestamp") >= pa.scalar(start, type=_TIMESTAMP)
+        )
+    if end is not None:
+        end = _utc(end)
+        upper = (ds.field(PARTITION) <= end.strftime("%Y-%m-%dT%H")) & (
+            ds.field("timestamp") < pa.scalar(end, type=_TIMESTAMP)
+        )
+        condition = upper if condition is None else condition & upper
+    if link_ids is not None:
+        match = ds.field("link_id").isin(pa.array(list(link_ids), type=pa.int64()))
+        condition = match if condition is None else condition & match
+
+    return dataset.to_table(columns=list(columns) if columns is not None else SCHEMA.names, filter=condition)
+
+
+def narratives(table: pa.Table) -> List[Optional[str]]:
+    """
+    Rebuild the explanation text of queried rows (needs the
+    narrative_template and narrative_params columns).
+    """
+    return [
+        join_narrative(template, params)
+        for template, params in zip(
+            table.column("narrative_template").to_pylist(), table.column("narrative_params").to_pylist()
+        )
+    ]
@@ -0,0 +1,245 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+
+# Sub-bucket resolution of LatencyHistogram: 2**SUB_BITS linear buckets
+# per power of two (relative error below 2**-(SUB_BITS - 1), ~1.6%)
+SUB_BITS = 7
+# Largest recordable value: 2**MAX_BITS ns (~18 minutes); larger values clamp
+MAX_BITS = 40
+
+_HALF = 1 << (SUB_BITS - 1)
+_MAX_VALUE = 1 << MAX_BITS
+
+
+class LatencyHistogram:
+    """
+    HDR-style latency histogram over integer nanoseconds.
+
+    Values below 2**SUB_BITS get one bucket each; above, every power of
+    two is split into 2**(SUB_BITS - 1) equal buckets, so the relative
+    bucket width is constant. Recording is O(1) with a fixed memory
+    footprint; percentiles walk the bucket counts.
+    """
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.counts: List[int] = [0] * (self.index(_MAX_VALUE) + 1)
+        self.count = 0
+        self.total = 0
+        self.min = _MAX_VALUE
+        self.max = 0
+
+    @staticmethod
+    def index(value: int) -> int:
+        exponent = value.bit_length() - SUB_BITS
+        if exponent <= 0:
+            return value
+        return exponent * _HALF + (value >> exponent)
+
+    @staticmethod
+    def lower_bound(index: int) -> int:
+        if index < 2 * _HALF:
+            return index
+        exponent = index // _HALF - 1
+        return (index - exponent * _HALF) << exponent
+
+    def record(self, nanoseconds: int) -> None:
+        value = nanoseconds if 0 <= nanoseconds <= _MAX_VALUE else (0 if nanoseconds < 0 else _MAX_VALUE)
+        exponent = value.bit_length() - SUB_BITS
+        self.counts[exponent * _HALF + (value >> exponent) if exponent > 0 else value] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for i, n in enumerate(other.counts):
+            if n:
+                self.counts[i] += n
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, p: float) -> int:
+        """
+        Value (ns) at or below which p percent of the samples fall,
+        reported as the upper edge of its bucket (capped at max).
+        """
+        if not self.count:
+            return 0
+        rank = max(1, int(round(p / 100.0 * self.count)))
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(self.lower_bound(i + 1) - 1, self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        ms = 1e-6
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * ms, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50) * ms, 3),
+            "p90_ms": round(self.percentile(90) * ms, 3),
+            "p99_ms": round(self.percentile(99) * ms, 3),
+            "p999_ms": round(self.percentile(99.9) * ms, 3),
+            "min_ms": round(self.min * ms, 3) if self.count else 0.0,
+            "max_ms": round(self.max * ms, 3),
+        }
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "args", "start")
+
+    def __init__(self, tracer: "Tracer", name: str, args: Optional[Dict[str, Any]]):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        end = time.perf_counter_ns()
+        self.tracer._finish(self.name, self.start, end - self.start, None, self.args)
+
+
+class Tracer:
+    """
+    Monotonic-clock spans feeding per-name latency histograms and
+    counters, with an optional bounded Chrome trace of recent events.
+
+        with tracer.span("align"):
+            ...
+
+    When disabled, span() returns a shared no-op context manager and
+    record() / count() return immediately, so instrumentation can stay
+    in place. Thread-safe: heads record from executor threads.
+    """
+
+    def __init__(self, enabled: bool = True, trace: bool = False, trace_limit: int = 200_000):
+        self.enabled = enabled
+        self.trace = trace
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.counters: Dict[str, int] = {}
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=trace_limit)
+        self._tracks: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    # -------------------- Recording --------------------
+
+    def span(self, name: str, args: Optional[Dict[str, Any]] = None):
+        """
+        Context manager timing its block; `args` are attached to the
+        trace event.
+        """
+        if not self.enabled:
+            return _NOOP
+        return _Span(self, name, args)
+
+    def record(self, name: str, seconds: float, start: Optional[float] = None, track: Optional[str] = None) -> None:
+        """
+        Record a duration measured elsewhere (e.g. in a worker);
+        `start` is its time.perf_counter() start, for the trace.
+        """
+        if not self.enabled:
+            return
+        start_ns = None if start is None else int(start * 1e9)
+        self._finish(name, start_ns, int(seconds * 1e9), track, None)
+
+    def count(self, name: str, value: int = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def _finish(
+        self,
+        name: str,
+        start_ns: Optional[int],
+        duration_ns: int,
+        track: Optional[str],
+        args: Optional[Dict[str, Any]],
+    ) -> None:
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = LatencyHistogram()
+            histogram.record(duration_ns)
+
+            if self.trace and start_ns is not None:
+                event = {
+                    "name": name,
+                    "ph": "X",
+                    "ts": start_ns / 1000.0,
+                    "dur": duration_ns / 1000.0,
+                    "pid": self._pid,
+                    "tid": self._track(track or threading.current_thread().name),
+                }
+                if args:
+                    event["args"] = args
+                self.events.append(event)
+
+    def _track(self, name: str) -> int:
+        track = self._tracks.get(name)
+        if track is None:
+            track = self._tracks[name] = len(self._tracks) + 1
+        return track
+
+    # -------------------- Reading --------------------
+
+    def histogram(self, name: str) -> Optional[LatencyHistogram]:
+        return self.histograms.get(name)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "spans": {name: h.summary() for name, h in self.histograms.items()},
+                "counters": dict(self.counters),
+            }
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """
+        Trace in Chrome trace event format (chrome://tracing, Perfetto).
+        """
+        with self._lock:
+            names = [
+                {"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": name}}
+                for name, tid in self._tracks.items()
+            ]
+            return {"traceEvents": names + list(self.events), "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+            self.events.clear()
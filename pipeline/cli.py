@@ -0,0 +1,115 @@
+"""
+Headless pipeline runner.
+
+Runs the full pipeline (telemetry -> alignment -> twin -> heads ->
+explanation -> sinks) for a number of links at a given tick rate, and
+prints a throughput / per-stage latency summary at exit. --trace writes
+a Chrome trace (chrome://tracing, Perfetto) of the run.
+
+    python -m pipeline.cli --links 16000 --beams-per-sat 16 --mode unthrottled --steps 200 --quiet
+    python -m pipeline.cli --links 1000 --mode unthrottled --steps 100 --quiet --trace trace.json
+    python -m pipeline.cli --links 16000 --beams-per-sat 16 --mode unthrottled --steps 200 --quiet --shards 4
+"""
+
+import argparse
+import json
+
+from edge_ingestion.constellation import PACING_MODES
+from logging_observability.logger import FSYNC_POLICIES, BufferedInferenceLogger
+from logging_observability.parquet_log import ParquetInferenceLogger
+from logging_observability.tracing import Tracer
+from pipeline.executor import HEAD_FIELDS
+from pipeline.orchestrator import DEMO_CANDIDATES, Pipeline, constellation, format_summary, logger_sink, print_tick
+from pipeline.replay import TelemetryRecorder
+
+
+SINKS = ("stdout", "log", "parquet")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--links", type=int, default=1)
+    parser.add_argument("--beams-per-sat", type=int, default=1)
+    parser.add_argument("--tick", type=float, default=0.2, help="simulated seconds per tick")
+    parser.add_argument("--mode", choices=PACING_MODES, default="realtime")
+    parser.add_argument("--speedup", type=float, default=1.0, help="pacing factor in accelerated mode")
+    parser.add_argument("--steps", type=int, default=None, help="stop after this many ticks")
+    parser.add_argument("--duration", type=float, default=None, help="stop after this many seconds")
+    parser.add_argument("--sink", action="append", choices=SINKS, default=None,
+                        help="per-tick output, repeatable (default: stdout)")
+    parser.add_argument("--log-file", default="inference_logs.jsonl")
+    parser.add_argument("--log-fsync", choices=FSYNC_POLICIES, default="interval")
+    parser.add_argument("--log-max-mb", type=float, default=64.0, help="rotate the log file at this size")
+    parser.add_argument("--log-compress", action="store_true", help="gzip rotated log files")
+    parser.add_argument("--parquet-dir", default="inference_logs", help="root of the hour-partitioned Parquet log")
+    parser.add_argument("--quiet", action="store_true", help="no per-tick output, summary only")
+    parser.add_argument("--budget", type=float, default=0.25, help="per-tick latency budget (seconds)")
+    parser.add_argument("--process-heads", nargs="+", choices=HEAD_FIELDS, default=[],
+                        help="heads to run on a process pool (e.g. path_selection)")
+    parser.add_argument("--shards", type=int, default=0,
+                        help="run the per-link stages on this many worker processes")
+    parser.add_argument("--demo-candidates", action="store_true",
+                        help="rank the static demo candidates instead of the links")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    parser.add_argument("--trace", default=None, metavar="FILE", help="write a Chrome trace of the run")
+    parser.add_argument("--no-metrics", action="store_true", help="disable span timing and counters")
+    parser.add_argument("--record-telemetry", default=None, metavar="FILE",
+                        help="record the telemetry for replay (python -m pipeline.replay FILE)")
+    args = parser.parse_args()
+
+    if args.steps is None and args.duration is None:
+        parser.error("one of --steps or --duration is required")
+    if args.trace and args.no_metrics:
+        parser.error("--trace needs metrics enabled")
+
+    chosen = args.sink or ["stdout"]
+    sinks = []
+    loggers = {}
+    if "stdout" in chosen and not args.quiet:
+        sinks.append(print_tick)
+    if "log" in chosen:
+        loggers["logger"] = BufferedInferenceLogger(
+            args.log_file,
+            fsync=args.log_fsync,
+            max_bytes=int(args.log_max_mb * 1024 * 1024),
+            compress=args.log_compress,
+        )
+    if "parquet" in chosen:
+        loggers["parquet"] = ParquetInferenceLogger(args.parquet_dir, fsync=args.log_fsync)
+    sinks.extend(logger_sink(logger) for logger in loggers.values())
+    tracer = Tracer(enabled=not args.no_metrics, trace=args.trace is not None)
+    source = constellation(
+        args.links, args.beams_per_sat, tick=args.tick, mode=args.mode, speedup=args.speedup, seed=args.seed,
+    )
+    if args.record_telemetry:
+        source = TelemetryRecorder(source, args.record_telemetry)
+
+    with Pipeline(
+        source=source,
+        budget=args.budget,
+        candidates=DEMO_CANDIDATES if args.demo_candidates else None,
+        sinks=sinks,
+        tracer=tracer,
+        process_heads=args.process_heads,
+        shards=args.shards,
+    ) as pipeline:
+        try:
+            pipeline.run(args.steps, args.duration)
+        except KeyboardInterrupt:
+            pass
+        summary = pipeline.summary()
+
+    if args.record_telemetry:
+        source.close()
+    for name, logger in loggers.items():
+        logger.close()
+        summary[name] = logger.stats()
+    if args.trace:
+        tracer.export_chrome_trace(args.trace)
+
+    print(json.dumps(summary, indent=2) if args.json else "\n" + format_summary(summary))
+
+
+if __name__ == "__main__":
+    main()
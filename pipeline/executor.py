@@ -0,0 +1,202 @@
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from explainability.reasoning_object import ReasoningObject
+from logging_observability.tracing import Tracer
+
+
+POOLS = ("thread", "process")
+
+# Head name -> ReasoningObject argument it fills
+HEAD_FIELDS = ("link_prediction", "qos_ranking", "path_selection", "twin_constraints", "rtd")
+
+# Stand-in outputs for heads that did not finish in time
+HEAD_FALLBACKS: Dict[str, Any] = {
+    "link_prediction": {"time_to_break": None, "confidence": "unavailable", "reason": "head_missing"},
+    "qos_ranking": [],
+    "path_selection": None,
+    "twin_constraints": {},
+    "rtd": 0.0,
+}
+
+# A head call: (callable, *args)
+HeadCall = Tuple[Any, ...]
+
+
+class TickResult:
+    """
+    Outputs of one executor run: per-head outputs, the heads that timed
+    out or failed, and per-head latency (seconds).
+    """
+
+    def __init__(self):
+        self.outputs: Dict[str, Any] = {}
+        self.missing: List[str] = []
+        self.errors: Dict[str, str] = {}
+        self.latency: Dict[str, float] = {}
+        # Head -> "fresh" | "partial" | "stale" | "missing" (set by the scheduler)
+        self.freshness: Dict[str, str] = {}
+        # Degradation level applied by the scheduler (0 = full tick)
+        self.level = 0
+        self.elapsed = 0.0
+        # Heads whose cached output was reused (set by the incremental dataflow)
+        self.skipped: List[str] = []
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self.outputs.get(name, HEAD_FALLBACKS.get(name, default))
+
+    def reasoning(self) -> ReasoningObject:
+        """
+        ReasoningObject from the head outputs; missing heads get their
+        fallback and are listed in missing_heads.
+        """
+        return ReasoningObject(
+            **{field: self.get(field) for field in HEAD_FIELDS},
+            missing_heads=self.missing,
+            freshness=self.freshness or None,
+        )
+
+
+class InferenceExecutor:
+    """
+    Runs independent inference heads of one tick concurrently.
+
+    Heads run on a thread pool by default (NumPy work releases the GIL);
+    heads listed in process_heads run on a process pool, for pure-Python
+    work such as path search (their callable and arguments are pickled
+    per call, so pass snapshots and stateless callables, e.g. the
+    selector rather than a PathCache). Every head gets a deadline (its
+    own timeout or the default); heads that miss it, or raise, are
+    reported as missing and the tick completes without them, so tick
+    latency is bounded by the slowest head or the deadline, whichever
+    is shorter.
+
+    Inputs are shared, not copied, between thread heads, and a head that
+    missed its deadline keeps running in the background: pass immutable
+    snapshots (twin snapshot, TopologyStore.snapshot(),
+    RingFeatureStore.snapshot()), never stores the next tick updates.
+    shutdown() does not wait for such abandoned heads. With a Tracer,
+    every head is recorded as a "head:<name>" span on its own trace track.
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        timeouts: Optional[Dict[str, float]] = None,
+        process_heads: Iterable[str] = (),
+        max_workers: Optional[int] = None,
+        process_workers: Optional[int] = None,
+        tracer: Optional[Tracer] = None,
+    ):
+        self.timeout = timeout
+        self.timeouts = dict(timeouts or {})
+        self.process_heads = set(process_heads)
+        self.max_workers = max_workers
+        self.process_workers = process_workers
+        # Per-head spans and timeout / error counters
+        self.tracer = tracer
+
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._processes: Optional[ProcessPoolExecutor] = None
+
+        self.ticks = 0
+        self.timeouts_seen: Dict[str, int] = {}
+        # Heads that missed their deadline and may still be running
+        self._abandoned: List[Future] = []
+
+    def _pool(self, name: str) -> Executor:
+        if name in self.process_heads:
+            if self._processes is None:
+                self._processes = ProcessPoolExecutor(max_workers=self.process_workers)
+            return self._processes
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="head")
+        return self._threads
+
+    def run(self, heads: Dict[str, HeadCall], deadline: Optional[float] = None) -> TickResult:
+        """
+        Run {name: (callable, *args)} concurrently and collect the
+        outputs that arrive before each head's deadline. `deadline`
+        (time.perf_counter() value) caps every head's own timeout.
+        """
+        result = TickResult()
+        start = time.perf_counter()
+        futures: Dict[str, Future] = {}
+
+        for name, (fn, *args) in heads.items():
+            futures[name] = self._pool(name).submit(_timed, fn, *args)
+
+        # Wait for heads in deadline order; an expired head costs no extra wait
+        def head_deadline(name: str) -> float:
+            limit = self.timeouts.get(name, self.timeout)
+            own = float("inf") if limit is None else start + limit
+            return own if deadline is None else min(own, deadline)
+
+        for name in sorted(futures, key=head_deadline):
+            future = futures[name]
+            remaining = head_deadline(name) - time.perf_counter()
+            try:
+                output, started, latency = future.result(
+                    timeout=None if remaining == float("inf") else max(remaining, 0.0)
+                )
+            except FutureTimeout:
+                if not future.cancel():
+                    self._abandoned.append(future)
+                result.missing.append(name)
+                self.timeouts_seen[name] = self.timeouts_seen.get(name, 0) + 1
+                if self.tracer is not None:
+                    self.tracer.count(f"timeout:{name}")
+                continue
+            except Exception as exc:
+                result.missing.append(name)
+                result.errors[name] = f"{type(exc).__name__}: {exc}"
+                if self.tracer is not None:
+                    self.tracer.count(f"error:{name}")
+                continue
+
+            result.outputs[name] = output
+            result.latency[name] = latency
+            if self.tracer is not None:
+                self.tracer.record(f"head:{name}", latency, start=started, track=f"head:{name}")
+
+        result.elapsed = time.perf_counter() - start
+        self.ticks += 1
+        self._abandoned = [future for future in self._abandoned if not future.done()]
+        return result
+
+    @property
+    def abandoned(self) -> int:
+        """
+        Heads that missed their deadline and are still running.
+        """
+        self._abandoned = [future for future in self._abandoned if not future.done()]
+        return len(self._abandoned)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the pools. With `wait`, in-flight heads are waited for
+        unless some head was abandoned at its deadline: those may take
+        arbitrarily long, so the pools are then released without waiting.
+        """
+        wait = wait and not self.abandoned
+        for pool in (self._threads, self._processes):
+            if pool is not None:
+                pool.shutdown(wait=wait, cancel_futures=True)
+        self._threads = self._processes = None
+        self._abandoned = []
+
+    def __enter__(self) -> "InferenceExecutor":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+
+
+def _timed(fn: Callable, *args) -> Tuple[Any, float, float]:
+    # Module-level so process pools can pickle it; perf_counter is
+    # system-wide monotonic, so process-pool start times line up too
+    start = time.perf_counter()
+    output = fn(*args)
+    return output, start, time.perf_counter() - start
@@ -0,0 +1,253 @@
+import hashlib
+import struct
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from pipeline.executor import TickResult
+
+
+def fingerprint(value: Any, pins: Optional[List[Any]] = None) -> bytes:
+    """
+    Content digest of a stage input. Objects with an integer `version`
+    (TopologyStore, feature stores) are identified by (id, version)
+    instead of their content; other objects by their attributes
+    (__dict__ or __slots__). Raises TypeError for values that could only
+    be told apart by address, such as callables.
+
+    Versioned objects are appended to `pins`; keeping them alive for as
+    long as the fingerprint is compared against keeps their id unique.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    _feed(digest, value, pins)
+    return digest.digest()
+
+
+def _feed(digest, value: Any, pins: Optional[List[Any]]) -> None:
+    version = getattr(value, "version", None)
+    if isinstance(version, int) and not isinstance(value, (Mapping, list, tuple, np.ndarray)):
+        digest.update(b"v" + struct.pack("<qq", id(value), version))
+        if pins is not None:
+            pins.append(value)
+    elif isinstance(value, np.ndarray):
+        digest.update(b"a" + str(value.dtype).encode() + struct.pack("<q", value.size))
+        digest.update(np.ascontiguousarray(value).tobytes() if value.dtype != object else repr(value.tolist()).encode())
+    elif isinstance(value, Mapping):
+        digest.update(b"m")
+        for key in sorted(value, key=repr):
+            _feed(digest, key, pins)
+            _feed(digest, value[key], pins)
+        digest.update(b"/m")
+    elif isinstance(value, (list, tuple)):
+        digest.update(b"l")
+        for item in value:
+            _feed(digest, item, pins)
+        digest.update(b"/l")
+    elif isinstance(value, (set, frozenset)):
+        digest.update(b"e")
+        for item in sorted(value, key=repr):
+            _feed(digest, item, pins)
+        digest.update(b"/e")
+    elif callable(value):
+        raise TypeError(f"cannot fingerprint callable {value!r}")
+    elif hasattr(value, "__dict__"):
+        digest.update(b"o" + type(value).__qualname__.encode())
+        _feed(digest, vars(value), pins)
+    elif _slots(type(value)):
+        digest.update(b"o" + type(value).__qualname__.encode())
+        for name in _slots(type(value)):
+            digest.update(name.encode())
+            _feed(digest, getattr(value, name, _UNSET), pins)
+        digest.update(b"/o")
+    elif value is _UNSET or type(value).__repr__ is not object.__repr__:
+        digest.update(b"s" + repr(value).encode())
+    else:
+        # The default repr is the object's address, which may be reused
+        raise TypeError(f"cannot fingerprint {type(value).__name__} by content")
+
+
+# Slot not assigned on an instance
+_UNSET = type("_Unset", (), {"__repr__": lambda self: "<unset>"})()
+
+
+def _slots(cls: type) -> List[str]:
+    names = []
+    for klass in cls.__mro__:
+        slots = klass.__dict__.get("__slots__", ())
+        names.extend([slots] if isinstance(slots, str) else slots)
+    return names
+
+
+class Stage:
+    """
+    One dataflow stage: fn(*args) where args are context keys or
+    upstream stage names, re-run only when the fingerprint of its
+    `depends` (default: its args) changes. `always` stages (e.g. wall
+    clock based) run every tick.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable,
+        args: Sequence[str],
+        depends: Optional[Sequence[str]] = None,
+        always: bool = False,
+    ):
+        self.name = name
+        self.fn = fn
+        self.args = tuple(args)
+        self.depends = tuple(self.args if depends is None else depends)
+        self.always = always
+
+        self.key: Optional[bytes] = None
+        # Versioned inputs identified by id in `key`
+        self.pins: List[Any] = []
+        self.output: Any = None
+        # Bumped whenever the stage re-runs, so downstream stages see a change
+        self.generation = 0
+        self.runs = 0
+        self.skips = 0
+
+    def skip_rate(self) -> float:
+        total = self.runs + self.skips
+        return self.skips / total if total else 0.0
+
+
+class IncrementalDataflow:
+    """
+    Incremental execution of per-tick stages.
+
+    Each stage declares what it reads: context entries (dotted paths
+    such as "twin_state.beam" reach into attributes / keys) or other
+    stages. A stage whose inputs hash to the same fingerprint as last
+    tick reuses its cached output instead of running.
+
+    Stages reading only the context run through `runner` (an
+    InferenceExecutor or TickScheduler) concurrently when given; stages
+    fed by other stages then run in registration order.
+    """
+
+    def __init__(self, runner: Any = None):
+        self.runner = runner
+        self.stages: Dict[str, Stage] = {}
+
+    def add_stage(
+        self,
+        name: str,
+        fn: Callable,
+        args: Sequence[str],
+        depends: Optional[Sequence[str]] = None,
+        always: bool = False,
+    ) -> Stage:
+        """
+        Register a stage. References to stages must name stages added
+        earlier; anything else is looked up in the run context.
+        """
+        if name in self.stages:
+            raise ValueError(f"Stage '{name}' already registered")
+        stage = self.stages[name] = Stage(name, fn, args, depends, always)
+        return stage
+
+    # -------------------- Resolution --------------------
+
+    def _resolve(self, ref: str, context: Dict[str, Any], outputs: Dict[str, Any]) -> Any:
+        root, *path = ref.split(".")
+        # A stage missing this tick passes on its last output
+        value = outputs.get(root, self.stages[root].output) if root in self.stages else context[root]
+        for part in path:
+            value = value[part] if isinstance(value, Mapping) else getattr(value, part)
+        return value
+
+    def _key(self, stage: Stage, context: Dict[str, Any], outputs: Dict[str, Any], pins: List[Any]) -> bytes:
+        digest = hashlib.blake2b(digest_size=16)
+        for ref in stage.depends:
+            root = ref.split(".", 1)[0]
+            if root in self.stages:
+                digest.update(ref.encode() + struct.pack("<q", self.stages[root].generation))
+            else:
+                digest.update(ref.encode() + fingerprint(self._resolve(ref, context, outputs), pins))
+        return digest.digest()
+
+    def _upstream(self, stage: Stage) -> bool:
+        return any(ref.split(".", 1)[0] in self.stages for ref in stage.args + stage.depends)
+
+    # -------------------- Tick --------------------
+
+    def run(self, context: Dict[str, Any], **runner_kwargs) -> TickResult:
+        """
+        Run one tick. Returns a TickResult with every stage's output
+        (cached or fresh); result.skipped lists stages that were reused.
+        """
+        outputs: Dict[str, Any] = {}
+        skipped: List[str] = []
+        pending: Dict[str, Optional[bytes]] = {}
+        pins: Dict[str, List[Any]] = {}
+
+        first_wave = [s for s in self.stages.values() if not self._upstream(s)]
+        later = [s for s in self.stages.values() if self._upstream(s)]
+
+        for stage in first_wave:
+            pins[stage.name] = []
+            key = None if stage.always else self._key(stage, context, outputs, pins[stage.name])
+            if key is not None and key == stage.key:
+                outputs[stage.name] = stage.output
+                skipped.append(stage.name)
+            else:
+                pending[stage.name] = key
+
+        calls = {
+            name: (self.stages[name].fn, *[self._resolve(ref, context, outputs) for ref in self.stages[name].args])
+            for name in pending
+        }
+        if self.runner is not None:
+            result = self.runner.run(calls, **runner_kwargs)
+        else:
+            result = TickResult()
+            for name, (fn, *args) in calls.items():
+                result.outputs[name] = fn(*args)
+
+        for name, key in pending.items():
+            stage = self.stages[name]
+            if name in result.outputs and result.freshness.get(name, "fresh") == "fresh":
+                self._store(stage, key, result.outputs[name], pins[name])
+                outputs[name] = result.outputs[name]
+            elif name in result.outputs:
+                # Partial / stale output from the scheduler: serve it, never reuse it
+                stage.key = None
+                stage.pins = []
+                outputs[name] = result.outputs[name]
+
+        for stage in later:
+            stage_pins: List[Any] = []
+            key = None if stage.always else self._key(stage, context, outputs, stage_pins)
+            if key is not None and key == stage.key:
+                outputs[stage.name] = stage.output
+                skipped.append(stage.name)
+                continue
+            args = [self._resolve(ref, context, outputs) for ref in stage.args]
+            outputs[stage.name] = self._store(stage, key, stage.fn(*args), stage_pins)
+
+        for name in skipped:
+            self.stages[name].skips += 1
+            result.freshness.setdefault(name, "fresh")
+
+        result.outputs.update(outputs)
+        result.skipped = skipped
+        return result
+
+    @staticmethod
+    def _store(stage: Stage, key: Optional[bytes], output: Any, pins: List[Any]) -> Any:
+        stage.key = key
+        stage.pins = pins
+        stage.output = output
+        stage.generation += 1
+        stage.runs += 1
+        return output
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {"runs": stage.runs, "skips": stage.skips, "skip_rate": round(stage.skip_rate(), 4)}
+            for name, stage in self.stages.items()
+        }
@@ -0,0 +1,502 @@
+import math
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import networkx as nx
+import numpy as np
+
+from cloud_ml.ann_qos_ranker import QoSRanker
+from cloud_ml.feature_store import RingFeatureStore
+from cloud_ml.gnn_path_selector import SafePathSelector
+from cloud_ml.lstm_link_break import CONFIDENCE_LEVELS, REASON_CODES, LinkBreakPredictor
+from cloud_ml.path_cache import PathCache
+from cloud_ml.topology_store import TopologyStore
+from core_types import AlignedStateBatch, TelemetryBatch
+from digital_twin.forward_evolution import ForwardEvolution
+from digital_twin.rtd import RTDEstimator
+from digital_twin.state_replica import DigitalTwinState
+from edge_ingestion.constellation import ConstellationGenerator
+from edge_ingestion.time_align import TimeAligner
+from explainability.narrative_engine import NarrativeEngine
+from explainability.reasoning_object import ReasoningObject
+from logging_observability.tracing import Tracer
+from pipeline.executor import HEAD_FIELDS, InferenceExecutor, TickResult
+from pipeline.incremental import IncrementalDataflow
+from pipeline.scheduler import TickScheduler
+from pipeline.sharding import SHARD_HEADS, ShardedRuntime
+
+
+# Spans recorded on every tick, in pipeline order
+STAGES = ("ingest", "shards", "align", "twin", "features", "topology", "heads", "explain", "sinks", "tick")
+
+# Static parallel-link candidates of the single-link demo
+DEMO_CANDIDATES = [
+    {"id": "L1", "latency": 35, "bandwidth": 12, "snr": 14, "lifetime": 6},
+    {"id": "L2", "latency": 45, "bandwidth": 18, "snr": 11, "lifetime": 10},
+]
+
+
+def demo_topology() -> nx.Graph:
+    """
+    Named LEO topology of the single-link demo (SAT-A -> GW-1).
+    """
+    graph = nx.Graph()
+    graph.add_edge("SAT-A", "SAT-B", latency=20, stability=8, switch_cost=1)
+    graph.add_edge("SAT-B", "SAT-C", latency=15, stability=7, switch_cost=1)
+    graph.add_edge("SAT-C", "GW-1", latency=25, stability=9, switch_cost=2)
+    return graph
+
+
+Sink = Callable[["PipelineTick"], None]
+
+
+def constellation(links: int, beams_per_sat: int = 1, **options) -> ConstellationGenerator:
+    """
+    Synthetic constellation with at least `links` links.
+    """
+    n_sats = max(1, math.ceil(links / beams_per_sat))
+    return ConstellationGenerator(n_satellites=n_sats, beams_per_sat=beams_per_sat, **options)
+
+
+def link_view(value: Any, row: int) -> Any:
+    """
+    One link's slice of link-aligned outputs (nested dicts of arrays with
+    a "link_ids" column), as plain Python values; NaN becomes None.
+    """
+    if not isinstance(value, dict):
+        return value
+    if "link_ids" not in value:
+        return {key: link_view(item, row) for key, item in value.items()}
+
+    n = len(value["link_ids"])
+    view = {}
+    for key, item in value.items():
+        if isinstance(item, np.ndarray) and item.shape[:1] == (n,):
+            item = item[row].item() if item.dtype != object else item[row]
+            if isinstance(item, float) and math.isnan(item):
+                item = None
+        view[key] = item
+    return view
+
+
+def _decode_prediction(view: Dict[str, Any]) -> Dict[str, Any]:
+    # predict_batch() reports confidence / reason as codes
+    if isinstance(view.get("confidence"), int):
+        view["confidence"] = CONFIDENCE_LEVELS[view["confidence"]]
+    if isinstance(view.get("reason"), int):
+        view["reason"] = REASON_CODES[view["reason"]]
+    return view
+
+
+class PipelineTick:
+    """
+    Everything one tick produced: the merged head outputs (all links),
+    the link the explanation focuses on, its reasoning and narrative.
+    """
+
+    def __init__(
+        self,
+        step: int,
+        state: AlignedStateBatch,
+        result: TickResult,
+        focus: int,
+        reasoning: Dict[str, Any],
+        narrative: str,
+    ):
+        self.step = step
+        self.state = state
+        self.result = result
+        self.focus = focus
+        self.reasoning = reasoning
+        self.narrative = narrative
+
+    @property
+    def time(self) -> float:
+        return self.state.time
+
+    @property
+    def link_id(self) -> int:
+        return int(self.state.link_ids[self.focus])
+
+    def link_state(self) -> Dict[str, Any]:
+        """
+        Aligned values of the focus link, by column name.
+        """
+        return {name: column[self.focus].item() for name, column in self.state.columns.items()}
+
+
+class Pipeline:
+    """
+    The end-to-end pipeline, wired once: constellation telemetry ->
+    alignment -> twin -> feature store / topology -> concurrent heads
+    (incremental dataflow on a deadline-aware scheduler) ->
+    explanation -> sinks.
+
+    Links are processed as columnar batches for any link count; the
+    explanation focuses on the link closest to breaking. ticks() yields
+    one PipelineTick per aligned tick, run() drives it to the end and
+    returns the throughput / latency summary.
+
+    `source` replaces the synthetic constellation with any telemetry
+    source of the same shape (link_ids, sat_of_link, tick, wait(),
+    generate_tick() returning None when exhausted), e.g. a replayed
+    recording. `budget=None` runs the heads inline, without deadlines,
+    so results do not depend on wall-clock timing.
+
+    `topology` fixes the topology graph (e.g. demo_topology(), with
+    `route` between its named nodes) instead of building it from
+    topology telemetry, which is then not applied.
+
+    Heads read snapshots of the feature store and topology, so a head
+    that misses its deadline never sees a later tick's update. Heads in
+    `process_heads` run on a process pool; path selection then calls
+    the uncached selector, since the PathCache lives in this process.
+
+    `shards` > 0 runs the per-link stages (alignment, twin, feature
+    store, twin constraints, link prediction) on that many
+    ShardedRuntime worker processes instead. Their merged state and
+    outputs feed QoS ranking, RTD, path selection (the PathCache over
+    the topology store the runtime updates) and the explanation; the
+    in-process aligner, twin and feature store are then None.
+    """
+
+    def __init__(
+        self,
+        links: int = 1,
+        beams_per_sat: int = 1,
+        tick: float = 0.2,
+        mode: str = "realtime",
+        speedup: float = 1.0,
+        seed: int = 0,
+        budget: Optional[float] = 0.25,
+        head_timeout: float = 1.0,
+        candidates: Optional[List[Dict[str, Any]]] = None,
+        route: Optional[Tuple[str, str]] = None,
+        sinks: Sequence[Sink] = (),
+        tracer: Optional[Tracer] = None,
+        source: Any = None,
+        clock: Optional[Callable[[], float]] = None,
+        link_predictor: Optional[LinkBreakPredictor] = None,
+        process_heads: Sequence[str] = (),
+        topology: Optional[nx.Graph] = None,
+        shards: int = 0,
+    ):
+        self.generator = source or constellation(
+            links, beams_per_sat, tick=tick, mode=mode, speedup=speedup, seed=seed,
+        )
+        self.links = len(self.generator.link_ids)
+        self.sinks = list(sinks)
+        # Stage spans and counters (histograms on, trace events off by default)
+        self.tracer = tracer or Tracer()
+
+        self.topology = TopologyStore() if topology is None else TopologyStore.from_networkx(topology)
+        self.fixed_topology = topology is not None
+
+        self.runtime: Optional[ShardedRuntime] = None
+        self.aligner: Optional[TimeAligner] = None
+        self.twin: Optional[DigitalTwinState] = None
+        self.features: Optional[RingFeatureStore] = None
+        if shards > 0:
+            self.runtime = ShardedRuntime(
+                self.generator.link_ids,
+                workers=shards,
+                # All beams of a satellite on one shard
+                key=self._satellite_of,
+                satellite_of=None if self.fixed_topology else self._satellite_of,
+                topology=self.topology,
+                states=True,
+            )
+        else:
+            self.aligner = TimeAligner(tick=self.generator.tick, link_ids=self.generator.link_ids)
+            self.twin = DigitalTwinState()
+            self.features = RingFeatureStore(self.generator.link_ids)
+
+        self.evolver = ForwardEvolution()
+        self.rtd_estimator = RTDEstimator(clock)
+        self.link_predictor = link_predictor or LinkBreakPredictor()
+        self.qos_ranker = QoSRanker()
+        self.path_selector = PathCache(SafePathSelector())
+        self.narrative_engine = NarrativeEngine()
+
+        self.executor = InferenceExecutor(timeout=head_timeout, process_heads=process_heads, tracer=self.tracer)
+        self.scheduler = TickScheduler(self.executor, budget=budget) if budget is not None else None
+
+        # Static candidates are ranked once; otherwise every link is a candidate
+        self.candidates = candidates
+        self.route = route or ("SAT-0", "GW-0")
+
+        self.heads = IncrementalDataflow(self.scheduler)
+        if self.runtime is None:
+            self.heads.add_stage("twin_constraints", self.evolver.evolve, ["twin_state"], always=True)
+        self.heads.add_stage("rtd", self.rtd_estimator.compute, ["twin_state"], always=True)
+        if self.runtime is None:
+            self.heads.add_stage("link_prediction", self.link_predictor.predict, ["features"])
+        if candidates is None:
+            self.heads.add_stage("qos_ranking", self.qos_ranker.rank, ["twin_state"], always=True)
+        else:
+            self.heads.add_stage("qos_ranking", self.qos_ranker.rank, ["candidates"])
+        select = self.path_selector.selector.select if "path_selection" in process_heads else self.path_selector.select
+        self.heads.add_stage("path_selection", select, ["topology", "source", "target"])
+
+        self.explain = IncrementalDataflow()
+        # The narrative only depends on the engine's quantized slots (RTD alone changes every tick)
+        self.explain.add_stage("narrative", self.narrative_engine.generate, ["reasoning"], depends=["narrative_slots"])
+
+        self.steps = 0
+        self.wall_start: Optional[float] = None
+        self.wall_end: Optional[float] = None
+
+    def _satellite_of(self, link_ids: np.ndarray) -> np.ndarray:
+        rows = np.searchsorted(self.generator.link_ids, link_ids)
+        return np.asarray(self.generator.sat_of_link)[rows]
+
+    # -------------------- One tick --------------------
+
+    @staticmethod
+    def focus_row(prediction: Any) -> int:
+        """
+        Row of the link with the shortest (non-negative) predicted time-to-break.
+        """
+        if not isinstance(prediction, dict) or "link_ids" not in prediction:
+            return 0
+        ttb = np.asarray(prediction["time_to_break"], dtype=float)
+        ttb = np.where(ttb >= 0, ttb, np.nan)
+        if not len(ttb) or np.all(np.isnan(ttb)):
+            return 0
+        return int(np.nanargmin(ttb))
+
+    def _reasoning(self, result: TickResult, row: int) -> ReasoningObject:
+        views = {field: link_view(result.get(field), row) for field in HEAD_FIELDS}
+        if isinstance(views["link_prediction"], dict):
+            views["link_prediction"] = _decode_prediction(views["link_prediction"])
+        return ReasoningObject(**views, missing_heads=result.missing, freshness=result.freshness or None)
+
+    @staticmethod
+    def _merge_shards(result: TickResult, sharded: TickResult) -> None:
+        # Shard heads join the in-process ones; failed shards are errors
+        for head in SHARD_HEADS:
+            if head in sharded.outputs:
+                result.outputs[head] = sharded.outputs[head]
+        result.missing.extend(sharded.missing)
+        result.errors.update(sharded.errors)
+        if result.freshness or sharded.freshness:
+            for head in SHARD_HEADS:
+                result.freshness[head] = sharded.freshness.get(head, "fresh")
+
+    def process(self, batches: Sequence[TelemetryBatch]) -> Optional[PipelineTick]:
+        """
+        Push one tick of per-source batches through every stage.
+        Returns None until the aligner emits a tick.
+        """
+        tracer = self.tracer
+        start = time.perf_counter()
+
+        sharded = None
+        if self.runtime is not None:
+            # Shards align, update their twin / features and run the per-link heads
+            with tracer.span("shards"):
+                sharded = self.runtime.tick(batches)
+            state = sharded.outputs.get("state")
+            if state is None:
+                return None
+        else:
+            aligned = None
+            with tracer.span("align"):
+                for batch in batches:
+                    emitted = self.aligner.add_batch(batch)
+                    if emitted is not None:
+                        aligned = emitted
+            if aligned is None:
+                return None
+
+            with tracer.span("twin"):
+                self.twin.update(aligned)
+                state = self.twin.get_batch()
+
+            with tracer.span("features"):
+                self.features.update(state)
+
+            with tracer.span("topology"):
+                for batch in batches:
+                    if batch.source == "topology" and not self.fixed_topology:
+                        self.topology.apply_batch(batch, self.generator.sat_of_link)
+
+        with tracer.span("heads"):
+            result = self.heads.run({
+                "twin_state": state,
+                "features": None if self.features is None else self.features.snapshot(),
+                "candidates": self.candidates,
+                "topology": self.topology.snapshot(),
+                "source": self.route[0],
+                "target": self.route[1],
+            }, started=start)
+            if sharded is not None:
+                self._merge_shards(result, sharded)
+
+        with tracer.span("explain"):
+            focus = self.focus_row(result.outputs.get("link_prediction"))
+            reasoning = self._reasoning(result, focus).as_dict()
+            narrative = self.explain.run({
+                "reasoning": reasoning,
+                "narrative_slots": self.narrative_engine.fingerprint(reasoning),
+            }).outputs["narrative"]
+
+        record = PipelineTick(self.steps, state, result, focus, reasoning, narrative)
+        with tracer.span("sinks"):
+            for sink in self.sinks:
+                with tracer.span(f"sink:{getattr(sink, '__name__', type(sink).__name__)}"):
+                    sink(record)
+
+        tracer.record("tick", time.perf_counter() - start, start=start)
+        if tracer.enabled:
+            tracer.count("ticks")
+            for name in result.skipped:
+                tracer.count(f"skipped:{name}")
+            for name in result.missing:
+                tracer.count(f"missing:{name}")
+            if result.level:
+                tracer.count("degraded_ticks")
+
+        self.steps += 1
+        return record
+
+    # -------------------- Driving --------------------
+
+    def ticks(self, steps: Optional[int] = None, duration: Optional[float] = None) -> Iterator[PipelineTick]:
+        """
+        Yield processed ticks until `steps` ticks were produced or
+        `duration` seconds (wall clock) have passed; forever if neither.
+        """
+        self.wall_start = time.perf_counter()
+        emitted = produced = 0
+        try:
+            while True:
+                self.generator.wait(self.wall_start, emitted)
+                with self.tracer.span("ingest"):
+                    batches = self.generator.generate_tick()
+                if batches is None:
+                    break
+                emitted += 1
+
+                record = self.process(batches)
+                if record is not None:
+                    produced += 1
+                    yield record
+                if steps is not None and produced >= steps:
+                    break
+                if duration is not None and time.perf_counter() - self.wall_start >= duration:
+                    break
+        finally:
+            self.wall_end = time.perf_counter()
+
+    def run(self, steps: Optional[int] = None, duration: Optional[float] = None) -> Dict[str, Any]:
+        for _ in self.ticks(steps, duration):
+            pass
+        return self.summary()
+
+    def close(self) -> None:
+        self.executor.shutdown()
+        if self.runtime is not None:
+            self.runtime.close()
+
+    def __enter__(self) -> "Pipeline":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # -------------------- Summary --------------------
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Throughput and per-stage latency percentiles (ms) of the run so far.
+        """
+        end = self.wall_end or time.perf_counter()
+        elapsed = end - self.wall_start if self.wall_start is not None else 0.0
+        traced = self.tracer.stats()
+        spans = traced["spans"]
+        # Pipeline stages first, then heads and sinks
+        order = [stage for stage in STAGES if stage in spans] + sorted(set(spans) - set(STAGES))
+        summary = {
+            "ticks": self.steps,
+            "links": self.links,
+            "elapsed_s": round(elapsed, 3),
+            "ticks_per_s": round(self.steps / elapsed, 2) if elapsed else 0.0,
+            "links_per_s": round(self.steps * self.links / elapsed, 1) if elapsed else 0.0,
+            "stages": {stage: spans[stage] for stage in order},
+            "counters": traced["counters"],
+            "skip_rates": {**self.heads.stats(), **self.explain.stats()},
+            "scheduler": self.scheduler.stats() if self.scheduler is not None else None,
+            "path_cache": self.path_selector.stats(),
+            "narrative_cache": self.narrative_engine.stats(),
+        }
+        if self.runtime is not None:
+            summary["shards"] = self.runtime.stats()
+        return summary
+
+
+# -------------------- Sinks --------------------
+
+def print_tick(record: PipelineTick) -> None:
+    """
+    Sink: print the focus link's view of a tick.
+    """
+    reasoning = record.reasoning
+    path = reasoning["safe_path"]
+    print(f"\n[STEP {record.step}] link {record.link_id} of {len(record.state)}")
+    print(f"Beam Offset: {record.link_state().get('beam_offset')}")
+    print(f"Predicted Time-to-Break: {reasoning['link_break_prediction'].get('time_to_break')}")
+    print(f"Parallel Alternatives: {[link['link_id'] for link in reasoning['parallel_link_qos']]}")
+    print(f"Safe Path: {path['path'] if path else None}")
+    print("Explanation:")
+    print(record.narrative)
+
+
+def logger_sink(logger: Any) -> Sink:
+    """
+    Sink writing the focus link's inputs, outputs and explanation to an
+    InferenceLogger.
+    """
+    def log(record: PipelineTick) -> None:
+        reasoning = record.reasoning
+        logger.log(
+            aligned_state={"time": record.time, "link_id": record.link_id, **record.link_state()},
+            twin_constraints=reasoning["twin_constraints"],
+            ml_outputs={
+                "link_break": reasoning["link_break_prediction"],
+                "qos": reasoning["parallel_link_qos"],
+                "path": reasoning["safe_path"],
+            },
+            explanation=record.narrative,
+            rtd=reasoning["uncertainty_rtd"],
+        )
+    # Span name: one "sink:log:<logger type>" span per logger
+    log.__name__ = f"log:{type(logger).__name__}"
+    return log
+
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    """
+    Human-readable run summary.
+    """
+    lines = [
+        f"ticks: {summary['ticks']}  links: {summary['links']}  elapsed: {summary['elapsed_s']} s",
+        f"throughput: {summary['ticks_per_s']} ticks/s, {summary['links_per_s']:,} links/s",
+        f"{'stage':<24}{'count':>8}{'p50 ms':>12}{'p99 ms':>12}{'p99.9 ms':>12}{'max ms':>12}",
+    ]
+    for stage, stats in summary["stages"].items():
+        lines.append(
+            f"{stage:<24}{stats['count']:>8}{stats['p50_ms']:>12.3f}{stats['p99_ms']:>12.3f}"
+            f"{stats['p999_ms']:>12.3f}{stats['max_ms']:>12.3f}"
+        )
+    if summary["counters"]:
+        lines.append("counters: " + ", ".join(f"{name} {value}" for name, value in sorted(summary["counters"].items())))
+    skips = ", ".join(f"{name} {stats['skip_rate']:.0%}" for name, stats in summary["skip_rates"].items())
+    lines.append(f"skip rates: {skips}")
+    lines.append(f"scheduler: {summary['scheduler']}")
+    lines.append(f"path cache: {summary['path_cache']}")
+    lines.append(f"narrative cache: {summary['narrative_cache']}")
+    for name in ("shards", "logger", "parquet"):
+        if name in summary:
+            lines.append(f"{name}: {summary[name]}")
+    return "\n".join(lines)
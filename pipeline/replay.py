@@ -0,0 +1,678 @@
+"""
+Replay and backtest recorded telemetry or inference logs.
+
+Streams a telemetry recording (TelemetryRecorder, `pipeline.cli
+--record-telemetry`) or an inference_logs.jsonl file through the same
+pipeline as the live system, on a simulated clock and as fast as the
+CPU allows, and scores each head against the link breaks observed in
+the replayed data.
+
+    python -m pipeline.replay telemetry.jsonl --horizon 30 --tolerance 2
+"""
+
+import argparse
+import json
+import mmap
+import multiprocessing
+import os
+import time
+from collections import deque
+from collections.abc import Mapping
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from cloud_ml.lstm_link_break import LinkBreakPredictor
+from core_types import BATCH_COLUMNS, TelemetryBatch
+from pipeline.orchestrator import Pipeline, PipelineTick, constellation, format_summary
+
+
+# Bytes of JSON lines handed to one parser task
+CHUNK_BYTES = 4 * 1024 * 1024
+# link_id column value of records logged without a (valid) link id
+NO_LINK = -1
+
+
+class SimulatedClock:
+    """
+    Clock that only moves when told to; replay sets it to the time of
+    the batches being fed, so RTD and other "now" readings follow the
+    recording instead of the wall clock.
+    """
+
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+# -------------------- Recording --------------------
+
+def encode_batch(batch: TelemetryBatch, link_ids: np.ndarray) -> Dict[str, Any]:
+    invalid = np.flatnonzero(~batch.valid)
+    return {
+        "time": batch.time,
+        "source": batch.source,
+        # Omitted when the batch covers the recording's link set
+        "link_ids": None if np.array_equal(batch.link_ids, link_ids) else batch.link_ids.tolist(),
+        "timestamps": batch.timestamps.tolist(),
+        "invalid": invalid.tolist(),
+        "columns": {name: np.asarray(values).tolist() for name, values in batch.columns.items()},
+    }
+
+
+def decode_batch(obj: Dict[str, Any], link_ids: Optional[np.ndarray]) -> TelemetryBatch:
+    ids = link_ids if obj["link_ids"] is None else np.asarray(obj["link_ids"], dtype=np.int64)
+    valid = np.ones(len(obj["timestamps"]), dtype=bool)
+    valid[obj["invalid"]] = False
+    return TelemetryBatch(
+        time=obj["time"],
+        source=obj["source"],
+        link_ids=ids,
+        timestamps=np.asarray(obj["timestamps"], dtype=float),
+        valid=valid,
+        columns={name: np.asarray(values) for name, values in obj["columns"].items()},
+    )
+
+
+class TelemetryRecorder:
+    """
+    Telemetry source wrapper that writes every generated tick to a
+    JSONL recording: a header line (tick, link ids, satellites), then
+    one line per source batch. Everything else is delegated to the
+    wrapped source.
+    """
+
+    def __init__(self, source: Any, path: str):
+        self.source = source
+        self.path = path
+        self.file = open(path, "w", encoding="utf-8")
+        header = {
+            "tick": source.tick,
+            "link_ids": np.asarray(source.link_ids).tolist(),
+            "sat_of_link": np.asarray(source.sat_of_link).tolist(),
+        }
+        self.file.write(json.dumps({"header": header}) + "\n")
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.source, name)
+
+    def generate_tick(self) -> Optional[List[TelemetryBatch]]:
+        batches = self.source.generate_tick()
+        if batches is not None:
+            link_ids = self.source.link_ids
+            self.file.write("".join(json.dumps(encode_batch(batch, link_ids)) + "\n" for batch in batches))
+        return batches
+
+    def close(self) -> None:
+        self.file.close()
+
+
+# -------------------- Chunked parsing --------------------
+
+def line_ranges(path: str, start: int = 0, chunk_bytes: int = CHUNK_BYTES) -> List[Tuple[int, int]]:
+    """
+    Byte ranges of roughly chunk_bytes, each ending on a line boundary.
+    """
+    ranges = []
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        size = len(m)
+        while start < size:
+            end = m.find(b"\n", min(start + chunk_bytes, size - 1))
+            end = size if end < 0 else end + 1
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def _parse_range(task: Tuple[str, str, int, int]) -> Any:
+    # Runs in worker processes: each maps the file and parses its own range
+    path, kind, start, end = task
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        lines = [line for line in m[start:end].splitlines() if line.strip()]
+    if kind == "telemetry":
+        return [decode_batch(json.loads(line), None) for line in lines]
+    return _record_columns([json.loads(line) for line in lines])
+
+
+def flat_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Aligned state as flat BATCH_COLUMNS fields. The single-link logger
+    nests them per source ({"geometry": {"sat_pos": [x, y, z], ...},
+    "beam": {...}, ...}); those groups are flattened, anything else
+    is returned as is.
+    """
+    if not any(isinstance(state.get(source), Mapping) for source in BATCH_COLUMNS):
+        return state
+    flat = {key: value for key, value in state.items() if key not in BATCH_COLUMNS}
+    for source, names in BATCH_COLUMNS.items():
+        payload = state.get(source) or {}
+        if not isinstance(payload, Mapping):
+            raise ValueError(f"aligned_state.{source} must be an object, got {type(payload).__name__}")
+        if source == "geometry":
+            for vector in ("sat_pos", "sat_vel"):
+                values = payload.get(vector)
+                if values is None:
+                    continue
+                if not isinstance(values, (list, tuple)) or len(values) != 3:
+                    raise ValueError(f"aligned_state.geometry.{vector} must be [x, y, z], got {values!r}")
+                for axis, value in zip("xyz", values):
+                    flat[f"{vector}_{axis}"] = value
+        else:
+            flat.update({name: payload[name] for name in names if name in payload})
+    return flat
+
+
+def _number(value: Any) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return np.nan
+    return float(value)
+
+
+def _link_id(value: Any) -> int:
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        return NO_LINK
+    return value
+
+
+def _record_columns(records: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    states = [flat_state(record.get("aligned_state") or {}) for record in records]
+    columns = {
+        "time": np.array([_number(state.get("time")) for state in states], dtype=float),
+        "link_id": np.array([_link_id(state.get("link_id")) for state in states], dtype=np.int64),
+    }
+    for names in BATCH_COLUMNS.values():
+        for name in names:
+            columns[name] = np.array([_number(state.get(name)) for state in states], dtype=float)
+    return columns
+
+
+def parse_parallel(
+    path: str,
+    kind: str,
+    ranges: Sequence[Tuple[int, int]],
+    workers: int = 1,
+    ahead: int = 2,
+) -> Iterator[Any]:
+    """
+    Parse byte ranges on `workers` processes, yielding results in file
+    order with at most workers * ahead chunks in flight.
+    """
+    tasks = [(path, kind, start, end) for start, end in ranges]
+    if workers <= 1:
+        for task in tasks:
+            yield _parse_range(task)
+        return
+
+    with multiprocessing.Pool(workers) as pool:
+        pending: Deque[Any] = deque()
+        queued = iter(tasks)
+        for task in queued:
+            pending.append(pool.apply_async(_parse_range, (task,)))
+            if len(pending) >= workers * ahead:
+                break
+        while pending:
+            result = pending.popleft().get()
+            task = next(queued, None)
+            if task is not None:
+                pending.append(pool.apply_async(_parse_range, (task,)))
+            yield result
+
+
+# -------------------- Replay source --------------------
+
+class ReplaySource:
+    """
+    Telemetry source over a recording, for Pipeline(source=...).
+
+    Telemetry recordings are streamed chunk by chunk. Inference logs
+    only carry the aligned state of each record's link, so they are
+    parsed up front, grouped by aligned time and turned back into one
+    batch per source and tick (timestamps at the tick). A link's row of
+    a source batch is valid only if all of that source's fields were
+    logged. A log without any link ids (the single-link logger) is
+    replayed as link 0; otherwise records without one are skipped and
+    counted in `skipped_records`.
+    """
+
+    mode = "unthrottled"
+
+    def __init__(self, path: str, workers: Optional[int] = None, chunk_bytes: int = CHUNK_BYTES):
+        self.path = path
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_bytes = chunk_bytes
+        self.clock = SimulatedClock()
+        self.ticks_replayed = 0
+        self.skipped_records = 0
+        self.start_time: Optional[float] = None
+
+        with open(path, "rb") as f:
+            first = json.loads(f.readline() or b"{}")
+
+        if "header" in first:
+            self.kind = "telemetry"
+            header = first["header"]
+            self.tick = header["tick"]
+            self.link_ids = np.asarray(header["link_ids"], dtype=np.int64)
+            self.sat_of_link = np.asarray(header["sat_of_link"], dtype=np.int64)
+            ranges = line_ranges(path, self._header_end(), chunk_bytes)
+            self._batches = self._stream(ranges)
+        else:
+            self.kind = "inference_log"
+            self._load_records(line_ranges(path, 0, chunk_bytes))
+        self._peeked: Optional[TelemetryBatch] = None
+
+    @property
+    def n_links(self) -> int:
+        return len(self.link_ids)
+
+    def _header_end(self) -> int:
+        with open(self.path, "rb") as f:
+            f.readline()
+            return f.tell()
+
+    def _stream(self, ranges: Sequence[Tuple[int, int]]) -> Iterator[TelemetryBatch]:
+        for batches in parse_parallel(self.path, "telemetry", ranges, self.workers):
+            for batch in batches:
+                if batch.link_ids is None:
+                    batch.link_ids = self.link_ids
+                yield batch
+
+    def _load_records(self, ranges: Sequence[Tuple[int, int]]) -> None:
+        parts = list(parse_parallel(self.path, "inference_log", ranges, self.workers))
+        columns = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]} if parts else {}
+        keep = np.isfinite(columns["time"]) if columns else np.zeros(0, dtype=bool)
+        if columns:
+            unknown = columns["link_id"] == NO_LINK
+            if unknown.all():
+                columns["link_id"] = np.zeros(len(unknown), dtype=np.int64)
+            else:
+                keep &= ~unknown
+            self.skipped_records = int(len(keep) - keep.sum())
+        columns = {name: values[keep] for name, values in columns.items()}
+        order = np.argsort(columns["time"], kind="stable") if columns else np.zeros(0, dtype=np.int64)
+        columns = {name: values[order] for name, values in columns.items()}
+
+        times = columns.get("time", np.zeros(0))
+        unique, starts = np.unique(times, return_index=True)
+        self.link_ids = np.unique(columns.get("link_id", np.zeros(0, dtype=np.int64)))
+        # No satellite mapping is logged: each link is its own node
+        self.sat_of_link = self.link_ids
+        self.tick = float(np.median(np.diff(unique))) if len(unique) > 1 else 0.2
+        self._records = columns
+        self._groups = list(zip(starts, list(starts[1:]) + [len(times)]))
+        self._batches = self._record_batches()
+
+    def _record_batches(self) -> Iterator[TelemetryBatch]:
+        columns = self._records
+        for start, end in self._groups:
+            # Last record wins when a link was logged twice for one tick
+            ids, last = np.unique(columns["link_id"][start:end][::-1], return_index=True)
+            rows = start + (end - start - 1 - last)
+            now = float(columns["time"][start])
+            for source, names in BATCH_COLUMNS.items():
+                values = {name: columns[name][rows] for name in names}
+                yield TelemetryBatch(
+                    time=now,
+                    source=source,
+                    link_ids=ids,
+                    timestamps=np.full(len(ids), now),
+                    valid=np.logical_and.reduce([np.isfinite(column) for column in values.values()]),
+                    columns=values,
+                )
+
+    # -------------------- Source interface --------------------
+
+    def wait(self, wall_start: float, emitted: int) -> None:
+        return None
+
+    def generate_tick(self) -> Optional[List[TelemetryBatch]]:
+        """
+        Batches of the next recorded tick (consecutive batches sharing a
+        time), or None at the end of the recording.
+        """
+        first = self._peeked or next(self._batches, None)
+        self._peeked = None
+        if first is None:
+            return None
+
+        batches = [first]
+        for batch in self._batches:
+            if batch.time != first.time:
+                self._peeked = batch
+                break
+            batches.append(batch)
+
+        if self.start_time is None:
+            self.start_time = first.time
+        self.clock.now = max(self.clock.now, first.time)
+        self.ticks_replayed += 1
+        return batches
+
+    @property
+    def simulated_seconds(self) -> float:
+        return self.clock.now - self.start_time if self.start_time is not None else 0.0
+
+
+# -------------------- Accuracy --------------------
+
+def _aligned(output: Any, field: str, link_ids: np.ndarray) -> np.ndarray:
+    # Link-aligned output column in the order of link_ids (NaN elsewhere)
+    values = np.full(len(link_ids), np.nan)
+    if not isinstance(output, dict) or field not in output or "link_ids" not in output:
+        return values
+    ids = np.asarray(output["link_ids"])
+    column = np.asarray(output[field], dtype=float)
+    if ids.shape == link_ids.shape and np.array_equal(ids, link_ids):
+        return column
+    rows = np.minimum(np.searchsorted(link_ids, ids), len(link_ids) - 1)
+    known = link_ids[rows] == ids
+    values[rows[known]] = column[known]
+    return values
+
+
+class BreakEvaluator:
+    """
+    Pipeline sink scoring time-to-break heads against observed breaks.
+
+    A break is a link whose aligned beam_offset reaches its beam_radius
+    (the beam edge). Every tick, each head's prediction for every link
+    still inside its beam is held for `horizon` seconds:
+
+        break observed, predicted within horizon   -> detected (error = predicted - observed time to break)
+        break observed, no prediction in horizon   -> missed
+        no break, predicted within horizon         -> false alarm
+        no break, no prediction in horizon         -> true negative
+
+    The QoS head is scored on whether its top-ranked link stayed up for
+    the horizon. Predictions still open at the end are not counted.
+    Open predictions live in (ticks x links) ring arrays, so resolving
+    a tick's breaks is a few vectorized operations.
+    """
+
+    # head -> (output path to its link-aligned result, time-to-break column)
+    HEADS = {
+        "link_prediction": ((), "time_to_break"),
+        "twin_constraints": (("beam_exit",), "beam_exit_time"),
+    }
+
+    def __init__(self, horizon: float = 30.0, tolerance: float = 2.0):
+        self.horizon = horizon
+        self.tolerance = tolerance
+        self.inside: Optional[np.ndarray] = None
+        self.counts = {
+            head: {"detected": 0, "missed": 0, "false_alarms": 0, "true_negatives": 0, "abs_error": 0.0, "within": 0}
+            for head in self.HEADS
+        }
+        self.qos = {"ticks": 0, "survived": 0, "failed": 0}
+        self.breaks = 0
+
+        # Ring of open ticks: slot (first + i) % capacity, i < size
+        self.capacity = 0
+        self.first = 0
+        self.size = 0
+        self._times = np.zeros(0)
+        self._active = np.zeros((0, 0), dtype=bool)
+        self._ttb: Dict[str, np.ndarray] = {}
+        self._top = np.zeros(0, dtype=np.int64)
+
+    def __call__(self, record: PipelineTick) -> None:
+        state = record.state
+        now = record.time
+        offset = state.get("beam_offset")
+        radius = state.get("beam_radius")
+        if offset is None or radius is None:
+            return
+        with np.errstate(invalid="ignore"):
+            inside = offset < radius
+
+        if self.inside is not None and self.inside.shape == inside.shape:
+            broke = np.flatnonzero(self.inside & ~inside & np.isfinite(offset))
+            if len(broke) and self.size:
+                self._resolve(broke, now)
+            self.breaks += len(broke)
+        elif self.inside is not None:
+            # Link set changed: drop the open predictions
+            self.first = self.size = self.capacity = 0
+        self.inside = inside
+
+        while self.size and now - self._times[self.first] > self.horizon:
+            self._expire(self.first)
+            self.first = (self.first + 1) % self.capacity
+            self.size -= 1
+
+        self._append(record, now, inside)
+
+    # -------------------- Ring --------------------
+
+    def _append(self, record: PipelineTick, now: float, inside: np.ndarray) -> None:
+        if self.size == self.capacity:
+            self._grow(len(inside))
+        slot = (self.first + self.size) % self.capacity
+        self.size += 1
+
+        self._times[slot] = now
+        self._active[slot] = inside
+        self._top[slot] = self._top_row(record)
+        for head, (path, field) in self.HEADS.items():
+            output = record.result.outputs.get(head)
+            for key in path:
+                output = output.get(key) if isinstance(output, dict) else None
+            self._ttb[head][slot] = _aligned(output, field, record.state.link_ids)
+
+    def _grow(self, n: int) -> None:
+        capacity = max(16, 2 * self.capacity)
+        order = self._slots()
+
+        times = np.full(capacity, np.nan)
+        active = np.zeros((capacity, n), dtype=bool)
+        top = np.full(capacity, -1, dtype=np.int64)
+        ttb = {head: np.full((capacity, n), np.nan) for head in self.HEADS}
+        if self.size:
+            times[:self.size] = self._times[order]
+            active[:self.size] = self._active[order]
+            top[:self.size] = self._top[order]
+            for head in self.HEADS:
+                ttb[head][:self.size] = self._ttb[head][order]
+
+        self._times, self._active, self._top, self._ttb = times, active, top, ttb
+        self.first = 0
+        self.capacity = capacity
+
+    def _slots(self) -> np.ndarray:
+        return (self.first + np.arange(self.size)) % max(self.capacity, 1)
+
+    @staticmethod
+    def _top_row(record: PipelineTick) -> int:
+        ranking = record.result.outputs.get("qos_ranking")
+        if not isinstance(ranking, list) or not ranking:
+            return -1
+        link_id = ranking[0].get("link_id")
+        if not isinstance(link_id, (int, np.integer)):
+            return -1
+        try:
+            return record.state.row(link_id)
+        except KeyError:
+            return -1
+
+    # -------------------- Scoring --------------------
+
+    def _resolve(self, broke: np.ndarray, now: float) -> None:
+        slots = self._slots()
+        active = self._active[np.ix_(slots, broke)]
+
+        top = self._top[slots]
+        failed = (top >= 0) & np.isin(top, broke)
+        failed[failed] = self._active[slots[failed], top[failed]]
+        self.qos["failed"] += int(failed.sum())
+        self.qos["ticks"] += int(failed.sum())
+        self._top[slots[failed]] = -1
+
+        if not active.any():
+            return
+        observed = (now - self._times[slots])[:, None]
+        for head in self.HEADS:
+            predicted = self._ttb[head][np.ix_(slots, broke)]
+            hit = active & (predicted <= self.horizon)
+            error = np.abs(predicted - observed)[hit]
+            counts = self.counts[head]
+            counts["detected"] += int(hit.sum())
+            counts["missed"] += int((active & ~hit).sum())
+            counts["abs_error"] += float(error.sum())
+            counts["within"] += int((error <= self.tolerance).sum())
+        self._active[np.ix_(slots, broke)] = False
+
+    def _expire(self, slot: int) -> None:
+        active = self._active[slot]
+        top = self._top[slot]
+        if top >= 0 and active[top]:
+            self.qos["survived"] += 1
+            self.qos["ticks"] += 1
+        for head in self.HEADS:
+            alarm = self._ttb[head][slot][active] <= self.horizon
+            counts = self.counts[head]
+            counts["false_alarms"] += int(alarm.sum())
+            counts["true_negatives"] += int((~alarm).sum())
+
+    def report(self) -> Dict[str, Any]:
+        heads = {}
+        for head, c in self.counts.items():
+            positives = c["detected"] + c["missed"]
+            flagged = c["detected"] + c["false_alarms"]
+            heads[head] = {
+                "detected": c["detected"],
+                "missed": c["missed"],
+                "false_alarms": c["false_alarms"],
+                "true_negatives": c["true_negatives"],
+                "recall": round(c["detected"] / positives, 4) if positives else None,
+                "precision": round(c["detected"] / flagged, 4) if flagged else None,
+                "mae_s": round(c["abs_error"] / c["detected"], 3) if c["detected"] else None,
+                "within_tolerance": round(c["within"] / c["detected"], 4) if c["detected"] else None,
+            }
+        qos = dict(self.qos)
+        qos["survival_rate"] = round(qos["survived"] / qos["ticks"], 4) if qos["ticks"] else None
+        heads["qos_ranking"] = qos
+        return {"horizon_s": self.horizon, "tolerance_s": self.tolerance, "breaks": self.breaks, "heads": heads}
+
+
+# -------------------- Backtest --------------------
+
+def backtest(
+    path: str,
+    horizon: float = 30.0,
+    tolerance: float = 2.0,
+    workers: Optional[int] = None,
+    link_predictor: Optional[LinkBreakPredictor] = None,
+    steps: Optional[int] = None,
+    sinks: Sequence[Callable[[PipelineTick], None]] = (),
+) -> Dict[str, Any]:
+    """
+    Replay a recording through the pipeline (heads inline, simulated
+    clock) and score the heads. Returns the pipeline summary plus
+    "replay" (simulated vs wall seconds) and "accuracy".
+    """
+    source = ReplaySource(path, workers=workers)
+    evaluator = BreakEvaluator(horizon, tolerance)
+    with Pipeline(
+        source=source,
+        clock=source.clock,
+        budget=None,
+        link_predictor=link_predictor,
+        sinks=[evaluator, *sinks],
+    ) as pipeline:
+        summary = pipeline.run(steps)
+
+    summary["replay"] = {
+        "kind": source.kind,
+        "ticks": source.ticks_replayed,
+        "skipped_records": source.skipped_records,
+        "simulated_s": round(source.simulated_seconds, 3),
+        "speedup": round(source.simulated_seconds / summary["elapsed_s"], 1) if summary["elapsed_s"] else None,
+    }
+    summary["accuracy"] = evaluator.report()
+    return summary
+
+
+def record(path: str, links: int, beams_per_sat: int, ticks: int, tick: float = 0.2, seed: int = 0) -> None:
+    """
+    Write a synthetic constellation recording of `ticks` ticks.
+    """
+    source = constellation(links, beams_per_sat, tick=tick, mode="unthrottled", seed=seed, start_time=0.0)
+    recorder = TelemetryRecorder(source, path)
+    try:
+        for _ in range(ticks):
+            recorder.generate_tick()
+    finally:
+        recorder.close()
+
+
+def format_accuracy(accuracy: Dict[str, Any]) -> str:
+    lines = [
+        f"breaks observed: {accuracy['breaks']}  (horizon {accuracy['horizon_s']} s, "
+        f"tolerance {accuracy['tolerance_s']} s)",
+        f"{'head':<20}{'recall':>8}{'precision':>11}{'mae s':>9}{'in tol':>8}{'detected':>10}{'missed':>8}{'false':>8}",
+    ]
+    for head, stats in accuracy["heads"].items():
+        if "recall" not in stats:
+            continue
+
+        def cell(value: Optional[float], width: int, fmt: str) -> str:
+            return f"{'-':>{width}}" if value is None else f"{value:>{width}{fmt}}"
+
+        lines.append(
+            f"{head:<20}{cell(stats['recall'], 8, '.3f')}{cell(stats['precision'], 11, '.3f')}"
+            f"{cell(stats['mae_s'], 9, '.2f')}{cell(stats['within_tolerance'], 8, '.3f')}"
+            f"{stats['detected']:>10}{stats['missed']:>8}{stats['false_alarms']:>8}"
+        )
+    qos = accuracy["heads"]["qos_ranking"]
+    lines.append(f"qos_ranking top link survived the horizon: {qos['survived']}/{qos['ticks']}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", help="telemetry recording or inference_logs.jsonl")
+    parser.add_argument("--horizon", type=float, default=30.0, help="seconds a prediction is held open")
+    parser.add_argument("--tolerance", type=float, default=2.0, help="time-to-break error counted as accurate")
+    parser.add_argument("--workers", type=int, default=None, help="JSON parser processes (default: cores)")
+    parser.add_argument("--steps", type=int, default=None, help="stop after this many ticks")
+    parser.add_argument("--weighting", choices=("linear", "exponential"), default=None,
+                        help="link predictor window weighting")
+    parser.add_argument("--robust", action="store_true", help="Huber-robust link predictor fit")
+    parser.add_argument("--record", type=int, default=None, metavar="TICKS",
+                        help="first write a synthetic recording of this many ticks to PATH")
+    parser.add_argument("--links", type=int, default=1000, help="links of the synthetic recording")
+    parser.add_argument("--beams-per-sat", type=int, default=16)
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args()
+
+    if args.record:
+        start = time.perf_counter()
+        record(args.path, args.links, args.beams_per_sat, args.record)
+        print(f"recorded {args.record} ticks in {time.perf_counter() - start:.1f} s")
+
+    predictor = LinkBreakPredictor(weighting=args.weighting, robust=args.robust)
+    summary = backtest(
+        args.path,
+        horizon=args.horizon,
+        tolerance=args.tolerance,
+        workers=args.workers,
+        link_predictor=predictor,
+        steps=args.steps,
+    )
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    replay = summary["replay"]
+    print(format_summary(summary))
+    print(
+        f"replayed {replay['ticks']} ticks ({replay['kind']}), {replay['simulated_s']} simulated s "
+        f"in {summary['elapsed_s']} s ({replay['speedup']}x real time)"
+    )
+    print(format_accuracy(summary["accuracy"]))
+
+
+if __name__ == "__main__":
+    main()
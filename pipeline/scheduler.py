@@ -0,0 +1,232 @@
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from core_types import AlignedStateBatch
+from pipeline.executor import HeadCall, InferenceExecutor, TickResult
+
+
+# Heads given up first when a tick's budget is at risk
+DEGRADATION_ORDER = ("path_selection", "qos_ranking", "twin_constraints")
+
+
+class TickScheduler:
+    """
+    Gives every tick a deadline and degrades expensive heads to meet it.
+
+    Per-head cost is measured online (EWMA of observed latency, kept per
+    variant). Before running a tick, the expected tick time (heads run
+    concurrently, so the slowest planned head) is compared with the time
+    left until the deadline; while it does not fit, the next step of
+    DEGRADATION_ORDER is applied:
+
+    1. path_selection: reuse the last path
+    2. qos_ranking: rank only the top `degraded_k`
+    3. twin_constraints: for batches, evolve only the `urgent_links`
+       links with the shortest predicted time-to-break and reuse the
+       previous values for the rest; for single states, reuse the
+       previous result
+
+    Links are prioritised by urgency (urgency_order()) only in step 3:
+    the other heads are not per-link work (path selection) or rank the
+    links by QoS rather than by time-to-break, so levels 0-2 run every
+    link in its natural order.
+
+    Heads that still miss the deadline are served from their last
+    output, and the miss is observed as one budget-long run. Every
+    `probe_every` ticks, heads that are being reused, reduced or
+    skipped are run in full anyway (still bounded by the deadline) to
+    re-measure their cost, so the scheduler recovers once load drops.
+    Every result records which outputs are fresh, partial (reduced),
+    stale (reused) or missing.
+    """
+
+    def __init__(
+        self,
+        executor: Optional[InferenceExecutor] = None,
+        budget: float = 0.2,
+        degraded_k: int = 3,
+        urgent_links: int = 256,
+        alpha: float = 0.3,
+        margin: float = 0.1,
+        probe_every: int = 10,
+    ):
+        self.executor = executor or InferenceExecutor()
+        self.budget = budget
+        self.degraded_k = degraded_k
+        self.urgent_links = urgent_links
+        self.alpha = alpha
+        # Fraction of the remaining budget kept free for merging / logging
+        self.margin = margin
+        self.probe_every = probe_every
+
+        self.costs: Dict[str, float] = {}
+        self.last: Dict[str, Any] = {}
+
+        # Last predicted time-to-break per link (batch predictions)
+        self._ttb_ids = np.empty(0, dtype=np.int64)
+        self._ttb = np.empty(0)
+
+        self.ticks = 0
+        self.overruns = 0
+        self.levels: Dict[int, int] = {}
+
+    # -------------------- Cost model --------------------
+
+    def _observe(self, variant: str, seconds: float) -> None:
+        previous = self.costs.get(variant)
+        self.costs[variant] = seconds if previous is None else (1 - self.alpha) * previous + self.alpha * seconds
+
+    def _estimate(self, plan: Dict[str, Tuple[str, HeadCall]]) -> float:
+        return max((self.costs.get(variant, 0.0) for variant, _ in plan.values()), default=0.0)
+
+    # -------------------- Link urgency --------------------
+
+    def urgency_order(self, link_ids: np.ndarray) -> np.ndarray:
+        """
+        Row order of link_ids by last predicted time-to-break, shortest
+        first; links without a prediction go last.
+        """
+        ttb = np.full(len(link_ids), np.inf)
+        if len(self._ttb_ids):
+            pos = np.clip(np.searchsorted(self._ttb_ids, link_ids), 0, len(self._ttb_ids) - 1)
+            known = self._ttb_ids[pos] == link_ids
+            ttb[known] = np.nan_to_num(self._ttb[pos[known]], nan=np.inf)
+        return np.argsort(ttb, kind="stable")
+
+    def _record_ttb(self, prediction: Any) -> None:
+        if not isinstance(prediction, dict) or "link_ids" not in prediction:
+            return
+        ids = np.asarray(prediction["link_ids"])
+        order = np.argsort(ids)
+        self._ttb_ids = ids[order]
+        self._ttb = np.asarray(prediction["time_to_break"], dtype=float)[order]
+
+    # -------------------- Degraded variants --------------------
+
+    @staticmethod
+    def _merge_rows(previous: Any, fresh: Any) -> Any:
+        """
+        Overwrite the rows of `previous` (nested dicts of link-aligned
+        arrays) with those of `fresh`, matched by link_ids.
+        """
+        if not isinstance(fresh, dict):
+            return fresh
+        if "link_ids" not in fresh:
+            return {key: TickScheduler._merge_rows((previous or {}).get(key), value) for key, value in fresh.items()}
+        if not isinstance(previous, dict) or "link_ids" not in previous:
+            return fresh
+
+        ids = np.asarray(previous["link_ids"])
+        order = np.argsort(ids)
+        pos = order[np.clip(np.searchsorted(ids, fresh["link_ids"], sorter=order), 0, len(ids) - 1)]
+        known = ids[pos] == fresh["link_ids"]
+
+        merged = dict(previous)
+        for key, value in fresh.items():
+            if key != "link_ids" and isinstance(value, np.ndarray) and key in previous:
+                column = np.array(previous[key], copy=True)
+                column[pos[known]] = value[known]
+                merged[key] = column
+        return merged
+
+    def _plan(self, heads: Dict[str, HeadCall], level: int) -> Tuple[Dict[str, Tuple[str, HeadCall]], Dict[str, str]]:
+        """
+        Calls to run at a degradation level as {head: (variant, call)},
+        and the freshness of heads that will not run fresh.
+        """
+        degraded = set(DEGRADATION_ORDER[:level])
+        plan: Dict[str, Tuple[str, HeadCall]] = {}
+        freshness: Dict[str, str] = {}
+
+        for name, call in heads.items():
+            if name not in degraded:
+                plan[name] = (name, call)
+            elif name == "qos_ranking":
+                plan[name] = (f"{name}:top_k", (*call, self.degraded_k))
+                freshness[name] = "partial"
+            elif name == "twin_constraints" and isinstance(call[1], AlignedStateBatch):
+                batch = call[1]
+                if "twin_constraints" in self.last and len(batch) > self.urgent_links:
+                    urgent = batch.take(self.urgency_order(batch.link_ids)[:self.urgent_links])
+                    plan[name] = (f"{name}:urgent", (call[0], urgent, *call[2:]))
+                    freshness[name] = "partial"
+                else:
+                    plan[name] = (name, call)
+            else:
+                freshness[name] = "stale" if name in self.last else "missing"
+
+        return plan, freshness
+
+    # -------------------- Tick --------------------
+
+    def run(self, heads: Dict[str, HeadCall], started: Optional[float] = None) -> TickResult:
+        """
+        Run one tick of {head: (callable, *args)} within the budget.
+        The heads' deadline runs from their own start. `started`
+        (time.perf_counter()) is when the tick's work began, e.g. before
+        ingestion; that time counts toward elapsed and overruns but does
+        not shrink the heads' budget, so a slow ingest alone does not
+        degrade every head.
+        """
+        heads_start = time.perf_counter()
+        start = heads_start if started is None else started
+        deadline = heads_start + self.budget
+        available = self.budget * (1 - self.margin)
+
+        level = 0
+        plan, freshness = self._plan(heads, level)
+        while self._estimate(plan) > available and level < len(DEGRADATION_ORDER):
+            level += 1
+            plan, freshness = self._plan(heads, level)
+
+        if level and self.probe_every and self.ticks % self.probe_every == 0:
+            for name in list(freshness):
+                plan[name] = (name, heads[name])
+                del freshness[name]
+
+        result = self.executor.run({name: call for name, (_, call) in plan.items()}, deadline=deadline)
+
+        for name, (variant, _) in plan.items():
+            if name in result.latency:
+                self._observe(variant, result.latency[name])
+                if freshness.get(name) == "partial" and name == "twin_constraints":
+                    result.outputs[name] = self._merge_rows(self.last.get(name), result.outputs[name])
+                freshness.setdefault(name, "fresh")
+            else:
+                if name not in result.errors:
+                    # Missed the deadline: observe it as a whole budget, so
+                    # the penalty decays once probes run fast again
+                    self._observe(variant, self.budget)
+                freshness[name] = "stale" if name in self.last else "missing"
+
+        missing = []
+        for name, state in freshness.items():
+            if state == "stale":
+                result.outputs[name] = self.last[name]
+            elif state == "missing":
+                missing.append(name)
+            else:
+                self.last[name] = result.outputs[name]
+
+        self._record_ttb(result.outputs.get("link_prediction"))
+
+        result.missing = missing
+        result.freshness = freshness
+        result.level = level
+        result.elapsed = time.perf_counter() - start
+
+        self.ticks += 1
+        self.levels[level] = self.levels.get(level, 0) + 1
+        if result.elapsed > self.budget:
+            self.overruns += 1
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "levels": dict(sorted(self.levels.items())),
+            "costs_ms": {name: round(cost * 1000, 3) for name, cost in sorted(self.costs.items())},
+        }
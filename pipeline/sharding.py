@@ -0,0 +1,544 @@
+import hashlib
+import multiprocessing as mp
+import time
+from bisect import insort
+from typing import Any, Callable, Dict, Hashable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from cloud_ml.feature_store import RingFeatureStore
+from cloud_ml.lstm_link_break import LinkBreakPredictor
+from cloud_ml.topology_store import TopologyStore
+from core_types import AlignedStateBatch, TelemetryBatch
+from digital_twin.forward_evolution import ForwardEvolution
+from digital_twin.state_replica import DigitalTwinState
+from edge_ingestion.time_align import TimeAligner
+from pipeline.executor import TickResult
+
+
+# Heads computed inside every shard, merged by link id
+SHARD_HEADS = ("twin_constraints", "link_prediction")
+
+_MASK64 = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+def _mix64(keys: np.ndarray) -> np.ndarray:
+    """
+    SplitMix64 finalizer: well-spread 64-bit hashes of integer keys.
+    """
+    with np.errstate(over="ignore"):
+        x = np.asarray(keys).astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return (x ^ (x >> np.uint64(31))) & _MASK64
+
+
+class HashRing:
+    """
+    Consistent hash ring over workers, each placed at `replicas` points.
+    A key belongs to the first worker point at or after its hash, so
+    adding or removing a worker only moves the keys of that worker.
+    """
+
+    def __init__(self, workers: Sequence[Hashable] = (), replicas: int = 64):
+        self.replicas = replicas
+        self.workers: List[Hashable] = []
+        self._points: List[Tuple[int, int]] = []
+        self._hashes = np.empty(0, dtype=np.uint64)
+        self._owners = np.empty(0, dtype=np.int64)
+        for worker in workers:
+            self.add(worker)
+
+    def __len__(self) -> int:
+        return len(self.workers)
+
+    def _worker_points(self, worker: Hashable) -> List[int]:
+        seed = hashlib.blake2b(repr(worker).encode(), digest_size=8).digest()
+        base = int.from_bytes(seed, "little")
+        return [int(h) for h in _mix64(np.arange(self.replicas, dtype=np.uint64) ^ np.uint64(base))]
+
+    def _rebuild(self) -> None:
+        index = {worker: i for i, worker in enumerate(self.workers)}
+        self._hashes = np.fromiter((h for h, _ in self._points), dtype=np.uint64, count=len(self._points))
+        self._owners = np.fromiter((index[w] for _, w in self._points), dtype=np.int64, count=len(self._points))
+
+    def add(self, worker: Hashable) -> None:
+        if worker in self.workers:
+            raise ValueError(f"Worker {worker!r} already on the ring")
+        self.workers.append(worker)
+        for point in self._worker_points(worker):
+            insort(self._points, (point, worker), key=lambda p: p[0])
+        self._rebuild()
+
+    def remove(self, worker: Hashable) -> None:
+        self.workers.remove(worker)
+        self._points = [p for p in self._points if p[1] != worker]
+        self._rebuild()
+
+    def owners(self, keys: np.ndarray) -> np.ndarray:
+        """
+        Index into self.workers of the owner of every key.
+        """
+        if not self.workers:
+            raise RuntimeError("Hash ring has no workers")
+        pos = np.searchsorted(self._hashes, _mix64(keys))
+        return self._owners[pos % len(self._hashes)]
+
+
+def merge_columns(parts: Sequence[Any]) -> Any:
+    """
+    Merge per-shard outputs: nested dicts of link-aligned arrays (with
+    a "link_ids" column) are concatenated and sorted by link id; other
+    values are taken from the first shard.
+    """
+    parts = [part for part in parts if part is not None]
+    if not parts:
+        return None
+    first = parts[0]
+    if not isinstance(first, dict):
+        return first
+    if "link_ids" not in first:
+        return {key: merge_columns([part.get(key) for part in parts]) for key in first}
+    if len(parts) == 1:
+        return first
+
+    ids = np.concatenate([part["link_ids"] for part in parts])
+    order = np.argsort(ids, kind="stable")
+    n = len(first["link_ids"])
+
+    merged = {}
+    for key, value in first.items():
+        if isinstance(value, np.ndarray) and value.shape[:1] == (n,):
+            merged[key] = np.concatenate([part[key] for part in parts])[order]
+        else:
+            merged[key] = value
+    return merged
+
+
+class _Codes(NamedTuple):
+    # Object (string) column as category codes; pickles as two buffers
+    categories: List[Any]
+    codes: np.ndarray
+
+
+def _pack(value: Any) -> Any:
+    # Object columns pickle element by element; ship them as codes
+    if isinstance(value, dict):
+        return {key: _pack(item) for key, item in value.items()}
+    if isinstance(value, np.ndarray) and value.dtype == object and value.ndim == 1:
+        items = value.tolist()
+        index = {item: i for i, item in enumerate(dict.fromkeys(items))}
+        return _Codes(list(index), np.fromiter(map(index.__getitem__, items), dtype=np.int32, count=len(items)))
+    return value
+
+
+def _unpack(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _unpack(item) for key, item in value.items()}
+    if isinstance(value, _Codes):
+        categories = np.empty(len(value.categories), dtype=object)
+        categories[:] = value.categories
+        return categories[value.codes]
+    return value
+
+
+def split_batch(batch: TelemetryBatch, rows: np.ndarray) -> TelemetryBatch:
+    """
+    The given rows of a telemetry batch (broadcast columns stay shared).
+    """
+    n = len(batch.link_ids)
+    return TelemetryBatch(
+        time=batch.time,
+        source=batch.source,
+        link_ids=batch.link_ids[rows],
+        timestamps=batch.timestamps[rows],
+        valid=batch.valid[rows],
+        columns={
+            name: column[rows] if isinstance(column, np.ndarray) and column.shape[:1] == (n,) else column
+            for name, column in batch.columns.items()
+        },
+    )
+
+
+# -------------------- Shard --------------------
+
+class ShardWorker:
+    """
+    Pipeline state of one shard: its own aligner, twin and feature
+    store over a subset of links, plus the per-link heads. With
+    `states`, every output also carries the shard's aligned twin state
+    ("state": link_ids plus one column per feature).
+    """
+
+    def __init__(
+        self,
+        link_ids: np.ndarray,
+        window_size: int = 10,
+        evolution: Optional[Dict[str, Any]] = None,
+        states: bool = False,
+    ):
+        self.window_size = window_size
+        self.states = states
+        self.evolver = ForwardEvolution(**(evolution or {}))
+        self.predictor = LinkBreakPredictor()
+        self.load(link_ids)
+
+    def load(
+        self,
+        link_ids: np.ndarray,
+        times: Optional[np.ndarray] = None,
+        window: Optional[np.ndarray] = None,
+        latest: Optional[AlignedStateBatch] = None,
+    ) -> None:
+        """
+        (Re)build the shard for a link set. A migrated feature window
+        ((features, links, count) samples at `times`) is replayed into
+        the new store (RingFeatureStore.load_window), and the aligner is
+        primed with the links' last aligned values; the twin is refilled
+        by the next tick.
+        """
+        self.link_ids = np.asarray(link_ids, dtype=np.int64)
+        self.aligner = TimeAligner(link_ids=self.link_ids)
+        self.twin = DigitalTwinState()
+        self.features = RingFeatureStore(self.link_ids, window_size=self.window_size)
+        if window is not None:
+            self.features.load_window(times, window)
+        if latest is not None:
+            self.aligner.seed_batch(latest)
+
+    def export(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Optional[AlignedStateBatch]]:
+        """
+        (link_ids, times, window, latest aligned batch) of the shard, for migration.
+        """
+        latest = self.twin.get_batch() if self.twin.version else None
+        return self.link_ids, self.features.times().copy(), self.features.window_all().copy(), latest
+
+    def process(self, batches: Sequence[TelemetryBatch]) -> Optional[Dict[str, Any]]:
+        aligned = None
+        for batch in batches:
+            emitted = self.aligner.add_batch(batch)
+            if emitted is not None:
+                aligned = emitted
+        if aligned is None:
+            return None
+
+        self.twin.update(aligned)
+        state = self.twin.get_batch()
+        self.features.update(state)
+        output = {
+            "time": state.time,
+            "twin_constraints": self.evolver.evolve(state),
+            "link_prediction": self.predictor.predict(self.features),
+        }
+        if self.states:
+            output["state"] = {"link_ids": state.link_ids, **state.columns}
+        return output
+
+
+def _serve(conn, link_ids: np.ndarray, options: Dict[str, Any]) -> None:
+    # Worker process loop: one (op, payload) request, one reply
+    shard = ShardWorker(link_ids, **options)
+    while True:
+        op, payload = conn.recv()
+        if op == "stop":
+            conn.close()
+            return
+        start = time.perf_counter()
+        try:
+            if op == "tick":
+                reply = _pack(shard.process(payload))
+            elif op == "export":
+                reply = shard.export()
+            elif op == "load":
+                reply = shard.load(*payload)
+            else:
+                raise ValueError(f"Unknown shard request '{op}'")
+        except Exception as exc:
+            conn.send(("error", f"{type(exc).__name__}: {exc}", time.perf_counter() - start))
+            continue
+        conn.send(("ok", reply, time.perf_counter() - start))
+
+
+# -------------------- Runtime --------------------
+
+class ShardedRuntime:
+    """
+    Runs the per-link pipeline (alignment, twin, features, twin
+    constraints, link-break prediction) on worker processes.
+
+    Links are partitioned by consistent hashing of a shard key, by
+    default the link (beam) id; pass key=lambda ids: ids // beams_per_sat
+    to keep all beams of a satellite on one worker. Every tick, each
+    telemetry batch is split by owner and sent to all workers at once;
+    shard outputs are merged by link id into one global view. Topology
+    batches are also applied to a global TopologyStore in this process
+    (when `satellite_of` maps link ids to satellite ids), for path
+    selection across shards.
+
+    With `states`, the merged aligned state of all links is returned as
+    outputs["state"] (an AlignedStateBatch), for heads that run in this
+    process. `topology` is the store topology batches are applied to
+    (a new TopologyStore by default).
+
+    add_worker() / remove_worker() move only the affected links; their
+    feature windows migrate with them, so predictions stay warm. Window
+    statistics of migrated links are recomputed from the window, so
+    they match an unmigrated run up to float rounding (~1e-12), not
+    bit for bit.
+    """
+
+    def __init__(
+        self,
+        link_ids: Sequence[int],
+        workers: int = 2,
+        key: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+        satellite_of: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+        replicas: int = 64,
+        window_size: int = 10,
+        evolution: Optional[Dict[str, Any]] = None,
+        context: Optional[str] = None,
+        topology: Optional[TopologyStore] = None,
+        states: bool = False,
+    ):
+        self.link_ids = np.unique(np.asarray(link_ids, dtype=np.int64))
+        self.key = key or (lambda ids: ids)
+        self.satellite_of = satellite_of
+        self.options = {"window_size": window_size, "evolution": evolution, "states": states}
+        self._context = mp.get_context(context)
+
+        self.ring = HashRing(replicas=replicas)
+        self._next_name = 0
+        self._conns: Dict[Hashable, Any] = {}
+        self._procs: Dict[Hashable, Any] = {}
+        self.assignment: Dict[Hashable, np.ndarray] = {}
+        # Rows of self.link_ids per worker, for batches over all links
+        self._row_cache: Optional[Dict[Hashable, np.ndarray]] = None
+
+        self.topology = TopologyStore() if topology is None else topology
+
+        self.ticks = 0
+        self.migrated = 0
+        self.shard_seconds: Dict[Hashable, float] = {}
+
+        names = [self._new_name() for _ in range(max(1, workers))]
+        for name in names:
+            self.ring.add(name)
+        self.assignment = self._assign()
+        for name in names:
+            self._spawn(name, self.assignment[name])
+
+    def _new_name(self) -> str:
+        name = f"shard-{self._next_name}"
+        self._next_name += 1
+        return name
+
+    # -------------------- Partitioning --------------------
+
+    def _assign(self) -> Dict[Hashable, np.ndarray]:
+        """
+        Sorted link ids owned by every worker on the ring.
+        """
+        owners = self.ring.owners(self.key(self.link_ids))
+        return {name: self.link_ids[owners == i] for i, name in enumerate(self.ring.workers)}
+
+    def _rows(self, link_ids: np.ndarray) -> Dict[Hashable, np.ndarray]:
+        full = link_ids is self.link_ids or np.array_equal(link_ids, self.link_ids)
+        if full and self._row_cache is not None:
+            return self._row_cache
+        owners = self.ring.owners(self.key(np.asarray(link_ids, dtype=np.int64)))
+        rows = {name: np.flatnonzero(owners == i) for i, name in enumerate(self.ring.workers)}
+        if full:
+            self._row_cache = rows
+        return rows
+
+    # -------------------- Workers --------------------
+
+    def _spawn(self, name: Hashable, link_ids: np.ndarray) -> None:
+        parent, child = self._context.Pipe()
+        proc = self._context.Process(target=_serve, args=(child, link_ids, self.options), name=name, daemon=True)
+        proc.start()
+        child.close()
+        self._conns[name] = parent
+        self._procs[name] = proc
+
+    def _request(self, requests: Dict[Hashable, Tuple[str, Any]]) -> Dict[Hashable, Tuple[str, Any, float]]:
+        # Send everything first so the workers run concurrently
+        for name, request in requests.items():
+            self._conns[name].send(request)
+        return {name: self._conns[name].recv() for name in requests}
+
+    def _rebalance(self) -> int:
+        """
+        Move links to their new owners, carrying their feature windows
+        and last aligned values. Returns the number of links that moved.
+        """
+        assignment = self._assign()
+        changed = [
+            name for name, ids in assignment.items()
+            if name not in self.assignment or not np.array_equal(ids, self.assignment[name])
+        ]
+        losing = [name for name in self.assignment if name in changed or name not in assignment]
+
+        exports = self._request({name: ("export", None) for name in losing if name in self._conns})
+        parts = [reply for status, reply, _ in exports.values() if status == "ok"]
+
+        ids = np.concatenate([link_ids for link_ids, _, _, _ in parts]) if parts else np.empty(0, dtype=np.int64)
+        order = np.argsort(ids)
+
+        # Shards see the same ticks; keep the window samples all of them have
+        windows = [(times, window) for _, times, window, _ in parts]
+        count = min((window.shape[2] for _, window in windows), default=0)
+        times = windows[0][0][len(windows[0][0]) - count:] if count else None
+        window = np.concatenate([w[:, :, w.shape[2] - count:] for _, w in windows], axis=1) if count else None
+
+        latest = [batch for _, _, _, batch in parts]
+        columns = None
+        if latest and all(batch is not None for batch in latest):
+            columns = {
+                name: np.concatenate([batch.columns[name] for batch in latest])
+                for name in latest[0].columns
+                if all(name in batch.columns for batch in latest)
+            }
+
+        loads = {}
+        for name in changed:
+            new_ids = assignment[name]
+            rows = order[np.minimum(np.searchsorted(ids, new_ids, sorter=order), max(len(ids) - 1, 0))]
+            known = ids[rows] == new_ids if len(ids) else np.zeros(len(new_ids), dtype=bool)
+
+            part = None
+            if window is not None:
+                part = np.full((window.shape[0], len(new_ids), count), np.nan)
+                part[:, known] = window[:, rows[known]]
+            seed = None
+            if columns is not None:
+                seed = AlignedStateBatch(
+                    time=latest[0].time,
+                    link_ids=new_ids[known],
+                    columns={key: column[rows[known]] for key, column in columns.items()},
+                )
+
+            if name not in self._conns:
+                self._spawn(name, new_ids)
+            loads[name] = ("load", (new_ids, times, part, seed))
+        self._request(loads)
+
+        moved = sum(
+            len(np.setdiff1d(assignment[name], self.assignment.get(name, np.empty(0, dtype=np.int64))))
+            for name in assignment
+        )
+        self.assignment = assignment
+        self._row_cache = None
+        self.migrated += moved
+        return moved
+
+    def add_worker(self) -> Hashable:
+        """
+        Start one more worker and move the links the ring now gives it.
+        """
+        name = self._new_name()
+        self.ring.add(name)
+        self._rebalance()
+        return name
+
+    def remove_worker(self, name: Optional[Hashable] = None) -> Hashable:
+        """
+        Stop a worker (by default the newest) after handing its links over.
+        """
+        if len(self.ring) == 1:
+            raise RuntimeError("Cannot remove the last worker")
+        name = self.ring.workers[-1] if name is None else name
+        self.ring.remove(name)
+        self._rebalance()
+        self._stop(name)
+        self.assignment.pop(name, None)
+        self.shard_seconds.pop(name, None)
+        return name
+
+    def _stop(self, name: Hashable) -> None:
+        conn = self._conns.pop(name)
+        proc = self._procs.pop(name)
+        conn.send(("stop", None))
+        conn.close()
+        proc.join(timeout=5)
+
+    # -------------------- Tick --------------------
+
+    def tick(self, batches: Sequence[TelemetryBatch]) -> TickResult:
+        """
+        Process one tick of per-source batches on every shard and merge
+        the shard outputs into one TickResult (twin_constraints and
+        link_prediction cover all links, sorted by link id).
+
+        A shard that fails is reported in `errors` under its name; the
+        shard heads then lack its rows and are marked "partial" in
+        `freshness`, or missing if no shard produced them.
+        """
+        result = TickResult()
+        start = time.perf_counter()
+
+        per_shard: Dict[Hashable, List[TelemetryBatch]] = {name: [] for name in self.ring.workers}
+        for batch in batches:
+            for name, rows in self._rows(batch.link_ids).items():
+                per_shard[name].append(split_batch(batch, rows))
+
+        for name, batch_list in per_shard.items():
+            self._conns[name].send(("tick", batch_list))
+
+        # The global topology is updated while the shards work
+        if self.satellite_of is not None:
+            for batch in batches:
+                if batch.source == "topology":
+                    self.topology.apply_batch(batch, self.satellite_of(batch.link_ids))
+
+        outputs = []
+        for name in per_shard:
+            status, reply, seconds = self._conns[name].recv()
+            result.latency[name] = seconds
+            self.shard_seconds[name] = self.shard_seconds.get(name, 0.0) + seconds
+            if status != "ok":
+                result.errors[name] = reply
+            elif reply is not None:
+                outputs.append(_unpack(reply))
+
+        if outputs:
+            result.outputs["time"] = max(output["time"] for output in outputs)
+            for head in SHARD_HEADS:
+                result.outputs[head] = merge_columns([output[head] for output in outputs])
+            if all("state" in output for output in outputs):
+                columns = merge_columns([output["state"] for output in outputs])
+                link_ids = columns.pop("link_ids")
+                result.outputs["state"] = AlignedStateBatch(result.outputs["time"], link_ids, columns)
+        if result.errors:
+            for head in SHARD_HEADS:
+                if head in result.outputs:
+                    result.freshness[head] = "partial"
+                else:
+                    result.freshness[head] = "missing"
+                    result.missing.append(head)
+
+        result.elapsed = time.perf_counter() - start
+        self.ticks += 1
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self.ring),
+            "ticks": self.ticks,
+            "links": {name: len(ids) for name, ids in self.assignment.items()},
+            "migrated_links": self.migrated,
+            "shard_ms": {
+                name: round(seconds / self.ticks * 1000, 3) if self.ticks else 0.0
+                for name, seconds in self.shard_seconds.items()
+            },
+        }
+
+    def close(self) -> None:
+        for name in list(self._conns):
+            self._stop(name)
+
+    def __enter__(self) -> "ShardedRuntime":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,97 @@
+import asyncio
+
+import numpy as np
+
+from core_types import AlignedStateBatch, TelemetryPacket
+from edge_ingestion import codec
+from edge_ingestion.async_ingest import AsyncIngestion, InProcessProducer, SourceQueue, TCPProducer
+from edge_ingestion.constellation import ConstellationGenerator
+from edge_ingestion.time_align import TimeAligner
+
+
+def beam(t: float, link_id=None) -> TelemetryPacket:
+    return TelemetryPacket(t, "beam", {"beam_offset": t}, link_id)
+
+
+def test_coalesce_latest_keeps_one_packet_per_link():
+    queue = SourceQueue("beam", maxsize=4, policy="coalesce_latest")
+    for t in range(3):
+        queue.put_nowait(beam(float(t)))
+        queue.put_nowait(beam(float(t), link_id=7))
+
+    assert len(queue) == 2
+    assert queue.coalesced == 4 and queue.dropped == 0
+    assert [queue.get_nowait().timestamp, queue.get_nowait().timestamp] == [2.0, 2.0]
+    assert queue.get_nowait() is None
+
+
+def test_codec_frames_reach_the_aligner_as_batches():
+    generator = ConstellationGenerator(
+        n_satellites=4, beams_per_sat=2, mode="unthrottled", seed=3, start_time=0.0
+    )
+    ticks = list(generator.ticks(2))
+    frames = [{b.source: codec.encode_batch(b) for b in batches} for batches in ticks]
+
+    direct = TimeAligner(link_ids=generator.link_ids)
+    expected = None
+    for tick in frames:
+        for data in tick.values():
+            for batch in codec.decode_batches(data):
+                expected = direct.add_batch(batch) or expected
+
+    async def run():
+        producers = [TCPProducer(source, framing="codec") for source in frames[0]]
+        ingestion = AsyncIngestion(producers, policy="block", link_ids=generator.link_ids)
+        await ingestion.start()
+        while not all(p.server and p.server.is_serving() for p in producers):
+            await asyncio.sleep(0.01)
+
+        writers = {}
+        for producer in producers:
+            writers[producer.source] = (await asyncio.open_connection(producer.host, producer.port))[1]
+        states = []
+        for tick in frames:
+            for source, data in tick.items():
+                writers[source].write(data)
+                await writers[source].drain()
+            states.append(await asyncio.wait_for(ingestion.states.get(), 5))
+        for writer in writers.values():
+            writer.close()
+        received = sum(p.received for p in producers)
+        await ingestion.stop()
+        return states, received
+
+    states, received = asyncio.run(run())
+    assert all(isinstance(state, AlignedStateBatch) for state in states)
+    assert received == 2 * len(frames[0]) * generator.n_links
+    last = states[-1]
+    assert last.time == expected.time
+    np.testing.assert_array_equal(last.link_ids, expected.link_ids)
+    for name, column in expected.columns.items():
+        np.testing.assert_array_equal(last.columns[name], column)
+
+
+def test_slow_reader_backs_up_into_the_source_queues():
+    generator = ConstellationGenerator(
+        n_satellites=2, beams_per_sat=2, mode="unthrottled", seed=5, start_time=0.0
+    )
+    ticks = list(generator.ticks(12))
+
+    async def run():
+        producers = [
+            InProcessProducer(source, [batches[i] for batches in ticks])
+            for i, source in enumerate(b.source for b in ticks[0])
+        ]
+        ingestion = AsyncIngestion(producers, maxsize=2, policy="block", max_states=2)
+        await ingestion.start()
+        await asyncio.sleep(0.05)
+
+        backed_up = ingestion.states.qsize(), sum(len(q) for q in ingestion.queues.values())
+        states = [await asyncio.wait_for(ingestion.states.get(), 5) for _ in range(len(ticks))]
+        await ingestion.stop()
+        return backed_up, states
+
+    (pending, queued), states = asyncio.run(run())
+    assert pending == 2 and queued > 0
+    assert [state.time for state in states] == sorted(state.time for state in states)
+    assert len(states) == len(ticks)
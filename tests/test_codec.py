@@ -0,0 +1,34 @@
+import pytest
+
+from core_types import TelemetryPacket
+from edge_ingestion import codec
+
+
+def topology(chain) -> TelemetryPacket:
+    return TelemetryPacket(1.0, "topology", {"gateway": 2, "active_links": chain}, link_id=3)
+
+
+def test_active_links_round_trip():
+    (packet,) = codec.decode_packets(codec.encode_packet(topology(["SAT-A", "SAT-B", "GW-1"])))
+
+    assert packet.link_id == 3
+    assert packet.payload["gateway"] == 2
+    assert packet.payload["active_links"] == ["SAT-A", "SAT-B", "GW-1"]
+
+
+@pytest.mark.parametrize("chain", [
+    ["SAT-A", "SAT-B", "SAT-C", "SAT-D", "GW-1"],
+    ["SAT-A", "SATELLITE-WITH-A-LONG-NAME"],
+])
+def test_active_links_that_do_not_fit_are_rejected(chain):
+    with pytest.raises(ValueError):
+        codec.encode_packet(topology(chain))
+
+
+def test_payload_fields_flattens_geometry():
+    fields = codec.payload_fields("geometry", {"sat_pos": [1.0, 2.0, 3.0], "sat_vel": [4.0, 5.0, 6.0]})
+
+    assert fields == {
+        "sat_pos_x": 1.0, "sat_pos_y": 2.0, "sat_pos_z": 3.0,
+        "sat_vel_x": 4.0, "sat_vel_y": 5.0, "sat_vel_z": 6.0,
+    }
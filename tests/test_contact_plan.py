@@ -0,0 +1,49 @@
+import math
+
+import numpy as np
+import pytest
+
+from digital_twin.contact_plan import ContactPlan
+from digital_twin.propagator import EARTH_RADIUS_KM
+
+R = 7000.0
+V = math.sqrt(398600.4418 / R)
+# Two satellites 100 km apart on the same circular orbit, overhead of GW at t=0
+SAT_POS = np.array([[R, 0.0, 0.0], [R * math.cos(0.0143), R * math.sin(0.0143), 0.0]])
+SAT_VEL = np.array([[0.0, V, 0.0], [-V * math.sin(0.0143), V * math.cos(0.0143), 0.0]])
+GROUND = {"GW": [EARTH_RADIUS_KM, 0.0, 0.0]}
+
+
+def plan(lookahead: float) -> ContactPlan:
+    return ContactPlan(
+        0.0, ["A", "B"], SAT_POS, SAT_VEL, GROUND, isl_pairs=[("A", "B")], lookahead_seconds=lookahead,
+    )
+
+
+def test_open_contact_is_not_reported_as_lost_at_the_horizon():
+    short, full = plan(100.0), plan(3600.0)
+    assert short.computed_until == pytest.approx(100.0)
+
+    expected = full.next_loss("A", "GW", 0.0)
+    assert 100.0 < expected < 400.0
+    assert short.next_loss("A", "GW", 0.0) == pytest.approx(expected)
+    assert short.computed_until > expected
+
+    pairs = short.pair_ids(["A", "B"], ["GW", "GW"])
+    np.testing.assert_allclose(short.next_loss_many(pairs, 0.0), full.next_loss_many(pairs, 0.0))
+    assert short.next_contact("A", "GW", 0.0) == pytest.approx(full.next_contact("A", "GW", 0.0))
+
+
+def test_contact_beyond_lookahead_is_inf():
+    short = plan(100.0)
+    assert short.next_loss("A", "B", 0.0) == math.inf
+    assert short.next_contact("A", "B", 0.0)[1] == math.inf
+    event = short.next_event("A", "B", 0.0)
+    assert event["loss_time"] is None and event["reason"] == "outside_prediction_horizon"
+
+    # B leads A: when B leaves the gateway, A is still in contact
+    full = plan(3600.0)
+    event = plan(100.0).next_event("B", "GW", 0.0)
+    assert event["loss_time"] == pytest.approx(full.next_loss("B", "GW", 0.0))
+    assert event["reason"] == "handover_available" and event["replacement"] == "A"
+    assert event["replacement_until"] == pytest.approx(full.next_loss("A", "GW", 0.0))
@@ -0,0 +1,34 @@
+import threading
+import time
+
+from cloud_ml.gnn_path_selector import SafePathSelector
+from cloud_ml.topology_store import TopologyStore
+from pipeline.executor import InferenceExecutor
+
+
+def test_shutdown_does_not_wait_for_abandoned_heads():
+    release = threading.Event()
+    executor = InferenceExecutor(timeout=0.05)
+    try:
+        result = executor.run({"slow": (release.wait, 10.0), "fast": (abs, -1)})
+        assert result.missing == ["slow"]
+        assert result.outputs == {"fast": 1}
+        assert executor.abandoned == 1
+
+        start = time.perf_counter()
+        executor.shutdown()
+        assert time.perf_counter() - start < 1.0
+    finally:
+        release.set()
+
+
+def test_process_head_on_topology_snapshot():
+    store = TopologyStore()
+    store.apply_delta(added=[("S", "A"), ("A", "T"), ("S", "B"), ("B", "T", {"stability": 30.0})])
+    selector = SafePathSelector()
+
+    with InferenceExecutor(timeout=30.0, process_heads=["path_selection"]) as executor:
+        result = executor.run({"path_selection": (selector.select, store.snapshot(), "S", "T")})
+
+    assert result.missing == [] and result.errors == {}
+    assert result.outputs["path_selection"] == selector.select(store, "S", "T")
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from cloud_ml.feature_store import RingFeatureStore
+from core_types import AlignedStateBatch
+
+
+def fill(store: RingFeatureStore, samples, start: int = 0) -> None:
+    for k, value in enumerate(samples, start):
+        store.update_values(float(k), np.full((len(store.features), len(store.link_ids)), value))
+
+
+def test_rolling_stats_match_window():
+    rng = np.random.default_rng(0)
+    store = RingFeatureStore([1, 2, 3], features=("beam_offset",), window_size=5)
+    for k in range(12):
+        store.update_values(0.5 * k, rng.normal(size=(1, 3)))
+
+    window = store.window("beam_offset")
+    times = store.times()
+    assert window.shape == (3, 5)
+    np.testing.assert_allclose(store.mean("beam_offset"), window.mean(axis=1))
+    np.testing.assert_allclose(store.variance("beam_offset"), window.var(axis=1), atol=1e-12)
+    expected = [np.polyfit(times, row, 1)[0] for row in window]
+    np.testing.assert_allclose(store.slope("beam_offset"), expected)
+
+
+def test_nan_sample_propagates_until_it_leaves_the_window():
+    store = RingFeatureStore([1], features=("beam_offset",), window_size=4)
+    fill(store, [1.0, 2.0, np.nan, 4.0, 5.0, 6.0])
+
+    assert np.isnan(store.mean("beam_offset")[0])
+    assert np.isnan(store.slope("beam_offset")[0])
+    assert store.finite_count("beam_offset")[0] == 3
+
+    # k=2 leaves the window at k=6
+    fill(store, [7.0], start=6)
+    assert store.finite_count("beam_offset")[0] == 4
+    assert store.mean("beam_offset")[0] == 5.5
+    np.testing.assert_allclose(store.slope("beam_offset")[0], 1.0)
+
+
+def test_links_missing_from_batch_recover():
+    store = RingFeatureStore([1, 2], features=("beam_offset",), window_size=3)
+    for k in range(6):
+        ids = np.array([1, 2]) if k != 1 else np.array([1])
+        store.update(AlignedStateBatch(float(k), ids, {"beam_offset": np.full(len(ids), float(k))}))
+
+    np.testing.assert_allclose(store.mean("beam_offset"), [4.0, 4.0])
+    np.testing.assert_allclose(store.slope("beam_offset"), [1.0, 1.0])
+
+
+def test_update_maps_unsorted_batch_ids():
+    store = RingFeatureStore([3, 5, 9], features=("beam_offset",), window_size=3)
+    store.update(AlignedStateBatch(0.0, np.array([9, 3, 5]), {"beam_offset": np.array([0.9, 0.3, 0.5])}))
+    store.update(AlignedStateBatch(1.0, np.array([9, 4]), {"beam_offset": np.array([1.9, 1.4])}))
+
+    np.testing.assert_array_equal(store.window("beam_offset"), [[0.3, np.nan], [0.5, np.nan], [0.9, 1.9]])
+
+
+def test_empty_batch_is_an_all_nan_tick():
+    store = RingFeatureStore([1, 2], features=("beam_offset",), window_size=3)
+    store.update(AlignedStateBatch(0.0, np.empty(0, dtype=np.int64), {"beam_offset": np.empty(0)}))
+
+    assert store.count == 1
+    assert np.isnan(store.latest("beam_offset")).all()
+    assert (store.finite_count("beam_offset") == 0).all()
+
+
+def test_snapshot_keeps_its_window():
+    rng = np.random.default_rng(1)
+    store = RingFeatureStore([1, 2], features=("beam_offset", "beam_radius"), window_size=4)
+    for k in range(6):
+        store.update_values(float(k), rng.normal(size=(2, 2)))
+
+    snapshot = store.snapshot()
+    assert store.snapshot() is snapshot
+    expected = {
+        name: {key: value.copy() for key, value in store.trends(name).items()} for name in store.features
+    }
+    window = store.window("beam_offset").copy()
+
+    store.update_values(6.0, rng.normal(size=(2, 2)))
+    for name in store.features:
+        for key, value in snapshot.trends(name).items():
+            np.testing.assert_array_equal(value, expected[name][key])
+    np.testing.assert_array_equal(snapshot.window("beam_offset"), window)
+    np.testing.assert_array_equal(snapshot.times(), np.arange(2.0, 6.0))
+    with pytest.raises(TypeError):
+        snapshot.update_values(7.0, np.zeros((2, 2)))
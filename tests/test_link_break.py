@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from cloud_ml.feature_store import RingFeatureStore
+from cloud_ml.lstm_link_break import (
+    ALREADY_OUTSIDE_BEAM,
+    LOW,
+    MISSING_BEAM_DATA,
+    NON_INCREASING_OFFSET,
+    TEMPORAL_TREND_EXTRAPOLATION,
+    LinkBreakPredictor,
+)
+
+
+def store_with(offsets, radius: float = 10.0) -> RingFeatureStore:
+    """
+    Store of one feature sample per row of `offsets` (links, ticks).
+    """
+    offsets = np.asarray(offsets, dtype=float)
+    store = RingFeatureStore(np.arange(len(offsets)), features=("beam_offset", "beam_radius"), window_size=5)
+    for k in range(offsets.shape[1]):
+        store.update_values(float(k), np.stack([offsets[:, k], np.full(len(offsets), radius)]))
+    return store
+
+
+@pytest.mark.parametrize("options", [{}, {"weighting": "linear"}, {"robust": True}])
+def test_trend_extrapolates_to_beam_edge(options):
+    result = LinkBreakPredictor(**options).predict_batch(store_with([[1.0, 2.0, 3.0, 4.0, 5.0]]))
+
+    assert result["reason"][0] == TEMPORAL_TREND_EXTRAPOLATION
+    assert result["time_to_break"][0] == pytest.approx(5.0)
+
+
+def test_gap_in_window_is_missing_data_not_flat():
+    result = LinkBreakPredictor().predict_batch(store_with([
+        [1.0, 2.0, np.nan, 4.0, 5.0],
+        [5.0, 4.0, 3.0, 2.0, 1.0],
+        [8.0, 9.0, 10.0, 11.0, 12.0],
+    ]))
+
+    assert list(result["reason"]) == [MISSING_BEAM_DATA, NON_INCREASING_OFFSET, ALREADY_OUTSIDE_BEAM]
+    assert result["confidence"][0] == LOW
+    assert np.isnan(result["time_to_break"][0])
+
+
+def test_too_few_finite_samples_is_missing_data():
+    result = LinkBreakPredictor(weighting="linear").predict_batch(store_with([[np.nan, np.nan, np.nan, 4.0, 5.0]]))
+    assert result["reason"][0] == MISSING_BEAM_DATA
@@ -0,0 +1,24 @@
+import os
+
+from logging_observability.log_index import LogIndex, LogReader, index_path
+from logging_observability.logger import BufferedInferenceLogger
+
+
+def test_reader_returns_time_range_and_links(tmp_path, monkeypatch):
+    log_file = str(tmp_path / "inference_logs.jsonl")
+    clock = iter(float(t) for t in range(1000, 2000))
+    monkeypatch.setattr("logging_observability.logger.time.time", lambda: next(clock))
+
+    with BufferedInferenceLogger(log_file, index_block=512) as logger:
+        for i in range(200):
+            logger.log({"link_id": i % 4}, {}, {}, "explanation", 0.0)
+
+    assert os.path.exists(index_path(log_file))
+    assert len(LogIndex.load(index_path(log_file))) > 1
+
+    records = list(LogReader(log_file).read(1050.0, 1060.0))
+    assert [r["timestamp"] for r in records] == [float(t) for t in range(1050, 1060)]
+
+    records = list(LogReader(log_file).read(1000.0, 1100.0, link_ids=[3]))
+    assert len(records) == 25
+    assert all(r["aligned_state"]["link_id"] == 3 for r in records)
@@ -0,0 +1,45 @@
+import math
+
+import numpy as np
+import pytest
+
+from explainability.narrative_engine import NarrativeEngine
+
+
+def reasoning(ttb, exit_time, rtd=0.0):
+    return {
+        "link_break_prediction": {"time_to_break": ttb},
+        "twin_constraints": {"beam_exit": {"beam_exit_time": exit_time}},
+        "parallel_link_qos": [{"link_id": 1, "throughput": 12.345}],
+        "safe_path": {"path": ["A", "B"], "score": 0.5},
+        "uncertainty_rtd": rtd,
+    }
+
+
+def test_infinite_and_missing_slots():
+    engine = NarrativeEngine()
+    text = engine.generate(reasoning(math.inf, math.inf, rtd=None))
+    assert "approximately inf seconds" in text
+    assert "beam exit event in inf seconds" in text
+    assert "difference of None seconds" in text
+
+    text = engine.generate(reasoning(None, float("nan")))
+    assert "sufficient confidence" in text
+    assert "beam exit" not in text
+
+
+@pytest.mark.parametrize("time_step", [0.1, None])
+def test_generate_batch_matches_generate(time_step):
+    engine = NarrativeEngine(time_step=time_step)
+    ttb = np.array([np.inf, 3.04, np.nan, 3.04, -np.inf])
+    exit_time = np.array([np.inf, np.nan, 7.5, np.nan, 0.0])
+    texts = engine.generate_batch(
+        {"time_to_break": ttb}, {"beam_exit": {"beam_exit_time": exit_time}},
+        [{"link_id": 1, "throughput": 12.345}], {"path": ["A", "B"], "score": 0.5}, 0.0,
+    )
+
+    reference = NarrativeEngine(time_step=time_step, cache_size=0)
+    for t, e, text in zip(ttb, exit_time, texts):
+        assert text == reference.generate(reasoning(
+            None if np.isnan(t) else float(t), None if np.isnan(e) else float(e)
+        ))
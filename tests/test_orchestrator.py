@@ -0,0 +1,25 @@
+from pipeline.orchestrator import Pipeline, logger_sink
+
+
+class JsonLogger:
+    def __init__(self):
+        self.records = 0
+
+    def log(self, **record):
+        self.records += 1
+
+
+class ParquetLogger(JsonLogger):
+    pass
+
+
+def test_each_logger_sink_has_its_own_span():
+    loggers = [JsonLogger(), ParquetLogger()]
+    sinks = [logger_sink(logger) for logger in loggers]
+    with Pipeline(links=4, mode="unthrottled", budget=None, sinks=sinks) as pipeline:
+        pipeline.run(steps=5)
+        spans = pipeline.summary()["stages"]
+
+    assert [logger.records for logger in loggers] == [5, 5]
+    assert spans["sink:log:JsonLogger"]["count"] == 5
+    assert spans["sink:log:ParquetLogger"]["count"] == 5
@@ -0,0 +1,58 @@
+import time
+
+import pytest
+
+from logging_observability.parquet_log import ParquetInferenceLogger, narratives, query_logs
+
+
+def log_records(logger: ParquetInferenceLogger, count: int, link_id=None) -> None:
+    for i in range(count):
+        logger.log(
+            aligned_state={"time": float(i), "link_id": i if link_id is None else link_id, "beam_offset": 0.5},
+            twin_constraints={"beam_exit": {"beam_exit_time": 12.5, "reason": "beam_edge"}},
+            ml_outputs={
+                "link_break": {"time_to_break": 3.0, "confidence": "high", "reason": "trend"},
+                "qos": [{"link_id": 7, "score": 1.0, "latency": 2.0, "throughput": 3.0, "lifetime": 4.0}],
+                "path": {"path": ["SAT-0", "GW-0"], "score": -19.0},
+            },
+            explanation=f"Link breaks in {i}.5 seconds.",
+            rtd=0.01,
+        )
+
+
+@pytest.mark.parametrize("fsync", ["never", "interval", "batch"])
+def test_flush_makes_records_queryable(tmp_path, fsync):
+    with ParquetInferenceLogger(str(tmp_path), fsync=fsync, rotate_interval=None) as logger:
+        log_records(logger, 100)
+        assert logger.flush(timeout=10.0)
+        assert logger.written == 100
+
+        table = query_logs(str(tmp_path), columns=["link_id", "narrative_template", "narrative_params"])
+        assert sorted(table.column("link_id").to_pylist()) == list(range(100))
+        assert "Link breaks in 42.5 seconds." in narratives(table)
+
+        # Records after a flush go to a new part file
+        log_records(logger, 5)
+    assert query_logs(str(tmp_path), columns=["link_id"]).num_rows == 105
+
+
+def test_interval_policy_closes_parts_without_flush(tmp_path):
+    with ParquetInferenceLogger(str(tmp_path), fsync="interval", fsync_interval=0.05, flush_interval=0.02) as logger:
+        log_records(logger, 10)
+        deadline = time.monotonic() + 10.0
+        while query_logs(str(tmp_path), columns=["link_id"]).num_rows < 10 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert query_logs(str(tmp_path), columns=["link_id"]).num_rows == 10
+
+
+def test_bad_row_is_rejected_without_stopping_the_writer(tmp_path):
+    with ParquetInferenceLogger(str(tmp_path)) as logger:
+        log_records(logger, 3)
+        log_records(logger, 1, link_id="not-an-int")
+        log_records(logger, 3)
+        assert logger.flush(timeout=10.0)
+        stats = logger.stats()
+
+    assert stats["written"] == 6
+    assert stats["errors"] == 1
+    assert query_logs(str(tmp_path), columns=["link_id"]).num_rows == 6
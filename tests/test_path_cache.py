@@ -0,0 +1,103 @@
+import random
+
+import pytest
+
+from cloud_ml.gnn_path_selector import SafePathSelector
+from cloud_ml.path_cache import PathCache
+from cloud_ml.topology_store import TopologyStore
+
+
+def random_delta(rng: random.Random, nodes):
+    added, removed, updated = [], [], []
+    for _ in range(rng.randint(1, 6)):
+        u, v = rng.sample(nodes, 2)
+        attrs = {
+            "latency": rng.uniform(1.0, 30.0),
+            "stability": rng.uniform(0.0, 40.0),
+            "switch_cost": rng.uniform(0.0, 3.0),
+        }
+        r = rng.random()
+        if r < 0.5:
+            added.append((u, v, attrs))
+        elif r < 0.75:
+            removed.append((u, v))
+        else:
+            updated.append((u, v, attrs))
+    return added, removed, updated
+
+
+@pytest.mark.parametrize("log_size", [4096, 8])
+def test_cache_matches_uncached_selector_over_random_deltas(log_size):
+    nodes = [f"N{i}" for i in range(12)] + ["S", "T"]
+    hits = 0
+    for seed in range(40):
+        rng = random.Random(seed)
+        # Endpoints only enter the store once an edge reaches them
+        store = TopologyStore(log_size=log_size)
+        cache = PathCache(SafePathSelector(max_hops=4))
+        reference = SafePathSelector(max_hops=4)
+
+        for _ in range(30):
+            store.apply_delta(*random_delta(rng, nodes))
+            result = cache.select(store, "S", "T")
+            expected = reference.select(store, "S", "T")
+            if expected is None:
+                assert result is None
+            else:
+                assert result is not None and result["score"] == expected["score"]
+        hits += cache.hits
+    assert hits > 0
+
+
+def test_path_appears_after_endpoint_is_added():
+    store = TopologyStore()
+    store.add_edge("S", "A")
+    cache = PathCache(SafePathSelector(max_hops=4))
+
+    assert cache.select(store, "S", "T") is None
+    store.add_edge("A", "T")
+    assert cache.select(store, "S", "T")["path"] == ["S", "A", "T"]
+
+
+def test_truncated_change_log_recomputes():
+    store = TopologyStore(log_size=8)
+    store.apply_delta(added=[
+        ("S", "A", {"latency": 0.0, "stability": 1.0, "switch_cost": 0.0}),
+        ("A", "T", {"latency": 0.0, "stability": 1.0, "switch_cost": 0.0}),
+    ])
+    cache = PathCache(SafePathSelector(max_hops=4))
+    assert cache.select(store, "S", "T")["path"] == ["S", "A", "T"]
+
+    store.apply_delta(added=[("S", "T", {"latency": 0.0, "stability": 100.0, "switch_cost": 0.0})] + [
+        (f"X{i}", f"X{i + 1}") for i in range(20)
+    ])
+    assert cache.select(store, "S", "T") == {"path": ["S", "T"], "score": 100.0}
+    assert cache.invalidations == 1
+
+
+def test_unchanged_version_is_a_hit():
+    store = TopologyStore()
+    store.add_edge("S", "T")
+    cache = PathCache(SafePathSelector(max_hops=4))
+    first = cache.select(store, "S", "T")
+
+    assert cache.select(store, "S", "T") is first
+    assert cache.stats()["hits"] == 1
+
+
+def test_snapshots_share_entries():
+    store = TopologyStore()
+    store.apply_delta(added=[("S", "A"), ("A", "T")])
+    cache = PathCache(SafePathSelector(max_hops=4))
+
+    old = store.snapshot()
+    assert cache.select(old, "S", "T")["path"] == ["S", "A", "T"]
+    store.add_edge("X", "Y")
+    assert cache.select(store.snapshot(), "S", "T")["path"] == ["S", "A", "T"]
+    assert (cache.misses, cache.revalidations) == (1, 1)
+
+    # A late reader with an older snapshot is answered without the cache
+    store.apply_delta(added=[("S", "T", {"latency": 0.0, "stability": 100.0, "switch_cost": 0.0})])
+    assert cache.select(store.snapshot(), "S", "T")["path"] == ["S", "T"]
+    assert cache.select(old, "S", "T")["path"] == ["S", "A", "T"]
+    assert cache.bypassed == 1
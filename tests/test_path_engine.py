@@ -0,0 +1,54 @@
+import random
+
+import networkx as nx
+import pytest
+
+from cloud_ml.gnn_path_selector import SafePathSelector
+from cloud_ml.path_engine import PathEngine
+
+
+def random_mesh(nodes: int, degree: int, stability_max: float, seed: int) -> nx.Graph:
+    rng = random.Random(seed)
+    graph = nx.random_regular_graph(degree, nodes, seed=seed)
+    for u, v in graph.edges:
+        graph[u][v].update(
+            latency=rng.uniform(5.0, 40.0),
+            stability=rng.uniform(0.0, stability_max),
+            switch_cost=rng.uniform(0.0, 3.0),
+        )
+    return graph
+
+
+@pytest.mark.parametrize("stability_max", [10.0, 60.0])
+def test_best_path_matches_exhaustive_search(stability_max):
+    # stability_max above the latency range gives negative edge costs
+    graph = random_mesh(60, 4, stability_max, seed=3)
+    selector = SafePathSelector(max_hops=4)
+    engine = PathEngine.from_networkx(graph)
+    rng = random.Random(5)
+
+    for _ in range(40):
+        s, t = rng.sample(list(graph.nodes), 2)
+        expected = selector.select_exhaustive(graph, s, t)
+        result = engine.best_path(s, t, 4)
+        if expected is None:
+            assert result is None
+        else:
+            assert result["score"] == expected["score"]
+            assert len(result["path"]) - 1 <= 4
+
+
+def test_k_best_paths_are_distinct_and_ordered():
+    graph = random_mesh(40, 4, 10.0, seed=1)
+    engine = PathEngine.from_networkx(graph)
+    paths = engine.k_best_paths(0, 17, 5, 5)
+
+    assert paths[0]["score"] == engine.best_path(0, 17, 5)["score"]
+    assert len({tuple(p["path"]) for p in paths}) == len(paths)
+    assert [p["score"] for p in paths] == sorted((p["score"] for p in paths), reverse=True)
+
+
+def test_unknown_endpoint_has_no_path():
+    engine = PathEngine.from_networkx(random_mesh(10, 3, 10.0, seed=0))
+    assert engine.best_path(0, "missing") is None
+    assert engine.k_best_paths("missing", 0, 3) == []
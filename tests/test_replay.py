@@ -0,0 +1,49 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from pipeline.replay import ReplaySource, backtest, flat_state
+
+LEGACY_LOG = os.path.join(os.path.dirname(os.path.dirname(__file__)), "inference_logs.jsonl")
+
+
+def test_legacy_log_replays():
+    summary = backtest(LEGACY_LOG, workers=1)
+    assert summary["replay"]["ticks"] == 3
+    assert summary["replay"]["skipped_records"] == 0
+
+
+def test_legacy_rows_valid_per_source():
+    source = ReplaySource(LEGACY_LOG, workers=1)
+    batches = {batch.source: batch for batch in source.generate_tick()}
+    assert source.link_ids.tolist() == [0]
+    assert batches["geometry"].valid.tolist() == [True]
+    assert batches["geometry"].columns["sat_vel_y"].tolist() == [7.5]
+    assert batches["beam"].valid.tolist() == [False]
+
+
+def test_flat_state_rejects_malformed_groups():
+    with pytest.raises(ValueError, match="sat_pos"):
+        flat_state({"time": 0.0, "geometry": {"sat_pos": [1.0, 2.0]}})
+    with pytest.raises(ValueError, match="beam"):
+        flat_state({"time": 0.0, "geometry": {}, "beam": [1.0]})
+
+
+def test_records_without_link_id_are_skipped(tmp_path):
+    path = tmp_path / "log.jsonl"
+    states = [
+        {"time": 1.0, "link_id": 4, "beam_offset": 0.1, "beam_radius": 1.0},
+        {"time": 1.0, "beam_offset": 0.2, "beam_radius": 1.0},
+        {"time": 1.0, "link_id": None, "beam_offset": 0.3, "beam_radius": 1.0},
+        {"time": 1.0, "link_id": 7, "beam_offset": 0.4},
+    ]
+    path.write_text("".join(json.dumps({"aligned_state": state}) + "\n" for state in states))
+
+    source = ReplaySource(str(path), workers=1)
+    assert source.skipped_records == 2
+    beam = {batch.source: batch for batch in source.generate_tick()}["beam"]
+    assert beam.link_ids.tolist() == [4, 7]
+    assert beam.valid.tolist() == [True, False]
+    np.testing.assert_array_equal(beam.columns["beam_offset"], [0.1, 0.4])
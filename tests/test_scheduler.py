@@ -0,0 +1,33 @@
+import time
+
+from pipeline.executor import InferenceExecutor
+from pipeline.scheduler import TickScheduler
+
+
+def test_slow_ingest_does_not_degrade_cheap_heads():
+    scheduler = TickScheduler(InferenceExecutor(), budget=0.05)
+    scheduler.costs["path_selection"] = 0.001
+
+    result = scheduler.run({"path_selection": (lambda: "path",)}, started=time.perf_counter() - 1.0)
+
+    assert result.level == 0
+    assert result.freshness == {"path_selection": "fresh"}
+    assert scheduler.overruns == 1
+
+
+def test_recovers_after_a_timed_out_head():
+    executor = InferenceExecutor()
+    scheduler = TickScheduler(executor, budget=0.05, probe_every=2)
+    delays = iter([0.2])
+
+    def path():
+        time.sleep(next(delays, 0.0))
+        return "path"
+
+    results = [scheduler.run({"path_selection": (path,)}) for _ in range(4)]
+    executor.shutdown()
+
+    # Tick 1 skips the head, tick 2 probes it in full, tick 3 is back to level 0
+    assert [r.level for r in results] == [0, 1, 1, 0]
+    assert [r.freshness["path_selection"] for r in results] == ["missing", "missing", "fresh", "fresh"]
+    assert scheduler.last["path_selection"] == "path"
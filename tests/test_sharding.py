@@ -0,0 +1,149 @@
+import numpy as np
+
+from edge_ingestion.constellation import ConstellationGenerator
+from core_types import TelemetryBatch
+from pipeline.orchestrator import Pipeline
+from pipeline.sharding import HashRing, ShardedRuntime, ShardWorker, merge_columns
+
+
+def stream(ticks: int, satellites: int = 4, beams: int = 4):
+    generator = ConstellationGenerator(
+        n_satellites=satellites, beams_per_sat=beams, mode="unthrottled", seed=1, start_time=0.0
+    )
+    return generator, list(generator.ticks(ticks))
+
+
+def test_migrated_shard_matches_up_to_rounding():
+    generator = ConstellationGenerator(
+        n_satellites=4, beams_per_sat=4, mode="unthrottled", seed=1, start_time=0.0
+    )
+    stream = list(generator.ticks(30))
+    base = ShardWorker(generator.link_ids)
+    source = ShardWorker(generator.link_ids)
+    for batches in stream[:20]:
+        base.process(batches)
+        source.process(batches)
+
+    link_ids, times, window, latest = source.export()
+    moved = ShardWorker(link_ids)
+    moved.load(link_ids, times, window, latest)
+    # Sums are rebuilt from the migrated window, relative to its oldest sample
+    assert moved.features.times()[0] == times[0]
+    np.testing.assert_array_equal(moved.features.window_all(), window)
+    features = moved.features
+    for i, name in enumerate(features.features):
+        finite = np.isfinite(window[i]).all(axis=1)
+        np.testing.assert_array_equal(
+            features.mean(name)[finite], window[i][finite].sum(axis=1) / features.count
+        )
+
+    for batches in stream[20:]:
+        expected = base.process(batches)["link_prediction"]
+        actual = moved.process(batches)["link_prediction"]
+        np.testing.assert_array_equal(actual["time_to_break"], expected["time_to_break"])
+        for key in ("slope", "slope_stderr"):
+            np.testing.assert_allclose(actual[key], expected[key], rtol=1e-9, atol=1e-12)
+
+
+def test_failed_shard_is_an_error_and_its_heads_partial():
+    generator, ticks = stream(2)
+    with ShardedRuntime(generator.link_ids, workers=2) as runtime:
+        runtime.tick(ticks[0])
+        name, other = runtime.ring.workers
+        owned = runtime.assignment[name]
+        # Timestamps that cannot be compared fail the owning shard only
+        broken = TelemetryBatch(
+            ticks[1][0].time, "geometry", owned, np.full(len(owned), None, dtype=object),
+            np.ones(len(owned), dtype=bool), {},
+        )
+        batches = [broken if batch.source == "geometry" else batch for batch in ticks[1]]
+        result = runtime.tick(batches)
+
+    assert list(result.errors) == [name]
+    assert result.missing == []
+    assert result.freshness == {"twin_constraints": "partial", "link_prediction": "partial"}
+    np.testing.assert_array_equal(result.outputs["link_prediction"]["link_ids"], runtime.assignment[other])
+
+
+def test_rebalances_match_a_single_shard_run():
+    generator, ticks = stream(12)
+    reference = ShardWorker(generator.link_ids)
+    expected = [reference.process(batches) for batches in ticks]
+
+    results = []
+    with ShardedRuntime(generator.link_ids, workers=2) as runtime:
+        for k, batches in enumerate(ticks):
+            if k == 4:
+                added = runtime.add_worker()
+            if k == 8:
+                assert runtime.remove_worker() == added
+            results.append(runtime.tick(batches))
+        stats = runtime.stats()
+
+    assert stats["workers"] == 2
+    assert set(stats["shard_ms"]) == set(stats["links"])
+    assert stats["migrated_links"] > 0
+    for result, reference_output in zip(results, expected):
+        prediction = result.outputs["link_prediction"]
+        np.testing.assert_array_equal(prediction["link_ids"], generator.link_ids)
+        np.testing.assert_array_equal(prediction["time_to_break"], reference_output["link_prediction"]["time_to_break"])
+        np.testing.assert_allclose(
+            prediction["slope"], reference_output["link_prediction"]["slope"], rtol=1e-9, atol=1e-12
+        )
+        twin = result.outputs["twin_constraints"]
+        np.testing.assert_array_equal(
+            twin["beam_exit"]["beam_exit_time"], reference_output["twin_constraints"]["beam_exit"]["beam_exit_time"]
+        )
+
+
+def test_hash_ring_balance_and_minimal_movement():
+    keys = np.arange(20000)
+    ring = HashRing(["a", "b", "c", "d"], replicas=64)
+    before = np.array(ring.workers)[ring.owners(keys)]
+
+    shares = np.unique(before, return_counts=True)[1] / len(keys)
+    assert shares.min() > 0.15 and shares.max() < 0.35
+
+    ring.add("e")
+    after = np.array(ring.workers)[ring.owners(keys)]
+    moved = before != after
+    # Only keys taken over by the new worker move
+    assert (after[moved] == "e").all()
+    assert 0.1 < moved.mean() < 0.3
+
+    ring.remove("e")
+    np.testing.assert_array_equal(np.array(ring.workers)[ring.owners(keys)], before)
+
+
+def test_merge_columns_sorts_rows_by_link_id():
+    def part(ids, horizon=60):
+        ids = np.array(ids)
+        return {"beam_exit": {"link_ids": ids, "time": ids * 1.5, "horizon": horizon}}
+
+    merged = merge_columns([part([4, 1]), None, part([2], horizon=30)])
+
+    np.testing.assert_array_equal(merged["beam_exit"]["link_ids"], [1, 2, 4])
+    np.testing.assert_array_equal(merged["beam_exit"]["time"], [1.5, 3.0, 6.0])
+    # Non-row values come from the first shard
+    assert merged["beam_exit"]["horizon"] == 60
+    assert merge_columns([None, None]) is None
+
+
+def test_sharded_pipeline_matches_in_process_pipeline():
+    def run(shards):
+        with Pipeline(links=32, beams_per_sat=4, mode="unthrottled", seed=2, budget=None, shards=shards) as pipeline:
+            return list(pipeline.ticks(6)), pipeline.summary()
+
+    local, _ = run(0)
+    sharded, summary = run(3)
+
+    assert summary["shards"]["workers"] == 3
+    for a, b in zip(local, sharded):
+        np.testing.assert_array_equal(a.state.link_ids, b.state.link_ids)
+        np.testing.assert_array_equal(
+            a.result.outputs["link_prediction"]["time_to_break"],
+            b.result.outputs["link_prediction"]["time_to_break"],
+        )
+        # RTD is wall-clock based; everything else agrees
+        for key in ("link_break_prediction", "parallel_link_qos", "safe_path", "twin_constraints"):
+            assert a.reasoning[key] == b.reasoning[key]
@@ -0,0 +1,22 @@
+from core_types import AlignedState
+from digital_twin.state_replica import DigitalTwinState
+
+
+def state(t: float) -> AlignedState:
+    return AlignedState(time=t, geometry={}, rf={}, beam={"beam_offset": t}, topology={}, environment={})
+
+
+def test_update_copies_only_the_touched_chunk():
+    twin = DigitalTwinState()
+    for link in range(500):
+        twin.update(state(0.0), link_id=link)
+    before = twin.get_snapshot()
+
+    after = twin.update(state(1.0), link_id=7)
+
+    shared = sum(a is b for a, b in zip(before.links._chunks, after.links._chunks))
+    assert shared == len(after.links._chunks) - 1
+    assert len(after.links) == len(before.links) == 500
+    assert before.state(7).beam["beam_offset"] == 0.0
+    assert after.state(7).beam["beam_offset"] == 1.0
+    assert sorted(after.links) == list(range(500))
@@ -0,0 +1,46 @@
+import numpy as np
+
+from core_types import BATCH_COLUMNS, TelemetryPacket
+from edge_ingestion.stream import PacketSource
+from pipeline.orchestrator import DEMO_CANDIDATES, Pipeline, demo_topology
+
+
+def cycle(t: float, offset: float, geometry: bool = True):
+    if geometry:
+        yield TelemetryPacket(t, "geometry", {"sat_pos": [7000.0, 0, 0], "sat_vel": [0, 7.5, 0]})
+    yield TelemetryPacket(t, "beam", {"beam_offset": offset, "beam_radius": 1.0})
+    yield TelemetryPacket(t, "rf", {"snr": 20.0, "doppler": 0.0, "timing_drift": 0.0})
+    yield TelemetryPacket(t, "topology", {"active_links": ["SAT-A", "SAT-B", "GW-1"]})
+    yield TelemetryPacket(t, "environment", {"attenuation": 0.1})
+
+
+def packets(n: int, drop_geometry_at: int = -1):
+    for k in range(n):
+        yield from cycle(0.2 * k, 0.02 * k, geometry=k != drop_geometry_at)
+
+
+def test_packet_source_groups_cycles():
+    source = PacketSource(packets(3, drop_geometry_at=1))
+    ticks = [source.generate_tick() for _ in range(4)]
+    assert ticks[3] is None
+
+    first = {batch.source: batch for batch in ticks[0]}
+    assert list(first) == list(BATCH_COLUMNS)
+    assert first["geometry"].columns["sat_vel_y"].tolist() == [7.5]
+    assert not {batch.source: batch.valid[0] for batch in ticks[1]}["geometry"]
+    np.testing.assert_allclose({b.source: b for b in ticks[2]}["beam"].columns["beam_offset"], [0.04])
+
+
+def test_demo_pipeline_on_packet_stream():
+    with Pipeline(
+        source=PacketSource(packets(6)),
+        budget=None,
+        candidates=DEMO_CANDIDATES,
+        topology=demo_topology(),
+        route=("SAT-A", "GW-1"),
+    ) as pipeline:
+        records = list(pipeline.ticks())
+
+    assert len(records) == 6
+    assert records[-1].reasoning["safe_path"]["path"] == ["SAT-A", "SAT-B", "SAT-C", "GW-1"]
+    assert [link["link_id"] for link in records[-1].reasoning["parallel_link_qos"]] == ["L2", "L1"]
@@ -0,0 +1,42 @@
+import numpy as np
+
+from core_types import MISSING_ID, TelemetryBatch
+from edge_ingestion.time_align import TimeAligner
+
+
+def batch(source, link_ids, columns, t=1.0):
+    link_ids = np.asarray(link_ids, dtype=np.int64)
+    n = len(link_ids)
+    return TelemetryBatch(t, source, link_ids, np.full(n, t), np.ones(n, dtype=bool), columns)
+
+
+def test_empty_first_batch_does_not_fix_the_link_set():
+    aligner = TimeAligner()
+    assert aligner.add_batch(batch("beam", [], {"beam_offset": np.empty(0)})) is None
+
+    aligner.add_batch(batch("beam", [3, 5], {"beam_offset": np.array([0.1, 0.2])}))
+    state = aligner.add_batch(batch("topology", [5], {"gateway": np.array([0], dtype=np.int32)}))
+    for source in ("geometry", "rf", "environment"):
+        state = aligner.add_batch(batch(source, [3, 5], {})) or state
+
+    np.testing.assert_array_equal(state.link_ids, [3, 5])
+    # Link 3 never reported a gateway: sentinel, not gateway 0
+    np.testing.assert_array_equal(state.columns["gateway"], [MISSING_ID, 0])
+    assert "gateway" not in state.state(3).topology
+    assert state.state(5).topology == {"gateway": 0}
+
+
+def test_unsorted_first_batch_and_permuted_rows():
+    aligner = TimeAligner()
+    aligner.add_batch(batch("beam", [5, 3, 9], {"beam_offset": np.array([0.5, 0.3, 0.9])}, t=1.0))
+    for source in ("geometry", "rf", "topology", "environment"):
+        aligner.add_batch(batch(source, [5, 3, 9], {}, t=1.0))
+
+    aligner.add_batch(batch("beam", [3, 5, 9], {"beam_offset": np.array([1.3, 1.5, 1.9])}, t=2.0))
+    state = None
+    for source in ("geometry", "rf", "topology", "environment"):
+        state = aligner.add_batch(batch(source, [9, 3, 5], {}, t=2.0)) or state
+
+    np.testing.assert_array_equal(state.link_ids, [3, 5, 9])
+    np.testing.assert_array_equal(state.columns["beam_offset"], [1.3, 1.5, 1.9])
+    assert state.state(5).beam == {"beam_offset": 1.5}
@@ -0,0 +1,66 @@
+import pytest
+
+from cloud_ml.topology_store import TopologyStore
+
+
+def test_changes_since_returns_version_changes_in_order():
+    store = TopologyStore()
+    store.add_edge("A", "B")
+    base = store.version
+    store.apply_delta(added=[("B", "C"), ("C", "D")])
+    store.update_edge("A", "B", latency=1.0)
+
+    changes = store.changes_since(base)
+    assert [(c.op, c.u, c.v) for c in changes] == [("add", "B", "C"), ("add", "C", "D"), ("update", "A", "B")]
+    assert store.changes_since(store.version) == []
+
+
+def test_changes_since_rejects_truncated_version():
+    # One delta with more changes than the log holds
+    store = TopologyStore(log_size=8)
+    store.add_edge("S", "T")
+    base = store.version
+    store.apply_delta(added=[(f"N{i}", f"N{i + 1}") for i in range(20)])
+
+    assert store.changes_since(base) is None
+    assert store.changes_since(store.version - 1) is None
+    assert store.changes_since(store.version) == []
+
+
+def test_changes_since_after_log_wraps():
+    store = TopologyStore(log_size=4)
+    for i in range(10):
+        store.add_edge("A", f"N{i}")
+
+    assert store.changes_since(store.version - 5) is None
+    assert [c.v for c in store.changes_since(store.version - 3)] == ["N7", "N8", "N9"]
+
+
+def test_edge_and_csr_follow_deltas():
+    store = TopologyStore()
+    store.apply_delta(added=[("A", "B", {"latency": 2.0}), ("B", "C")])
+    store.remove_edge("A", "B")
+
+    assert not store.has_edge("A", "B")
+    assert store.edge("B", "C")["latency"] == 25.0
+    indptr, indices, _ = store.csr()
+    assert indptr[-1] == 2
+
+
+def test_snapshot_is_isolated_and_read_only():
+    store = TopologyStore()
+    store.apply_delta(added=[("A", "B"), ("B", "C")])
+    snapshot = store.snapshot()
+    assert store.snapshot() is snapshot
+
+    store.remove_edge("B", "C")
+    store.add_edge("C", "D")
+    assert snapshot.version == store.version - 2
+    assert snapshot.has_edge("B", "C") and not snapshot.has_edge("C", "D")
+    assert snapshot.best_path("A", "C")["path"] == ["A", "B", "C"]
+    assert store.snapshot() is not snapshot
+
+    with pytest.raises(TypeError):
+        snapshot.add_edge("A", "C")
+    with pytest.raises(TypeError):
+        snapshot.remove_edge("A", "B")